@@ -2,6 +2,7 @@
 Dependencies para FastAPI (Dependency Injection)
 """
 
+import asyncio
 from typing import AsyncGenerator
 from fastapi import Depends, HTTPException, Header, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
@@ -10,6 +11,7 @@ from app.config.database import get_database
 from app.config.cache import get_cache, RedisCache
 from app.config.events import get_event_bus, RabbitMQEventBus
 from app.services.moderation_service import ModerationService
+from app.services.startup_orchestrator import startup_orchestrator
 from app.config.settings import settings
 from app.utils.logger import log
 
@@ -44,6 +46,7 @@ async def get_event_bus_client() -> RabbitMQEventBus:
 # ===== MODERATION SERVICE DEPENDENCY =====
 
 _moderation_service: ModerationService | None = None
+_moderation_service_lock = asyncio.Lock()
 
 
 async def get_moderation_service(
@@ -53,13 +56,31 @@ async def get_moderation_service(
 ) -> ModerationService:
     """
     Dependency para obtener el servicio de moderación (Singleton)
+    
+    Si el arranque orquestado está en curso, espera su instancia; si no
+    (ej: sin lifespan), la crea una sola vez aunque lleguen requests
+    concurrentes.
     """
     global _moderation_service
     
-    if _moderation_service is None:
-        _moderation_service = ModerationService(db, cache, event_bus)
-        await _moderation_service.initialize()
-        log.info("ModerationService singleton created")
+    if _moderation_service is not None:
+        return _moderation_service
+    
+    async with _moderation_service_lock:
+        if _moderation_service is None:
+            if startup_orchestrator.started:
+                try:
+                    _moderation_service = await startup_orchestrator.wait_for_service()
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail=f"Service not ready: {e}"
+                    )
+            else:
+                service = ModerationService(db, cache, event_bus)
+                await service.initialize()
+                _moderation_service = service
+                log.info("ModerationService singleton created")
     
     return _moderation_service
 
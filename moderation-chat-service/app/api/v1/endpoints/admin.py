@@ -4,6 +4,7 @@ Endpoints administrativos para gestión de usuarios baneados y violaciones
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import Optional
+from datetime import datetime
 
 from app.schemas.admin import (
     BannedUsersResponse,
@@ -12,6 +13,7 @@ from app.schemas.admin import (
     UnbanUserRequest,
     UserStatusResponse,
     ChannelStatsResponse,
+    ServiceMetricsResponse,
 )
 from app.schemas.common import SuccessResponse, ErrorResponse
 from app.services.moderation_service import ModerationService
@@ -400,3 +402,40 @@ async def expire_bans(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
+
+
+@router.get(
+    "/metrics",
+    response_model=ServiceMetricsResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Métricas de Rendimiento",
+    description="Obtiene métricas de rendimiento del servicio (cola de inferencia, etc.)",
+    dependencies=[Depends(verify_api_key)],
+    responses={
+        200: {"description": "Métricas obtenidas exitosamente"},
+        401: {"description": "No autorizado"},
+        500: {"model": ErrorResponse, "description": "Error del servidor"}
+    }
+)
+async def get_service_metrics(
+    service: ModerationService = Depends(get_moderation_service)
+):
+    """
+    Obtiene métricas de rendimiento del servicio
+    
+    Incluye profundidad de la cola de inferencia, tamaño de batch y
+    tiempos de espera, para ajustar latencia vs throughput.
+    Requiere autenticación con API Key.
+    """
+    try:
+        return ServiceMetricsResponse(
+            timestamp=datetime.utcnow().isoformat(),
+            metrics=service.get_metrics()
+        )
+        
+    except Exception as e:
+        log.error(f"Error getting service metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
@@ -2,7 +2,7 @@
 Endpoints de gestión de lista negra
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from typing import Optional
 
 from app.schemas.blacklist import (
@@ -11,10 +11,12 @@ from app.schemas.blacklist import (
     BlacklistWordsResponse,
     BlacklistStatsResponse,
     UpdateWordRequest,
+    BlacklistImportResponse,
 )
 from app.schemas.common import SuccessResponse, ErrorResponse
 from app.services.moderation_service import ModerationService
 from app.api.deps import get_moderation_service, verify_api_key
+from app.core.blacklist_importer import BlacklistImporter, detect_format, iter_text_lines
 from app.utils.logger import log
 from app.utils.exceptions import BlacklistException
 
@@ -75,6 +77,60 @@ async def add_word(
         )
 
 
+@router.post(
+    "/words/import",
+    response_model=BlacklistImportResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Importar Palabras",
+    description="Importa palabras en lote desde un archivo NDJSON o CSV",
+    dependencies=[Depends(verify_api_key)],
+    responses={
+        200: {"description": "Importación completada"},
+        400: {"model": ErrorResponse, "description": "Archivo inválido"},
+        401: {"description": "No autorizado"},
+        500: {"model": ErrorResponse, "description": "Error del servidor"}
+    }
+)
+async def import_words(
+    file: UploadFile = File(..., description="Archivo NDJSON (un objeto por línea) o CSV con encabezado"),
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$", description="Formato (por defecto según la extensión)"),
+    language: Optional[str] = Query(None, description="Idioma para filas sin idioma"),
+    category: Optional[str] = Query(None, description="Categoría para filas sin categoría"),
+    severity: Optional[str] = Query(None, description="Severidad para filas sin severidad"),
+    service: ModerationService = Depends(get_moderation_service),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Importa palabras en lote
+    
+    El archivo se lee y valida en streaming; las filas válidas se insertan
+    en lotes omitiendo duplicados y la lista negra se recompila una sola
+    vez al final. Requiere autenticación con API Key.
+    """
+    try:
+        importer = BlacklistImporter(service.blacklist_repo, service.blacklist_manager)
+        result = await importer.import_lines(
+            iter_text_lines(file),
+            detect_format(file.filename, format),
+            added_by=api_key,
+            defaults={"language": language, "category": category, "severity": severity}
+        )
+        return BlacklistImportResponse(**result)
+        
+    except BlacklistException as e:
+        log.error(f"Error importing words: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        log.error(f"Unexpected error in import_words: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
 @router.get(
     "/words",
     response_model=BlacklistWordsResponse,
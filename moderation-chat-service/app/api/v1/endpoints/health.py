@@ -2,14 +2,16 @@
 Endpoints de health check
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
 from datetime import datetime
 
-from app.schemas.common import HealthResponse
+from app.schemas.common import HealthResponse, ReadinessResponse
 from app.config.database import mongodb
 from app.config.cache import redis_cache
 from app.config.events import rabbitmq
 from app.config.settings import settings
+from app.services.startup_orchestrator import startup_orchestrator
 
 router = APIRouter()
 
@@ -77,6 +79,40 @@ async def health_check():
     )
 
 
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    summary="Readiness Check",
+    description="Indica si el servicio terminó de arrancar (modelo cargado y calentado)",
+    responses={503: {"model": ReadinessResponse}}
+)
+async def readiness_check():
+    """
+    Readiness del servicio
+    
+    Retorna 503 hasta que las conexiones, la carga y el calentamiento del
+    modelo y la lista negra estén listos, para que el balanceador no envíe
+    tráfico a un worker en frío.
+    """
+    state = startup_orchestrator.get_status()
+    
+    response = ReadinessResponse(
+        status="ready" if state["ready"] else "not_ready",
+        timestamp=datetime.utcnow().isoformat(),
+        stages=state["stages"],
+        timings_ms=state["timings_ms"],
+        error=state["error"]
+    )
+    
+    if not state["ready"]:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=response.model_dump()
+        )
+    
+    return response
+
+
 @router.get(
     "/ping",
     summary="Ping",
@@ -60,7 +60,8 @@ async def moderate_message(
             user_id=request.user_id,
             channel_id=request.channel_id,
             content=request.content,
-            metadata=request.metadata
+            metadata=request.metadata,
+            language=request.language
         )
         
         return ModerateMessageResponse(**result)
@@ -3,7 +3,8 @@ Configuración y gestión de conexión a Redis (Cache)
 """
 
 from redis import asyncio as aioredis
-from typing import Optional, Any
+from redis.exceptions import RedisError, WatchError
+from typing import Awaitable, Callable, Optional, Any
 import json
 from datetime import timedelta
 from app.config.settings import settings
@@ -18,6 +19,8 @@ class RedisCache:
     
     def __init__(self):
         self.redis: Optional[aioredis.Redis] = None
+        # Cliente sin decodificación para valores binarios
+        self.redis_binary: Optional[aioredis.Redis] = None
     
     async def connect(self):
         """Establece conexión con Redis"""
@@ -35,6 +38,16 @@ class RedisCache:
                 encoding="utf-8"
             )
             
+            self.redis_binary = await aioredis.from_url(
+                settings.REDIS_URL,
+                password=settings.REDIS_PASSWORD,
+                db=settings.REDIS_DB,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                decode_responses=False
+            )
+            
             # Verificar conexión
             await self.redis.ping()
             
@@ -46,6 +59,8 @@ class RedisCache:
     
     async def disconnect(self):
         """Cierra la conexión con Redis"""
+        if self.redis_binary:
+            await self.redis_binary.close()
         if self.redis:
             await self.redis.close()
             log.info("Redis connection closed")
@@ -109,6 +124,26 @@ class RedisCache:
             log.error(f"Error setting key '{key}' in cache: {e}")
             return False
     
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """Obtiene un valor binario (sin deserializar)"""
+        try:
+            return await self.redis_binary.get(key)
+        except Exception as e:
+            log.error(f"Error getting binary key '{key}' from cache: {e}")
+            return None
+    
+    async def set_bytes(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        """Guarda un valor binario tal cual"""
+        try:
+            if ttl:
+                await self.redis_binary.setex(key, ttl, value)
+            else:
+                await self.redis_binary.set(key, value)
+            return True
+        except Exception as e:
+            log.error(f"Error setting binary key '{key}' in cache: {e}")
+            return False
+    
     async def delete(self, key: str) -> bool:
         """
         Elimina una clave del cache
@@ -143,6 +178,52 @@ class RedisCache:
             log.error(f"Error getting TTL for key '{key}': {e}")
             return None
     
+    async def set_if_not_exists(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Guarda un valor solo si la clave no existe (SET NX), útil como lock
+        
+        Args:
+            key: Clave del cache
+            value: Valor a guardar (se serializa a JSON si es necesario)
+            ttl: Tiempo de vida en segundos (None = sin expiración)
+            
+        Returns:
+            True si la clave se creó
+        """
+        try:
+            if not isinstance(value, str):
+                value = json.dumps(value)
+            return bool(await self.redis.set(key, value, ex=ttl, nx=True))
+        except Exception as e:
+            log.error(f"Error setting key '{key}' (NX) in cache: {e}")
+            return False
+    
+    async def delete_if_equals(self, key: str, value: str) -> bool:
+        """
+        Elimina una clave solo si conserva el valor dado (liberar un lock propio)
+        
+        Args:
+            key: Clave del cache
+            value: Valor esperado
+            
+        Returns:
+            True si se eliminó
+        """
+        script = (
+            "if redis.call('get', KEYS[1]) == ARGV[1] then "
+            "return redis.call('del', KEYS[1]) else return 0 end"
+        )
+        try:
+            return bool(await self.redis.eval(script, 1, key, value))
+        except Exception as e:
+            log.error(f"Error releasing key '{key}': {e}")
+            return False
+    
     async def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """Incrementa un contador"""
         try:
@@ -223,6 +304,63 @@ class RedisCache:
             log.error(f"Error setting multiple keys in cache: {e}")
             return False
     
+    async def transaction(self, queue: Callable[[Any], Any]) -> Optional[list]:
+        """
+        Ejecuta varios comandos en un MULTI/EXEC (se aplican todos o ninguno)
+        
+        Args:
+            queue: Función que recibe el pipeline y encola los comandos
+            
+        Returns:
+            Resultado de cada comando (sin deserializar), o None si falla
+        """
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                queue(pipe)
+                return await pipe.execute()
+        except Exception as e:
+            log.error(f"Error executing cache transaction: {e}")
+            return None
+    
+    async def watched_transaction(
+        self,
+        keys: list[str],
+        prepare: Callable[[], Awaitable[Callable[[Any], Any]]],
+        retries: int = 3
+    ) -> Optional[list]:
+        """
+        Transacción optimista: WATCH sobre las claves, lecturas, MULTI/EXEC
+        
+        Si otro cliente modifica alguna clave vigilada antes del EXEC, la
+        transacción no se aplica y se repite desde `prepare`.
+        
+        Args:
+            keys: Claves a vigilar
+            prepare: Corrutina que hace las lecturas (ya con WATCH activo) y
+                retorna la función que encola los comandos
+            retries: Intentos antes de desistir
+            
+        Returns:
+            Resultado de cada comando, o None si Redis falla o se agotan los
+            intentos (los errores de `prepare` se propagan)
+        """
+        for _ in range(retries):
+            try:
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    await pipe.watch(*keys)
+                    queue = await prepare()
+                    pipe.multi()
+                    queue(pipe)
+                    return await pipe.execute()
+            except WatchError:
+                log.debug(f"Watched keys changed, retrying transaction: {keys}")
+            except RedisError as e:
+                log.error(f"Error executing watched cache transaction: {e}")
+                return None
+        
+        log.warning(f"Watched transaction gave up after {retries} attempts: {keys}")
+        return None
+    
     async def delete_pattern(self, pattern: str) -> int:
         """
         Elimina todas las claves que coincidan con un patrón
@@ -321,6 +459,47 @@ class RedisCache:
         except Exception as e:
             log.error(f"Error deleting hash fields from '{key}': {e}")
             return 0
+    
+    # ===== MÉTODOS PARA LISTAS (útil para logs de cambios) =====
+    
+    async def rpush(self, key: str, value: Any, max_length: Optional[int] = None) -> Optional[int]:
+        """
+        Agrega un elemento al final de una lista
+        
+        Args:
+            key: Clave de la lista
+            value: Valor (se serializa a JSON si no es string)
+            max_length: Si se indica, conserva solo los últimos N elementos
+            
+        Returns:
+            Largo de la lista tras agregar, o None si falla
+        """
+        try:
+            if not isinstance(value, str):
+                value = json.dumps(value)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(key, value)
+                if max_length:
+                    pipe.ltrim(key, -max_length, -1)
+                results = await pipe.execute()
+            return results[0]
+        except Exception as e:
+            log.error(f"Error pushing to list '{key}': {e}")
+            return None
+    
+    async def lrange(self, key: str, start: int = 0, end: int = -1) -> list:
+        """Obtiene un rango de elementos de una lista"""
+        try:
+            result = []
+            for value in await self.redis.lrange(key, start, end):
+                try:
+                    result.append(json.loads(value))
+                except json.JSONDecodeError:
+                    result.append(value)
+            return result
+        except Exception as e:
+            log.error(f"Error reading list '{key}': {e}")
+            return []
 
 
 # Singleton instance
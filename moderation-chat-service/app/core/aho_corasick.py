@@ -0,0 +1,256 @@
+"""
+Automata Aho-Corasick para buscar muchas palabras en una sola pasada
+"""
+
+from array import array
+from collections import deque
+from typing import Any, Callable, Dict, List, NamedTuple
+
+
+class Match(NamedTuple):
+    """Ocurrencia de una palabra en el texto"""
+
+    start: int
+    end: int
+    word: str
+    payload: Any = None
+
+
+def is_word_char(char: str) -> bool:
+    """True si el carácter forma parte de una palabra (Unicode: letras, dígitos, _)"""
+    return char.isalnum() or char == "_"
+
+
+class AhoCorasickMatcher:
+    """
+    Automata multi-patrón con límites de palabra Unicode
+
+    Las palabras se agregan en minúsculas y se buscan sobre el texto en
+    minúsculas; el costo de un scan depende del largo del texto y de las
+    coincidencias, no de la cantidad de palabras.
+    """
+
+    def __init__(self):
+        # Estado 0 = raíz
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        self._words: List[str] = []
+        self._payloads: List[Any] = []
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def add(self, word: str, payload: Any = None):
+        """
+        Agrega una palabra al automata
+
+        Args:
+            word: Palabra o frase (se normaliza a minúsculas)
+            payload: Dato asociado que se retorna con cada match
+        """
+        word = word.lower()
+        if not word:
+            return
+
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._output[state].append(len(self._words))
+        self._words.append(word)
+        self._payloads.append(payload)
+        self._built = False
+
+    def build(self) -> "AhoCorasickMatcher":
+        """Calcula los enlaces de fallo (BFS); se llama una vez tras agregar palabras"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+
+                # Las salidas del sufijo más largo también terminan aquí
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def export(self) -> Dict[str, array]:
+        """
+        Exporta el automata compilado como arreglos planos (para serializar)
+
+        Returns:
+            Dict con edge_offsets, edge_chars, edge_targets, fail, out_offsets,
+            out_words (índices de palabra, en el orden de add) y word_lengths
+        """
+        if not self._built:
+            self.build()
+
+        arrays = {name: array("I") for name in (
+            "edge_offsets", "edge_chars", "edge_targets", "fail", "out_offsets", "out_words", "word_lengths"
+        )}
+        arrays["edge_offsets"].append(0)
+        arrays["out_offsets"].append(0)
+
+        for state, row in enumerate(self._goto):
+            for char, target in sorted(row.items()):
+                arrays["edge_chars"].append(ord(char))
+                arrays["edge_targets"].append(target)
+            arrays["edge_offsets"].append(len(arrays["edge_chars"]))
+            arrays["out_words"].extend(self._output[state])
+            arrays["out_offsets"].append(len(arrays["out_words"]))
+
+        arrays["fail"].extend(self._fail)
+        arrays["word_lengths"].extend(len(word) for word in self._words)
+        return arrays
+
+    @property
+    def payloads(self) -> List[Any]:
+        """Payloads en el orden en que se agregaron las palabras"""
+        return self._payloads
+
+    def find_all(self, text: str, whole_words: bool = True) -> List[Match]:
+        """
+        Busca todas las palabras en una sola pasada
+
+        Args:
+            text: Texto en minúsculas
+            whole_words: Exigir límites de palabra a ambos lados
+
+        Returns:
+            Lista de matches (ordenados por posición de término)
+        """
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        words = self._words
+        payloads = self._payloads
+        length = len(text)
+
+        matches: List[Match] = []
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            if not output[state]:
+                continue
+
+            end = i + 1
+            for index in output[state]:
+                word = words[index]
+                start = end - len(word)
+                if whole_words and (
+                    (start > 0 and is_word_char(text[start - 1]) and is_word_char(word[0]))
+                    or (end < length and is_word_char(text[end]) and is_word_char(word[-1]))
+                ):
+                    continue
+                matches.append(Match(start, end, word, payloads[index]))
+
+        return matches
+
+
+class FrozenAhoCorasickMatcher:
+    """
+    Automata de solo lectura sobre arreglos planos (p. ej. un archivo mapeado)
+
+    Cargarlo no cuesta nada: las transiciones de cada estado se convierten
+    a dict recién la primera vez que un scan pasa por él, así que solo los
+    estados calientes ocupan memoria de Python.
+    """
+
+    def __init__(self, arrays: Dict[str, Any], payload_of: Callable[[int], Any], word_count: int):
+        """
+        Inicializa el automata
+
+        Args:
+            arrays: Arreglos de export() (array o memoryview de enteros)
+            payload_of: Función índice de palabra -> payload
+            word_count: Cantidad de palabras
+        """
+        self._edge_offsets = arrays["edge_offsets"]
+        self._edge_chars = arrays["edge_chars"]
+        self._edge_targets = arrays["edge_targets"]
+        self._fail = arrays["fail"]
+        self._out_offsets = arrays["out_offsets"]
+        self._out_words = arrays["out_words"]
+        self._word_lengths = arrays["word_lengths"]
+        self._payload_of = payload_of
+        self._word_count = word_count
+        self._rows: Dict[int, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return self._word_count
+
+    def _thaw(self, state: int) -> Dict[str, int]:
+        """Transiciones de un estado como dict (se cachean)"""
+        lo, hi = self._edge_offsets[state], self._edge_offsets[state + 1]
+        chars, targets = self._edge_chars, self._edge_targets
+        row = {chr(chars[k]): targets[k] for k in range(lo, hi)}
+        self._rows[state] = row
+        return row
+
+    def find_all(self, text: str, whole_words: bool = True) -> List[Match]:
+        """Busca todas las palabras en una sola pasada (mismo resultado que AhoCorasickMatcher)"""
+        rows = self._rows
+        fail = self._fail
+        out_offsets = self._out_offsets
+        out_words = self._out_words
+        word_lengths = self._word_lengths
+        length = len(text)
+
+        matches: List[Match] = []
+        state = 0
+        for i, char in enumerate(text):
+            while True:
+                row = rows.get(state)
+                if row is None:
+                    row = self._thaw(state)
+                next_state = row.get(char)
+                if next_state is not None or not state:
+                    break
+                state = fail[state]
+            state = next_state or 0
+
+            lo, hi = out_offsets[state], out_offsets[state + 1]
+            if lo == hi:
+                continue
+
+            # Lo que coincidió es exactamente el texto, no hace falta guardar las palabras
+            end = i + 1
+            for k in range(lo, hi):
+                index = out_words[k]
+                start = end - word_lengths[index]
+                word = text[start:end]
+                if whole_words and (
+                    (start > 0 and is_word_char(text[start - 1]) and is_word_char(word[0]))
+                    or (end < length and is_word_char(text[end]) and is_word_char(word[-1]))
+                ):
+                    continue
+                matches.append(Match(start, end, word, self._payload_of(index)))
+
+        return matches
@@ -0,0 +1,71 @@
+"""
+Contexto de análisis compartido por todas las etapas del pipeline de moderación
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from app.core.text_folding import FoldedText, fold_text
+
+
+class AnalysisContext:
+    """
+    Estado de un mensaje construido una sola vez y reutilizado por cada etapa
+
+    Evita que el servicio, el motor y la lista negra repitan la detección de
+    idioma, la normalización o el forward pass de Detoxify, y concentra los
+    tiempos por etapa en un solo lugar.
+    """
+
+    def __init__(self, text: str, language: Optional[str] = None):
+        """
+        Inicializa el contexto
+
+        Args:
+            text: Texto original del mensaje
+            language: Idioma ya conocido (opcional, si no se detecta después)
+        """
+        self.text = text or ""
+        self.normalized_text = " ".join(self.text.split())
+        self.text_lower = self.normalized_text.lower()
+        self.language = language
+
+        # Idiomas probables (el primero es `language`); la lista negra revisa todos
+        self.candidate_languages: List[str] = [language] if language else []
+        self._folded: Optional[FoldedText] = None
+
+        # Scores crudos de Detoxify {categoría: score}
+        self.scores: Optional[Dict[str, float]] = None
+
+        # Score del pre-filtro (None si no se aplicó)
+        self.prefilter_score: Optional[float] = None
+
+        # Tiempos por etapa en milisegundos
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def is_empty(self) -> bool:
+        """True si el mensaje no tiene contenido analizable"""
+        return not self.normalized_text
+
+    @property
+    def folded(self) -> FoldedText:
+        """Texto plegado para la lista negra (se calcula una vez, al pedirlo)"""
+        if self._folded is None:
+            self._folded = fold_text(self.normalized_text)
+        return self._folded
+
+    @contextmanager
+    def timed(self, stage: str):
+        """
+        Mide el tiempo de una etapa y lo acumula en timings
+
+        Args:
+            stage: Nombre de la etapa (ej: "language", "detoxify", "blacklist")
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
@@ -0,0 +1,326 @@
+"""
+Cache del estado de baneo por (usuario, canal)
+
+Los baneados activos son pocos: se guardan completos en un hash de Redis
+(`bans:active`, campo "usuario:canal" -> tipo y expiración) y en memoria en
+cada réplica. Un mensaje de un usuario no baneado se resuelve en memoria,
+sin MongoDB ni Redis.
+
+Cada ban/desbaneo escribe el hash e incrementa `bans:version` en una misma
+transacción (write-through); las réplicas comparan esa versión cada
+BAN_CACHE_VERSION_CHECK_MS y recargan el hash si cambió. Además cada
+CACHE_BAN_LIST_TTL el estado se reconstruye desde MongoDB y se republica.
+
+Ante cualquier fallo de Redis el cache deja de responder (lookup retorna
+None y se consulta MongoDB) hasta reconstruirse: nunca da por no baneado a
+alguien por un hash incompleto.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from app.config.cache import RedisCache
+from app.config.settings import settings
+from app.utils.exceptions import CacheException
+from app.repositories.strike_repository import StrikeRepository
+from app.utils.logger import log
+
+# Expiración de los bans permanentes
+NEVER = float("inf")
+
+
+def _ban_key(user_id: str, channel_id: str) -> str:
+    return f"{user_id}:{channel_id}"
+
+
+def _expiry(expires_at: Optional[datetime]) -> float:
+    """Timestamp de expiración (datetime naive en UTC) o NEVER"""
+    if expires_at is None:
+        return NEVER
+    return (expires_at - datetime(1970, 1, 1)).total_seconds()
+
+
+class BanCache:
+    """
+    Baneados activos en memoria, sincronizados vía Redis entre réplicas
+    """
+
+    def __init__(self, cache: RedisCache, strike_repository: StrikeRepository):
+        """
+        Inicializa el cache de baneos
+
+        Args:
+            cache: Cliente de Redis
+            strike_repository: Repository de strikes (carga inicial desde MongoDB)
+        """
+        self.cache = cache
+        self.strike_repo = strike_repository
+
+        self.cache_key_bans = "bans:active"
+        self.cache_key_version = "bans:version"
+
+        # (usuario:canal) -> timestamp de expiración
+        self._bans: Dict[str, float] = {}
+        self._version: Optional[int] = None
+        self._loaded = False
+        # Una escritura en Redis falló: hay que reconstruir desde MongoDB
+        self._dirty = False
+        self._loaded_at = 0.0
+        self._last_version_check = 0.0
+        self._version_check_interval = settings.BAN_CACHE_VERSION_CHECK_MS / 1000
+        self._reload_lock = asyncio.Lock()
+
+        self.hits = 0
+        self.fallbacks = 0
+
+    async def initialize(self):
+        """Carga los baneados activos (Redis o, si no está, MongoDB)"""
+        try:
+            await self._reload()
+        except CacheException as e:
+            log.warning(f"Ban cache not loaded, using database until Redis is available: {e}")
+
+    async def _get_remote_version(self) -> Optional[int]:
+        """Versión publicada en Redis (None si no existe o Redis no responde)"""
+        version = await self.cache.get(self.cache_key_version)
+        return int(version) if version is not None else None
+
+    async def _reload(self, from_db: bool = False):
+        """
+        Recarga el estado completo (una sola recarga a la vez)
+
+        Args:
+            from_db: Reconstruir desde MongoDB y republicar en vez de leer Redis
+
+        Raises:
+            CacheException: Si Redis no responde (el estado local queda sin usar)
+        """
+        async with self._reload_lock:
+            version = None
+            if not from_db:
+                # Versión y hash en la misma transacción: son consistentes entre sí
+                results = await self.cache.transaction(lambda pipe: (
+                    pipe.get(self.cache_key_version),
+                    pipe.hgetall(self.cache_key_bans),
+                ))
+                if results is None:
+                    self._loaded = False
+                    raise CacheException("Could not read ban list from Redis")
+                version, raw = results
+
+            if version is None:
+                bans, version = await self._rebuild()
+            else:
+                version = int(version)
+                bans = {key: float(value) for key, value in raw.items()}
+
+            now = time.time()
+            self._bans = {key: expiry for key, expiry in bans.items() if expiry > now}
+            self._version = version
+            self._loaded = True
+            self._dirty = False
+            self._loaded_at = time.monotonic()
+            self._last_version_check = self._loaded_at
+            log.info(f"Ban cache loaded: {len(self._bans)} active bans (version {version})")
+
+    async def _load_from_db(self) -> Dict[str, float]:
+        """Baneados activos desde MongoDB"""
+        strikes = await self.strike_repo.get_banned_users()
+        return {
+            _ban_key(strike.user_id, strike.channel_id): _expiry(strike.ban_expires_at)
+            for strike in strikes
+        }
+
+    async def _rebuild(self) -> Tuple[Dict[str, float], int]:
+        """
+        Reemplaza el hash en Redis por el estado de MongoDB
+
+        La versión se vigila (WATCH) desde antes de leer MongoDB: si otra
+        réplica registra un ban o desbaneo mientras tanto, su incremento
+        invalida el EXEC y la reconstrucción se repite con una lectura nueva,
+        así no se pisa un ban que la lectura no llegó a ver.
+
+        Returns:
+            (baneados publicados, versión nueva)
+
+        Raises:
+            CacheException: Si la transacción no se pudo aplicar (Redis queda como estaba)
+        """
+        loaded: Dict[str, float] = {}
+
+        async def prepare():
+            bans = await self._load_from_db()
+            loaded.clear()
+            loaded.update(bans)
+
+            def queue(pipe):
+                pipe.delete(self.cache_key_bans)
+                if bans:
+                    pipe.hset(self.cache_key_bans, mapping={key: repr(expiry) for key, expiry in bans.items()})
+                pipe.incr(self.cache_key_version)
+            return queue
+
+        results = await self.cache.watched_transaction([self.cache_key_version], prepare)
+        if results is None:
+            # Sin publicar, las demás réplicas no verían este estado
+            self._loaded = False
+            raise CacheException("Could not publish ban list to Redis")
+        return loaded, results[-1]
+
+    async def _refresh_if_stale(self):
+        """Chequea la versión en Redis como mucho cada BAN_CACHE_VERSION_CHECK_MS"""
+        now = time.monotonic()
+
+        if self._dirty or not self._loaded:
+            await self._reload(from_db=self._dirty)
+            return
+
+        if now - self._loaded_at >= settings.CACHE_BAN_LIST_TTL:
+            await self._reload(from_db=True)
+            return
+
+        if now - self._last_version_check < self._version_check_interval:
+            return
+
+        self._last_version_check = now
+        version = await self._get_remote_version()
+        if version != self._version:
+            log.debug(f"Ban cache version changed: {self._version} -> {version}")
+            await self._reload()
+
+    async def lookup(self, user_id: str, channel_id: str) -> Optional[bool]:
+        """
+        Estado de baneo desde memoria
+
+        Args:
+            user_id: ID del usuario
+            channel_id: ID del canal
+
+        Returns:
+            False si no está baneado; True si tiene un ban activo; None si
+            hay que consultar MongoDB (ban temporal ya vencido o cache no
+            disponible)
+        """
+        try:
+            await self._refresh_if_stale()
+        except Exception as e:
+            log.warning(f"Ban cache unavailable, using database: {e}")
+            self.fallbacks += 1
+            return None
+
+        expiry = self._bans.get(_ban_key(user_id, channel_id))
+        if expiry is None:
+            self.hits += 1
+            return False
+
+        if expiry <= time.time():
+            # Vencido: MongoDB hace el desbaneo y lo invalida
+            self.fallbacks += 1
+            return None
+
+        self.hits += 1
+        return True
+
+    async def _write(self, queue: Callable, apply_local: Callable[[], None]):
+        """
+        Aplica una escritura al hash junto con el incremento de versión
+
+        Si la transacción falla, el estado en Redis ya no es confiable: la
+        próxima consulta lo reconstruye desde MongoDB.
+
+        Args:
+            queue: Función que encola en el pipeline la escritura al hash
+            apply_local: Aplica el mismo cambio al estado en memoria
+        """
+        def queue_with_version(pipe):
+            queue(pipe)
+            pipe.incr(self.cache_key_version)
+
+        apply_local()
+        results = await self.cache.transaction(queue_with_version)
+        # Una recarga que terminó durante la escritura pudo reemplazar el estado local
+        apply_local()
+        if results is None:
+            log.warning("Ban cache write failed, rebuilding from database on next lookup")
+            self._dirty = True
+            return
+
+        self._adopt_version(results[-1])
+
+    def _adopt_version(self, version: int):
+        """Si la versión es la siguiente a la local, el cambio propio ya está aplicado"""
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+
+    async def on_ban(self, user_id: str, channel_id: str, expires_at: Optional[datetime]):
+        """
+        Registra un ban (write-through)
+
+        Args:
+            user_id: ID del usuario
+            channel_id: ID del canal
+            expires_at: Expiración del ban (None = permanente)
+        """
+        key = _ban_key(user_id, channel_id)
+        expiry = _expiry(expires_at)
+        await self._write(
+            lambda pipe: pipe.hset(self.cache_key_bans, key, repr(expiry)),
+            lambda: self._bans.__setitem__(key, expiry)
+        )
+
+    async def on_unban(self, user_id: str, channel_id: str):
+        """
+        Registra un desbaneo (write-through)
+
+        Args:
+            user_id: ID del usuario
+            channel_id: ID del canal
+        """
+        key = _ban_key(user_id, channel_id)
+        await self._write(
+            lambda pipe: pipe.hdel(self.cache_key_bans, key),
+            lambda: self._bans.pop(key, None)
+        )
+
+    async def prune_expired(self) -> int:
+        """
+        Quita del hash los bans temporales vencidos
+
+        Returns:
+            Cantidad de bans quitados
+        """
+        expired = []
+
+        async def prepare():
+            # Con WATCH activo: un ban nuevo del mismo usuario repite la lectura
+            now = time.time()
+            raw = await self.cache.hgetall(self.cache_key_bans)
+            expired[:] = [key for key, value in raw.items() if float(value) <= now]
+
+            def queue(pipe):
+                if expired:
+                    pipe.hdel(self.cache_key_bans, *expired)
+                    pipe.incr(self.cache_key_version)
+            return queue
+
+        results = await self.cache.watched_transaction([self.cache_key_version], prepare)
+        if results is None or not expired:
+            return 0
+
+        now = time.time()
+        for key in expired:
+            # Solo si sigue vencido (pudo llegar un ban nuevo después del EXEC)
+            if self._bans.get(key, NEVER) <= now:
+                del self._bans[key]
+        self._adopt_version(results[-1])
+        return len(expired)
+
+    def get_metrics(self) -> Dict:
+        """Métricas del cache de baneos"""
+        return {
+            "active_bans": len(self._bans),
+            "version": self._version,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+        }
@@ -0,0 +1,292 @@
+"""
+Importación masiva de la lista negra desde NDJSON o CSV (en streaming)
+"""
+
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from app.config.settings import settings
+from app.core.blacklist_manager import BlacklistManager
+from app.core.regex_safety import analyze_pattern
+from app.models.blacklist_word import BlacklistWord
+from app.repositories.blacklist_repository import BlacklistRepository
+from app.utils.exceptions import BlacklistException
+from app.utils.logger import log
+
+SUPPORTED_FORMATS = ("ndjson", "csv")
+
+# Campos que se aceptan de cada fila (el resto se ignora)
+IMPORT_FIELDS = ("word", "language", "category", "severity", "is_regex", "notes")
+
+# Errores por fila que se reportan en la respuesta
+MAX_REPORTED_ERRORS = 50
+
+TRUE_VALUES = {"1", "true", "yes", "y", "si", "sí"}
+
+
+def detect_format(filename: Optional[str], explicit: Optional[str] = None) -> str:
+    """
+    Determina el formato del archivo
+
+    Args:
+        filename: Nombre del archivo subido
+        explicit: Formato indicado por el cliente (tiene prioridad)
+
+    Returns:
+        'ndjson' o 'csv'
+    """
+    if explicit:
+        fmt = explicit.lower()
+    elif filename and filename.lower().endswith(".csv"):
+        fmt = "csv"
+    else:
+        fmt = "ndjson"
+
+    if fmt not in SUPPORTED_FORMATS:
+        raise BlacklistException(f"Unsupported import format '{fmt}'")
+    return fmt
+
+
+async def iter_text_lines(stream, chunk_size: int = 64 * 1024) -> AsyncIterator[str]:
+    """
+    Lee un stream binario por bloques y entrega líneas de texto
+
+    Args:
+        stream: Objeto con `async read(n)` (p. ej. UploadFile)
+        chunk_size: Bytes por lectura
+
+    Yields:
+        Líneas sin el salto de línea
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+
+    while True:
+        chunk = await stream.read(chunk_size)
+        if not chunk:
+            break
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def _parse_bool(value) -> bool:
+    """Interpreta booleanos de CSV/JSON"""
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+async def iter_rows(
+    lines: AsyncIterator[str],
+    fmt: str
+) -> AsyncIterator[Tuple[int, Optional[Dict], Optional[str]]]:
+    """
+    Convierte líneas en filas sin cargar el archivo completo
+
+    En CSV la primera línea no vacía es el encabezado (debe incluir "word").
+
+    Args:
+        lines: Líneas del archivo
+        fmt: 'ndjson' o 'csv'
+
+    Yields:
+        Tuplas (número de línea, fila o None, error o None)
+    """
+    header: Optional[List[str]] = None
+    line_number = 0
+
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+
+        if fmt == "ndjson":
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Row must be a JSON object"
+                continue
+            yield line_number, row, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip().lower() for column in values]
+            if "word" not in header:
+                raise BlacklistException("CSV header must include a 'word' column")
+            continue
+        if len(values) > len(header):
+            yield line_number, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield line_number, dict(zip(header, values)), None
+
+
+class BlacklistImporter:
+    """
+    Importa palabras en lotes sin orden (insert_many), omitiendo duplicados
+
+    Las filas se validan a medida que llegan; en memoria solo queda el lote
+    actual y las claves ya vistas. Al final se recompila la lista negra una
+    única vez.
+    """
+
+    def __init__(
+        self,
+        repository: BlacklistRepository,
+        manager: BlacklistManager,
+        chunk_size: Optional[int] = None
+    ):
+        """
+        Inicializa el importador
+
+        Args:
+            repository: Repository de palabras prohibidas
+            manager: Gestor de la lista negra (para el rebuild final)
+            chunk_size: Filas por insert_many (por defecto BLACKLIST_IMPORT_CHUNK_SIZE)
+        """
+        self.repository = repository
+        self.manager = manager
+        self.chunk_size = chunk_size or settings.BLACKLIST_IMPORT_CHUNK_SIZE
+
+    def _build_word(
+        self,
+        row: Dict,
+        defaults: Dict[str, str],
+        added_by: Optional[str]
+    ) -> BlacklistWord:
+        """
+        Valida una fila y crea el modelo
+
+        Args:
+            row: Fila cruda
+            defaults: Valores para campos vacíos (language, category, severity)
+            added_by: Usuario que importa
+
+        Returns:
+            BlacklistWord validado
+
+        Raises:
+            ValueError: Si la fila no es válida
+        """
+        fields = {}
+        for name in IMPORT_FIELDS:
+            value = row.get(name)
+            if isinstance(value, str):
+                value = value.strip()
+            if value in (None, ""):
+                value = defaults.get(name)
+            if value is not None:
+                fields[name] = value
+
+        if "is_regex" in fields:
+            fields["is_regex"] = _parse_bool(fields["is_regex"])
+        if "language" in fields:
+            fields["language"] = str(fields["language"]).lower()
+
+        try:
+            word = BlacklistWord(**fields, added_by=added_by)
+        except ValidationError as e:
+            error = e.errors()[0]
+            location = ".".join(str(part) for part in error.get("loc", ()))
+            raise ValueError(f"{location}: {error.get('msg')}")
+
+        if word.is_regex:
+            issues = analyze_pattern(word.word)
+            if issues:
+                raise ValueError(f"Unsafe regex pattern: {'; '.join(issues)}")
+
+        return word
+
+    async def import_lines(
+        self,
+        lines: AsyncIterator[str],
+        fmt: str,
+        added_by: Optional[str] = None,
+        defaults: Optional[Dict[str, str]] = None
+    ) -> Dict:
+        """
+        Importa las filas de un archivo
+
+        Args:
+            lines: Líneas del archivo (stream)
+            fmt: 'ndjson' o 'csv'
+            added_by: Usuario que importa
+            defaults: Valores por defecto para language, category y severity
+
+        Returns:
+            Dict con total_rows, inserted, duplicates, invalid, errors y
+            snapshot_version
+        """
+        defaults = {k: v for k, v in (defaults or {}).items() if v}
+        result = {
+            "total_rows": 0,
+            "inserted": 0,
+            "duplicates": 0,
+            "invalid": 0,
+            "errors": [],
+            "snapshot_version": None,
+        }
+        seen: Set[Tuple[str, str]] = set()
+        batch: List[BlacklistWord] = []
+
+        def record_error(line_number: int, error: str):
+            result["invalid"] += 1
+            if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                result["errors"].append({"line": line_number, "error": error})
+
+        async def flush():
+            inserted, duplicates = await self.repository.bulk_insert_skip_duplicates(batch)
+            result["inserted"] += inserted
+            result["duplicates"] += duplicates
+            batch.clear()
+
+        try:
+            async for line_number, row, error in iter_rows(lines, fmt):
+                result["total_rows"] += 1
+                if error:
+                    record_error(line_number, error)
+                    continue
+
+                try:
+                    word = self._build_word(row, defaults, added_by)
+                except ValueError as e:
+                    record_error(line_number, str(e))
+                    continue
+
+                # Duplicados dentro del mismo archivo (mismo criterio que el índice único)
+                key = (word.word, word.language)
+                if key in seen:
+                    result["duplicates"] += 1
+                    continue
+                seen.add(key)
+
+                batch.append(word)
+                if len(batch) >= self.chunk_size:
+                    await flush()
+
+            if batch:
+                await flush()
+
+        finally:
+            # Un único rebuild, aunque la importación se corte a mitad
+            if result["inserted"]:
+                await self.manager.force_refresh()
+                info = self.manager.get_snapshot_info()
+                result["snapshot_version"] = info["version"] if info else None
+
+        log.info(
+            f"Blacklist import: {result['inserted']} inserted, {result['duplicates']} duplicates, "
+            f"{result['invalid']} invalid ({result['total_rows']} rows)"
+        )
+        return result
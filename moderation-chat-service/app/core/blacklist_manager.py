@@ -1,12 +1,33 @@
 """
-Gestor de lista negra con cache en Redis
+Gestor de lista negra con snapshot compilado en proceso y versión en Redis
 """
 
-from typing import Dict, List, Set, Optional
-import re
+from typing import Dict, List, Optional
+import asyncio
+import time
+import uuid
 from datetime import datetime, timedelta
 from app.repositories.blacklist_repository import BlacklistRepository
 from app.models.blacklist_word import BlacklistWord
+from app.core.analysis_context import AnalysisContext
+from app.core.blacklist_snapshot import (
+    BlacklistChange,
+    BlacklistRule,
+    BlacklistSnapshot,
+    GLOBAL_LANGUAGE,
+    SEVERITY_ORDER,
+    rules_fingerprint,
+)
+from app.core.blacklist_snapshot_file import (
+    SnapshotFormatError,
+    dump_snapshot,
+    load_snapshot,
+    read_header,
+    read_snapshot_file,
+    write_snapshot_file,
+)
+from app.core.regex_safety import RegexStats, analyze_pattern
+from app.core.text_folding import fold_text
 from app.config.cache import RedisCache
 from app.config.settings import settings
 from app.utils.logger import log
@@ -15,7 +36,17 @@ from app.utils.exceptions import BlacklistException
 
 class BlacklistManager:
     """
-    Gestor de listas negras con cache en Redis
+    Gestor de listas negras
+    
+    Mantiene un snapshot compilado en proceso (automatas, patrones y
+    severidades) marcado con una versión guardada en Redis; solo se
+    recompila cuando otra réplica (o esta) publica una versión nueva.
+    Los refresh son single-flight por proceso y coordinados entre réplicas
+    con un lock en Redis.
+    
+    Las altas y bajas individuales se publican en un log de cambios en
+    Redis (una entrada por versión); las réplicas aplican solo esos deltas
+    sobre su snapshot, sin releer MongoDB ni recompilar todo.
     """
     
     def __init__(
@@ -34,103 +65,420 @@ class BlacklistManager:
         self.cache = cache
         self.cache_ttl = settings.CACHE_BLACKLIST_TTL
         
-        # Prefijos de cache
-        self.cache_prefix_words = "blacklist:words"
-        self.cache_prefix_patterns = "blacklist:patterns"
+        # Claves en Redis (compartidas entre réplicas)
+        self.cache_key_version = "blacklist:version"
+        self.cache_key_lock = "blacklist:lock"
+        self.cache_prefix_rules = "blacklist:rules"
+        self.cache_key_changes = "blacklist:changes"
+        self.cache_key_snapshots = "blacklist:snapshots"  # versión -> crc32 del snapshot compilado
+        self.cache_prefix_snapshot = "blacklist:snapshot"
+        
+        # Snapshot compilado en proceso y control de chequeo de versión
+        self._snapshot: Optional[BlacklistSnapshot] = None
+        self._version_check_interval = settings.BLACKLIST_VERSION_CHECK_MS / 1000.0
+        self._last_version_check = 0.0
+        self._last_refresh = 0.0
+        
+        # Refresh en segundo plano (single-flight por proceso)
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._persist_task: Optional[asyncio.Task] = None
+        
+        # Serializa todo lo que instala un snapshot (catch-up, revalidación,
+        # recarga forzada): los cambios se aplican en orden y la versión no retrocede
+        self._install_lock = asyncio.Lock()
+        
+        # Tiempo de CPU por patrón regex
+        self.regex_stats = RegexStats()
     
     async def initialize(self):
-        """Inicializa el cache al arrancar el servicio"""
-        log.info("Initializing blacklist cache...")
-        await self._refresh_cache()
-        log.info("✅ Blacklist cache initialized")
+        """Compila el snapshot al arrancar el servicio"""
+        log.info("Initializing blacklist snapshot...")
+        await self._get_snapshot()
+        log.info("✅ Blacklist snapshot initialized")
     
-    async def _refresh_cache(self):
-        """Refresca el cache desde la base de datos"""
+    async def _get_remote_version(self) -> Optional[int]:
+        """
+        Lee la versión de la lista negra desde Redis
+        
+        Returns:
+            Versión actual o None si no existe o Redis no responde
+        """
+        version = await self.cache.get(self.cache_key_version)
         try:
-            # Obtener todas las palabras activas
-            all_words = await self.repository.get_all_active()
-            
-            # Agrupar por idioma
-            words_by_lang: Dict[str, List[str]] = {}
-            patterns_by_lang: Dict[str, List[str]] = {}
-            
-            for word_obj in all_words:
-                lang = word_obj.language
-                
-                if lang not in words_by_lang:
-                    words_by_lang[lang] = []
-                    patterns_by_lang[lang] = []
-                
-                if word_obj.is_regex:
-                    patterns_by_lang[lang].append(word_obj.word)
-                else:
-                    words_by_lang[lang].append(word_obj.word.lower())
-            
-            # Guardar en Redis
-            for lang, words in words_by_lang.items():
-                cache_key = f"{self.cache_prefix_words}:{lang}"
-                await self.cache.set(cache_key, words, ttl=self.cache_ttl)
-            
-            for lang, patterns in patterns_by_lang.items():
-                cache_key = f"{self.cache_prefix_patterns}:{lang}"
-                await self.cache.set(cache_key, patterns, ttl=self.cache_ttl)
-            
-            log.info(f"Cache refreshed with {len(all_words)} words")
+            return int(version) if version is not None else None
+        except (TypeError, ValueError):
+            return None
+    
+    async def _load_rules_from_db(self) -> List[BlacklistRule]:
+        """Lee todas las palabras activas desde MongoDB"""
+        all_words = await self.repository.get_all_active()
+        return [BlacklistRule.from_word(word) for word in all_words]
+    
+    async def _publish_rules(self, version: int, rules: List[BlacklistRule]):
+        """Publica las reglas de una versión en Redis para las demás réplicas"""
+        await self.cache.set(
+            f"{self.cache_prefix_rules}:{version}",
+            [list(rule) for rule in rules],
+            ttl=self.cache_ttl
+        )
+    
+    async def _load_rules(self, version: int) -> List[BlacklistRule]:
+        """
+        Obtiene las reglas de una versión evitando que todas las réplicas
+        lean MongoDB a la vez
+        
+        1. Copia publicada en Redis para esa versión
+        2. Si no existe, solo quien toma el lock de Redis lee MongoDB y la
+           publica; el resto espera la copia publicada
+        3. Si la espera vence, se lee MongoDB directamente
+        
+        Args:
+            version: Versión buscada
             
-        except Exception as e:
-            log.error(f"Error refreshing blacklist cache: {e}")
-            raise BlacklistException(f"Failed to refresh cache: {e}")
+        Returns:
+            Lista de reglas
+        """
+        rules_key = f"{self.cache_prefix_rules}:{version}"
+        
+        cached = await self.cache.get(rules_key)
+        if isinstance(cached, list):
+            return [BlacklistRule(*rule) for rule in cached]
+        
+        token = uuid.uuid4().hex
+        if await self.cache.set_if_not_exists(
+            self.cache_key_lock, token, ttl=settings.BLACKLIST_REFRESH_LOCK_TTL
+        ):
+            try:
+                rules = await self._load_rules_from_db()
+                await self._publish_rules(version, rules)
+                return rules
+            finally:
+                await self.cache.delete_if_equals(self.cache_key_lock, token)
+        
+        # Otra réplica está cargando: esperar su copia
+        deadline = time.monotonic() + settings.BLACKLIST_REFRESH_WAIT_MS / 1000.0
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            cached = await self.cache.get(rules_key)
+            if isinstance(cached, list):
+                return [BlacklistRule(*rule) for rule in cached]
+        
+        log.warning(f"Timed out waiting for blacklist v{version} from another replica")
+        return await self._load_rules_from_db()
     
-    async def _get_words_from_cache(self, language: str) -> Set[str]:
+    def _install_snapshot(self, rules: List[BlacklistRule], version: int) -> BlacklistSnapshot:
         """
-        Obtiene palabras del cache
+        Compila e instala un snapshot nuevo
         
         Args:
-            language: Código de idioma
+            rules: Reglas activas
+            version: Versión que tendrá el snapshot
             
         Returns:
-            Set de palabras prohibidas
+            Snapshot instalado
         """
-        cache_key = f"{self.cache_prefix_words}:{language}"
-        words = await self.cache.get(cache_key)
+        snapshot = BlacklistSnapshot.from_rules(rules, version)
         
-        if words is None:
-            # Cache miss - refrescar
-            await self._refresh_cache()
-            words = await self.cache.get(cache_key)
+        # Reemplazo atómico: los checks en curso siguen con el anterior
+        self._snapshot = snapshot
+        self._last_refresh = time.monotonic()
         
-        return set(words) if words else set()
+        log.info(f"Blacklist snapshot v{version} built with {snapshot.word_count} words")
+        
+        # Serializar en segundo plano para el arranque de otros workers/réplicas
+        if self._persist_task is None or self._persist_task.done():
+            self._persist_task = asyncio.create_task(self._persist_snapshot(snapshot))
+        return snapshot
     
-    async def _get_patterns_from_cache(self, language: str) -> List[re.Pattern]:
+    async def _persist_snapshot(self, snapshot: BlacklistSnapshot):
         """
-        Obtiene patrones regex del cache
+        Guarda el snapshot compilado en disco y en Redis, y publica su checksum
         
         Args:
-            language: Código de idioma
+            snapshot: Snapshot recién compilado
+        """
+        directory = settings.BLACKLIST_SNAPSHOT_DIR
+        if not directory and not settings.BLACKLIST_SNAPSHOT_REDIS:
+            return
+        
+        field = str(snapshot.version)
+        try:
+            if await self.cache.hget(self.cache_key_snapshots, field) is not None:
+                return  # Otra réplica ya lo publicó
+            
+            data = await asyncio.to_thread(dump_snapshot, snapshot)
+            _, checksum, _, _ = read_header(data)
+            
+            if directory:
+                await asyncio.to_thread(write_snapshot_file, directory, data)
+            if settings.BLACKLIST_SNAPSHOT_REDIS:
+                await self.cache.set_bytes(
+                    f"{self.cache_prefix_snapshot}:{snapshot.version}", data, ttl=self.cache_ttl
+                )
+            await self.cache.hset(self.cache_key_snapshots, field, checksum)
+            
+            log.info(f"Blacklist snapshot v{snapshot.version} saved ({len(data) / 1024:.0f} KB)")
+        except Exception as e:
+            log.warning(f"Could not save compiled blacklist snapshot: {e}")
+    
+    async def _load_compiled(self, version: int) -> Optional[BlacklistSnapshot]:
+        """
+        Carga el snapshot compilado de una versión (disco con mmap, luego Redis)
+        
+        Args:
+            version: Versión buscada
             
         Returns:
-            Lista de patrones compilados
+            Snapshot o None si no hay uno publicado y válido
         """
-        cache_key = f"{self.cache_prefix_patterns}:{language}"
-        pattern_strings = await self.cache.get(cache_key)
+        checksum = await self.cache.hget(self.cache_key_snapshots, str(version))
+        if not isinstance(checksum, int):
+            return None
+        
+        directory = settings.BLACKLIST_SNAPSHOT_DIR
+        snapshot = None
         
-        if pattern_strings is None:
-            # Cache miss - refrescar
-            await self._refresh_cache()
-            pattern_strings = await self.cache.get(cache_key)
+        try:
+            if directory:
+                snapshot = await asyncio.to_thread(read_snapshot_file, directory, version, checksum)
+            
+            if snapshot is None and settings.BLACKLIST_SNAPSHOT_REDIS:
+                data = await self.cache.get_bytes(f"{self.cache_prefix_snapshot}:{version}")
+                if not data:
+                    return None
+                snapshot = await asyncio.to_thread(load_snapshot, data, checksum)
+                if directory:
+                    await asyncio.to_thread(write_snapshot_file, directory, data)
+        
+        except (OSError, SnapshotFormatError) as e:
+            log.warning(f"Could not load compiled blacklist snapshot v{version}: {e}")
+            return None
         
-        if not pattern_strings:
-            return []
+        if snapshot is None or snapshot.folding != settings.BLACKLIST_TEXT_FOLDING:
+            return None
+        return snapshot
+    
+    async def _rebuild_snapshot(self, version: int) -> BlacklistSnapshot:
+        """
+        Obtiene el snapshot de una versión (precompilado si hay uno publicado,
+        si no compilándolo desde las reglas)
         
-        # Compilar patrones
-        compiled_patterns = []
-        for pattern_str in pattern_strings:
+        Args:
+            version: Versión que tendrá el snapshot
+            
+        Returns:
+            Snapshot nuevo (ya instalado)
+        """
+        try:
+            compiled = await self._load_compiled(version)
+            if compiled is not None:
+                self._snapshot = compiled
+                self._last_refresh = time.monotonic()
+                log.info(f"Blacklist snapshot v{version} loaded precompiled ({compiled.word_count} words)")
+                return compiled
+            
+            return self._install_snapshot(await self._load_rules(version), version)
+        except Exception as e:
+            log.error(f"Error building blacklist snapshot: {e}")
+            raise BlacklistException(f"Failed to build snapshot: {e}")
+    
+    async def _revalidate(self):
+        """
+        Refresh proactivo antes de que el snapshot expire
+        
+        Solo la réplica con el lock relee MongoDB (captura cambios hechos
+        fuera del servicio); si el contenido cambió publica una versión
+        nueva, que el resto toma desde Redis.
+        """
+        async with self._install_lock:
+            token = uuid.uuid4().hex
+            if not await self.cache.set_if_not_exists(
+                self.cache_key_lock, token, ttl=settings.BLACKLIST_REFRESH_LOCK_TTL
+            ):
+                # Otra réplica revalida; si hay cambios se verá en la versión
+                self._last_refresh = time.monotonic()
+                return
+            
             try:
-                compiled_patterns.append(re.compile(pattern_str, re.IGNORECASE))
-            except re.error as e:
-                log.error(f"Invalid regex pattern '{pattern_str}': {e}")
+                rules = await self._load_rules_from_db()
+                snapshot = self._snapshot
+            
+                if snapshot is not None and rules_fingerprint(rules) == snapshot.fingerprint:
+                    await self._publish_rules(snapshot.version, rules)
+                    self._last_refresh = time.monotonic()
+                    return
+            
+                version = await self.cache.increment(self.cache_key_version)
+                if version is None:
+                    version = (snapshot.version if snapshot else 0) + 1
+                await self._publish_rules(version, rules)
+                self._install_snapshot(rules, version)
+            finally:
+                await self.cache.delete_if_equals(self.cache_key_lock, token)
+    
+    async def _initial_load(self) -> BlacklistSnapshot:
+        """Primera carga del snapshot (versión actual en Redis)"""
+        async with self._install_lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            version = await self._get_remote_version()
+            return await self._rebuild_snapshot(version or 0)
+    
+    async def _catch_up(self, version: int) -> BlacklistSnapshot:
+        """
+        Lleva el snapshot a una versión aplicando el log de cambios
+        
+        Si faltan entradas entre la versión local y la buscada (log
+        recortado, réplica muy atrasada o Redis reiniciado) se recompila
+        completo.
+        
+        Args:
+            version: Versión publicada en Redis
+            
+        Returns:
+            Snapshot instalado
+        """
+        async with self._install_lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return await self._rebuild_snapshot(version)
+            
+            if version <= snapshot.version:
+                # Pedido viejo (otro catch-up ya llegó más lejos), salvo que Redis
+                # se haya reiniciado y la versión publicada sea menor que la local
+                remote = await self._get_remote_version()
+                if remote is None or remote >= snapshot.version:
+                    return snapshot
+                log.info(f"Blacklist version went back ({snapshot.version} -> {remote}), rebuilding")
+                return await self._rebuild_snapshot(remote)
+            
+            entries = await self.cache.lrange(self.cache_key_changes)
+            
+            changes = sorted(
+                (BlacklistChange.from_entry(entry) for entry in entries if isinstance(entry, dict)),
+                key=lambda change: change.version
+            )
+            pending = [c for c in changes if snapshot.version < c.version <= version]
+            
+            expected = range(snapshot.version + 1, version + 1)
+            if [c.version for c in pending] != list(expected):
+                log.info(f"Blacklist change log incomplete for v{snapshot.version}->v{version}, rebuilding")
+                return await self._rebuild_snapshot(version)
+            
+            return self._install_deltas(snapshot, pending)
+    
+    def _install_deltas(self, snapshot: BlacklistSnapshot, changes: List[BlacklistChange]) -> BlacklistSnapshot:
+        """
+        Aplica cambios sobre un snapshot e instala el resultado
+        
+        Args:
+            snapshot: Snapshot base
+            changes: Cambios consecutivos a aplicar
+            
+        Returns:
+            Snapshot instalado
+        """
+        updated = snapshot.apply(changes, max_pending=settings.BLACKLIST_MAX_PENDING_DELTAS)
+        self._snapshot = updated
+        self._last_refresh = time.monotonic()
         
-        return compiled_patterns
+        log.info(
+            f"Blacklist snapshot v{snapshot.version}->v{updated.version} "
+            f"({len(changes)} changes, {updated.word_count} words)"
+        )
+        return updated
+    
+    async def _record_change(self, op: str, rule_id: str, rule: Optional[BlacklistRule] = None):
+        """
+        Publica un alta o baja en el log de cambios y la aplica localmente
+        
+        Args:
+            op: 'add' o 'remove'
+            rule_id: ID de la regla
+            rule: Regla agregada (solo en 'add')
+        """
+        version = await self.cache.increment(self.cache_key_version)
+        
+        if version is None:
+            # Redis no disponible: al menos esta réplica queda actualizada
+            snapshot = await self._get_snapshot()
+            self._install_deltas(snapshot, [BlacklistChange(snapshot.version + 1, op, rule_id, rule)])
+            return
+        
+        change = BlacklistChange(version, op, rule_id, rule)
+        await self.cache.rpush(
+            self.cache_key_changes,
+            change.to_entry(),
+            max_length=settings.BLACKLIST_CHANGELOG_SIZE
+        )
+        await self._catch_up(version)
+    
+    def _schedule_refresh(self, version: Optional[int] = None):
+        """
+        Lanza un refresh en segundo plano si no hay otro en curso
+        
+        Args:
+            version: Versión a alcanzar (None = revalidación proactiva)
+        """
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        
+        refresh = self._catch_up(version) if version is not None else self._revalidate()
+        self._refresh_task = asyncio.create_task(refresh)
+        self._refresh_task.add_done_callback(self._on_refresh_done)
+    
+    def _on_refresh_done(self, task: asyncio.Task):
+        """Registra errores del refresh en segundo plano (el snapshot anterior sigue vigente)"""
+        if not task.cancelled() and task.exception() is not None:
+            log.error(f"Background blacklist refresh failed: {task.exception()}")
+    
+    async def _refresh_cache(self):
+        """Recompila el snapshot y publica una versión nueva para las demás réplicas"""
+        async with self._install_lock:
+            rules = await self._load_rules_from_db()
+            version = await self.cache.increment(self.cache_key_version)
+            if version is None:
+                # Redis no disponible: al menos esta réplica queda actualizada
+                version = (self._snapshot.version if self._snapshot else 0) + 1
+            await self._publish_rules(version, rules)
+            self._install_snapshot(rules, version)
+    
+    async def _get_snapshot(self) -> BlacklistSnapshot:
+        """
+        Retorna el snapshot vigente (stale-while-revalidate)
+        
+        La versión en Redis se consulta como máximo cada
+        BLACKLIST_VERSION_CHECK_MS; entre chequeos no hay I/O. Si cambió, o
+        si el snapshot se acerca a CACHE_BLACKLIST_TTL, se refresca en
+        segundo plano mientras se sigue sirviendo el snapshot actual. Solo
+        sin snapshot (arranque) se espera al refresh.
+        
+        Returns:
+            Snapshot compilado
+        """
+        snapshot = self._snapshot
+        now = time.monotonic()
+        
+        if snapshot is None:
+            # Arranque: todos los requests esperan el mismo refresh
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._initial_load())
+            await asyncio.shield(self._refresh_task)
+            return self._snapshot or await self._initial_load()
+        
+        if now - self._last_version_check < self._version_check_interval:
+            return snapshot
+        
+        self._last_version_check = now
+        version = await self._get_remote_version()
+        
+        if version is not None and version != snapshot.version:
+            log.info(f"Blacklist version changed: {snapshot.version} -> {version}")
+            self._schedule_refresh(version)
+        elif now - self._last_refresh >= self.cache_ttl * settings.BLACKLIST_REFRESH_AHEAD_RATIO:
+            self._schedule_refresh()
+        
+        return snapshot
     
     async def check_text(self, text: str, language: str) -> Dict:
         """
@@ -146,45 +494,113 @@ class BlacklistManager:
                 'has_blacklisted_words': bool,
                 'detected_words': List[str],
                 'count': int,
-                'max_severity': str
+                'max_severity': str,
+                'matches': List[Dict]  # offsets + regla, categoría y severidad
             }
         """
         if not text or not text.strip():
-            return {
-                'has_blacklisted_words': False,
-                'detected_words': [],
-                'count': 0,
-                'max_severity': 'none'
-            }
+            return self._empty_check_result()
+        
+        return await self._check(text, text.lower(), [language])
+    
+    async def check_context(self, context: AnalysisContext) -> Dict:
+        """
+        Verifica la lista negra usando el contexto compartido del mensaje
+        
+        Reutiliza el texto normalizado, su versión en minúsculas y los
+        idiomas ya detectados, sin recalcularlos. Con BLACKLIST_MULTI_LANGUAGE
+        se revisan todos los idiomas candidatos en el mismo scan.
+        
+        Args:
+            context: Contexto de análisis (con idioma ya resuelto)
+            
+        Returns:
+            Dict con el mismo formato que check_text
+        """
+        if context.is_empty:
+            return self._empty_check_result()
+        
+        with context.timed('blacklist'):
+            return await self._check(
+                context.normalized_text,
+                context.text_lower,
+                context.candidate_languages or [context.language],
+                context=context
+            )
+    
+    def _empty_check_result(self) -> Dict:
+        """Resultado para textos vacíos"""
+        return {
+            'has_blacklisted_words': False,
+            'detected_words': [],
+            'count': 0,
+            'max_severity': 'none',
+            'matches': []
+        }
+    
+    async def _check(
+        self,
+        text: str,
+        text_lower: str,
+        languages: List[str],
+        context: Optional[AnalysisContext] = None
+    ) -> Dict:
+        """
+        Verificación contra la lista negra
         
-        text_lower = text.lower()
+        Args:
+            text: Texto original (para patrones regex)
+            text_lower: Texto en minúsculas (para palabras exactas)
+            languages: Idiomas candidatos (se agregan las reglas globales)
+            context: Contexto del mensaje (reutiliza su texto plegado)
+            
+        Returns:
+            Dict con resultado de la verificación
+        """
         detected_words = []
+        matches = []
 
         try:
-            # 1. Verificar palabras exactas
-            words_set = await self._get_words_from_cache(language)
-            for word in words_set:
-                # Buscar palabra completa (con límites de palabra)
-                if re.search(rf'\b{re.escape(word)}\b', text_lower):
-                    detected_words.append(word)
+            snapshot = await self._get_snapshot()
+            languages = {*languages, GLOBAL_LANGUAGE}
+            
+            # 1. Verificar palabras exactas (una sola pasada, límites de palabra Unicode)
+            if snapshot.folding:
+                # Texto plegado; los offsets se traducen al texto original
+                folded = context.folded if context is not None else fold_text(text)
+                for match in snapshot.find_words(languages, folded.text):
+                    if not folded.runs_compatible(match.start, match.end, match.payload.word):
+                        # Letras dobles distintas: "pera" no es "perra"
+                        continue
+                    start, end = folded.span(match.start, match.end)
+                    detected_words.append(match.payload.word)
+                    matches.append(self._format_match(text[start:end], start, end, match.payload))
+            else:
+                for match in snapshot.find_words(languages, text_lower):
+                    detected_words.append(match.word)
+                    matches.append(self._format_match(match.word, match.start, match.end, match.payload))
 
-            # 2. Verificar patrones regex
-            patterns = await self._get_patterns_from_cache(language)
-            for pattern in patterns:
-                matches = pattern.findall(text)
-                if matches:
-                    detected_words.extend(matches)
-            
-            # 3. Obtener severidad máxima si hay palabras detectadas
+            # 2. Verificar patrones regex (scan combinado, luego solo si hubo coincidencia)
+            scanner = snapshot.get_scanner(languages)
+            if scanner is not None:
+                for found, start, end, rule in scanner.scan(text, self.regex_stats):
+                    detected_words.append(found)
+                    matches.append(self._format_match(found, start, end, rule))
+            
+            # 3. Severidad máxima según las reglas que coincidieron (sin DB)
             max_severity = 'none'
-            if detected_words:
-                max_severity = await self._get_max_severity(detected_words, language)
+            if matches:
+                max_severity = max(
+                    (m['severity'] for m in matches),
+                    key=lambda severity: SEVERITY_ORDER.get(severity, 0)
+                )
             
             return {
                 'has_blacklisted_words': len(detected_words) > 0,
                 'detected_words': list(set(detected_words)),  # Remover duplicados
                 'count': len(detected_words),
-                'max_severity': max_severity
+                'max_severity': max_severity,
+                'matches': matches
             }
             
         except Exception as e:
@@ -195,39 +611,33 @@ class BlacklistManager:
                 'detected_words': [],
                 'count': 0,
                 'max_severity': 'none',
+                'matches': [],
                 'error': str(e)
             }
     
-    async def _get_max_severity(
-        self,
-        detected_words: List[str],
-        language: str
-    ) -> str:
+    def _format_match(self, word: str, start: int, end: int, rule: BlacklistRule) -> Dict:
         """
-        Obtiene la severidad máxima de las palabras detectadas
-
+        Arma el detalle de un hit con la regla que lo produjo
+        
         Args:
-            detected_words: Lista de palabras detectadas
-            language: Idioma
-
+            word: Texto que coincidió
+            start: Offset inicial en el texto
+            end: Offset final en el texto
+            rule: Regla de la lista negra
+            
         Returns:
-            'low', 'medium', o 'high'
+            Dict con offsets, regla, categoría y severidad
         """
-        severities = []
-
-        for word in detected_words:
-            word_obj = await self.repository.get_by_word_and_language(word, language)
-            if word_obj:
-                severities.append(word_obj.severity)
-
-        if not severities:
-            return 'medium'  # Default
-
-        # Orden de severidad
-        severity_order = {'low': 1, 'medium': 2, 'high': 3}
-        max_severity = max(severities, key=lambda x: severity_order.get(x, 0))
-
-        return max_severity
+        return {
+            'word': word,
+            'start': start,
+            'end': end,
+            'rule_id': rule.rule_id,
+            'rule': rule.word,
+            'is_regex': rule.is_regex,
+            'category': rule.category,
+            'severity': rule.severity
+        }
     
     async def add_word(
         self,
@@ -254,6 +664,11 @@ class BlacklistManager:
         Returns:
             BlacklistWord creado
         """
+        if is_regex:
+            issues = analyze_pattern(word)
+            if issues:
+                raise BlacklistException(f"Unsafe regex pattern: {'; '.join(issues)}")
+        
         try:
             blacklist_word = BlacklistWord(
                 word=word,
@@ -267,8 +682,9 @@ class BlacklistManager:
             
             created = await self.repository.create_word(blacklist_word)
             
-            # Invalidar cache
-            await self._refresh_cache()
+            # Publicar solo el delta (sin recargar toda la lista)
+            rule = BlacklistRule.from_word(created)
+            await self._record_change('add', rule.rule_id, rule)
             
             log.info(f"Word added to blacklist: {word} ({language})")
             return created
@@ -291,8 +707,8 @@ class BlacklistManager:
             result = await self.repository.deactivate_word(word_id)
             
             if result:
-                # Invalidar cache
-                await self._refresh_cache()
+                # Publicar solo el delta (sin recargar toda la lista)
+                await self._record_change('remove', str(word_id))
                 log.info(f"Word removed from blacklist: {word_id}")
             
             return result
@@ -302,18 +718,32 @@ class BlacklistManager:
             raise BlacklistException(f"Failed to remove word: {e}")
     
     async def force_refresh(self):
-        """Fuerza la actualización del cache"""
+        """Fuerza la recarga completa desde MongoDB (p. ej. tras ediciones directas en la DB)"""
         await self._refresh_cache()
+        self.regex_stats.reset()
+    
+    def get_snapshot_info(self) -> Optional[dict]:
+        """Retorna información del snapshot en proceso"""
+        return self._snapshot.describe() if self._snapshot else None
+    
+    def get_regex_metrics(self) -> dict:
+        """Retorna el tiempo de CPU por patrón regex y los patrones deshabilitados"""
+        return self.regex_stats.get_metrics()
     
     async def get_stats(self) -> dict:
         """Obtiene estadísticas de la lista negra"""
         return await self.repository.get_stats()
     
     async def clear_cache(self):
-        """Limpia el cache de lista negra"""
+        """Descarta el snapshot en proceso (se recompila en el próximo check)"""
         try:
-            await self.cache.delete_pattern(f"{self.cache_prefix_words}:*")
-            await self.cache.delete_pattern(f"{self.cache_prefix_patterns}:*")
+            self._snapshot = None
+            await self.cache.delete_pattern(f"{self.cache_prefix_rules}:*")
+            await self.cache.delete(self.cache_key_changes)
+            await self.cache.delete(self.cache_key_snapshots)
+            await self.cache.delete_pattern(f"{self.cache_prefix_snapshot}:*")
+            await self.cache.delete_pattern("blacklist:words:*")
+            await self.cache.delete_pattern("blacklist:patterns:*")
             log.info("Blacklist cache cleared")
         except Exception as e:
             log.error(f"Error clearing blacklist cache: {e}")
@@ -0,0 +1,383 @@
+"""
+Snapshot compilado e inmutable de la lista negra (por versión)
+"""
+
+import copy
+import hashlib
+import re
+import time
+from typing import Callable, Collection, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+from app.core.aho_corasick import AhoCorasickMatcher, Match
+from app.core.regex_safety import RegexScanner, analyze_pattern, compile_pattern
+from app.core.text_folding import fold_word
+from app.config.settings import settings
+from app.models.blacklist_word import BlacklistWord
+from app.utils.logger import log
+
+
+class BlacklistRule(NamedTuple):
+    """Regla de la lista negra tal como viaja dentro del matcher"""
+
+    rule_id: str
+    word: str
+    language: str
+    category: str
+    severity: str
+    is_regex: bool = False
+
+    @classmethod
+    def from_word(cls, word_obj: BlacklistWord) -> "BlacklistRule":
+        """Crea la regla desde el modelo persistido"""
+        return cls(
+            rule_id=str(word_obj.id),
+            word=word_obj.word,
+            language=word_obj.language,
+            category=word_obj.category,
+            severity=word_obj.severity,
+            is_regex=word_obj.is_regex,
+        )
+
+
+class BlacklistChange(NamedTuple):
+    """Entrada del log de cambios de la lista negra (una por versión)"""
+
+    version: int
+    op: str  # 'add' | 'remove'
+    rule_id: str
+    rule: Optional[BlacklistRule] = None  # Solo en 'add'
+
+    def to_entry(self) -> Dict:
+        """Serializa el cambio para guardarlo en Redis"""
+        return {
+            "version": self.version,
+            "op": self.op,
+            "rule_id": self.rule_id,
+            "rule": list(self.rule) if self.rule else None,
+        }
+
+    @classmethod
+    def from_entry(cls, entry: Dict) -> "BlacklistChange":
+        """Deserializa una entrada del log de cambios"""
+        rule = entry.get("rule")
+        return cls(
+            version=int(entry["version"]),
+            op=entry["op"],
+            rule_id=entry["rule_id"],
+            rule=BlacklistRule(*rule) if rule else None,
+        )
+
+
+# Idioma de las reglas que aplican a todos los mensajes
+GLOBAL_LANGUAGE = "all"
+
+
+# Orden de severidad
+SEVERITY_ORDER = {'low': 1, 'medium': 2, 'high': 3}
+
+
+# El fingerprint es la suma (mod 2^64) del hash de cada regla: no depende
+# del orden y un delta lo actualiza sin recorrer toda la lista
+FINGERPRINT_MASK = (1 << 64) - 1
+
+
+def rule_digest(rule: BlacklistRule) -> int:
+    """Hash de 64 bits de una regla"""
+    return int.from_bytes(hashlib.sha1(repr(tuple(rule)).encode()).digest()[:8], "big")
+
+
+def format_fingerprint(total: int) -> str:
+    """Representación hexadecimal de una suma de hashes de reglas"""
+    return f"{total & FINGERPRINT_MASK:016x}"
+
+
+def rules_fingerprint(rules: Iterable[BlacklistRule]) -> str:
+    """Hash del contenido de las reglas (independiente del orden)"""
+    return format_fingerprint(sum(rule_digest(rule) for rule in rules))
+
+
+class BlacklistSnapshot:
+    """
+    Lista negra compilada en memoria para una versión dada
+
+    Todas las palabras exactas, de todos los idiomas, van en un único
+    automata; cada palabra lleva su regla (idioma, severidad, categoría, id)
+    y los matches se filtran por los idiomas candidatos del mensaje, así que
+    revisar varios idiomas cuesta un solo scan. Los patrones regex quedan
+    agrupados por idioma. Se construye una vez por versión y luego solo se
+    lee (sin I/O en el hot path).
+
+    Los cambios individuales (apply) no recompilan el automata base: las
+    palabras nuevas van a un automata chico ("overlay") y las eliminadas
+    quedan como ids descartados al buscar. Cuando el overlay crece se
+    compacta recompilando todo en memoria.
+    """
+
+    def __init__(self, version: int = 0):
+        """
+        Inicializa un snapshot vacío
+
+        Args:
+            version: Versión de la lista negra (contador en Redis)
+        """
+        self.version = version
+        self.built_at = time.time()
+
+        # Palabras exactas plegadas (acentos, leet, repeticiones); el texto se pliega igual
+        self.folding = settings.BLACKLIST_TEXT_FOLDING
+        self._fingerprint = format_fingerprint(0)
+
+        # Reglas por id; en un snapshot cargado de disco se decodifican al pedirlas
+        self._rules: Optional[Dict[str, BlacklistRule]] = {}
+        self._rules_loader: Optional[Callable[[], Iterable[BlacklistRule]]] = None
+        self._word_count = 0
+
+        self.matcher: Optional[AhoCorasickMatcher] = None
+        self.languages: Set[str] = set()
+        self.patterns: Dict[str, List[Tuple[re.Pattern, BlacklistRule]]] = {}
+        self._scanners: Dict[FrozenSet[str], Optional[RegexScanner]] = {}
+
+        # Deltas aplicados desde la última compilación completa
+        self._base_id_set: Optional[Set[str]] = set()
+        self.overlay: Optional[AhoCorasickMatcher] = None
+        self.overlay_rules: List[BlacklistRule] = []
+        self.removed: Set[str] = set()
+
+        # Archivo mapeado del que se cargó (blacklist_snapshot_file), si corresponde
+        self._buffer = None
+
+    @property
+    def rules(self) -> Dict[str, BlacklistRule]:
+        """Reglas activas por id"""
+        if self._rules is None:
+            self._rules = {rule.rule_id: rule for rule in self._rules_loader()}
+            self._rules_loader = None
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules: Dict[str, BlacklistRule]):
+        self._rules = rules
+
+    @property
+    def base_ids(self) -> Set[str]:
+        """Ids de las palabras exactas compiladas en el automata base"""
+        if self._base_id_set is None:
+            self._base_id_set = {rule_id for rule_id, rule in self.rules.items() if not rule.is_regex}
+        return self._base_id_set
+
+    @property
+    def word_count(self) -> int:
+        """Cantidad de reglas activas"""
+        return len(self._rules) if self._rules is not None else self._word_count
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash del contenido (calculado al compilar y actualizado en cada delta)"""
+        return self._fingerprint
+
+    @property
+    def pending_deltas(self) -> int:
+        """Cambios de palabras exactas aún no compactados en el automata base"""
+        return len(self.overlay_rules) + len(self.removed)
+
+    def _matcher_word(self, rule: BlacklistRule) -> str:
+        """Forma en que la palabra entra al automata"""
+        return fold_word(rule.word) if self.folding else rule.word
+
+    @staticmethod
+    def _compile_pattern(rule: BlacklistRule) -> Optional[Tuple[re.Pattern, BlacklistRule]]:
+        """Compila un patrón regex (None si es inválido o puede hacer backtracking catastrófico)"""
+        try:
+            compiled = compile_pattern(rule.word)
+        except re.error as e:
+            log.error(f"Invalid regex pattern '{rule.word}': {e}")
+            return None
+
+        issues = analyze_pattern(rule.word)
+        if issues:
+            # Reglas previas a la validación: un scan lento bloquearía el worker
+            log.error(f"Regex rule {rule.rule_id} ('{rule.word}') skipped: {', '.join(issues)}")
+            return None
+        return compiled, rule
+
+    @classmethod
+    def build(cls, words: Iterable[BlacklistWord], version: int = 0) -> "BlacklistSnapshot":
+        """
+        Compila un snapshot a partir de las palabras activas
+
+        Args:
+            words: Palabras activas de la lista negra
+            version: Versión a asignar
+
+        Returns:
+            Snapshot listo para consultas
+        """
+        return cls.from_rules([BlacklistRule.from_word(w) for w in words], version)
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[BlacklistRule], version: int = 0) -> "BlacklistSnapshot":
+        """
+        Compila un snapshot a partir de reglas (DB o copia publicada en Redis)
+
+        Args:
+            rules: Reglas activas de la lista negra
+            version: Versión a asignar
+
+        Returns:
+            Snapshot listo para consultas
+        """
+        snapshot = cls(version)
+        snapshot.rules = {rule.rule_id: rule for rule in rules}
+        matcher = AhoCorasickMatcher()
+        total = 0
+
+        for rule in snapshot.rules.values():
+            total += rule_digest(rule)
+            snapshot.languages.add(rule.language)
+
+            if rule.is_regex:
+                compiled = cls._compile_pattern(rule)
+                if compiled:
+                    snapshot.patterns.setdefault(rule.language, []).append(compiled)
+                continue
+
+            matcher.add(snapshot._matcher_word(rule), rule)
+            snapshot.base_ids.add(rule.rule_id)
+
+        if len(matcher):
+            snapshot.matcher = matcher.build()
+
+        snapshot._fingerprint = format_fingerprint(total)
+        return snapshot
+
+    def apply(self, changes: Iterable[BlacklistChange], max_pending: int = 0) -> "BlacklistSnapshot":
+        """
+        Aplica cambios individuales y retorna un snapshot nuevo
+
+        El snapshot actual no se modifica (los checks en curso lo siguen
+        usando); el nuevo comparte el automata base y solo recompila el
+        overlay.
+
+        Args:
+            changes: Cambios en orden de versión
+            max_pending: Deltas tras los cuales se compacta todo (0 = nunca)
+
+        Returns:
+            Snapshot con la versión del último cambio
+        """
+        changes = list(changes)
+        if not changes:
+            return self
+
+        snapshot = copy.copy(self)
+        snapshot.rules = dict(self.rules)
+        snapshot._base_id_set = self.base_ids
+        snapshot.languages = set(self.languages)
+        snapshot.patterns = {lang: list(items) for lang, items in self.patterns.items()}
+        snapshot.overlay_rules = list(self.overlay_rules)
+        snapshot.removed = set(self.removed)
+        snapshot._scanners = {}
+        total = int(self.fingerprint, 16)
+        overlay_changed = False
+
+        for change in changes:
+            previous = snapshot.rules.pop(change.rule_id, None)
+            if previous is not None:
+                total -= rule_digest(previous)
+                overlay_changed |= snapshot._discard(previous)
+
+            if change.op == "add" and change.rule is not None:
+                total += rule_digest(change.rule)
+                snapshot.rules[change.rule_id] = change.rule
+                snapshot.languages.add(change.rule.language)
+                overlay_changed |= snapshot._insert(change.rule)
+
+        if overlay_changed:
+            snapshot.overlay = None
+            if snapshot.overlay_rules:
+                matcher = AhoCorasickMatcher()
+                for rule in snapshot.overlay_rules:
+                    matcher.add(snapshot._matcher_word(rule), rule)
+                snapshot.overlay = matcher.build()
+
+        snapshot.version = changes[-1].version
+        snapshot._fingerprint = format_fingerprint(total)
+
+        if max_pending and snapshot.pending_deltas > max_pending:
+            return BlacklistSnapshot.from_rules(snapshot.rules.values(), snapshot.version)
+        return snapshot
+
+    def _discard(self, rule: BlacklistRule) -> bool:
+        """Quita una regla (copia en curso de apply); True si cambió el overlay"""
+        if rule.is_regex:
+            lang = rule.language
+            self.patterns[lang] = [item for item in self.patterns.get(lang, []) if item[1].rule_id != rule.rule_id]
+            return False
+        if rule.rule_id in self.base_ids:
+            self.removed.add(rule.rule_id)
+        if not any(r.rule_id == rule.rule_id for r in self.overlay_rules):
+            return False
+        self.overlay_rules = [r for r in self.overlay_rules if r.rule_id != rule.rule_id]
+        return True
+
+    def _insert(self, rule: BlacklistRule) -> bool:
+        """Agrega una regla (copia en curso de apply); True si cambió el overlay"""
+        if rule.is_regex:
+            compiled = self._compile_pattern(rule)
+            if compiled:
+                self.patterns.setdefault(rule.language, []).append(compiled)
+            return False
+        self.overlay_rules.append(rule)
+        return True
+
+    def find_words(self, languages: Collection[str], text: str) -> List[Match]:
+        """
+        Busca las palabras exactas de varios idiomas en un solo scan
+
+        Args:
+            languages: Idiomas cuyas reglas aplican (candidatos + global)
+            text: Texto plegado si `folding` está activo; si no, en minúsculas
+
+        Returns:
+            Matches de reglas activas de esos idiomas
+        """
+        matches: List[Match] = []
+
+        if self.matcher is not None:
+            removed = self.removed
+            matches.extend(
+                m for m in self.matcher.find_all(text)
+                if m.payload.language in languages and m.payload.rule_id not in removed
+            )
+
+        if self.overlay is not None:
+            matches.extend(m for m in self.overlay.find_all(text) if m.payload.language in languages)
+
+        return matches
+
+    def get_patterns(self, language: str) -> List[Tuple[re.Pattern, BlacklistRule]]:
+        """Patrones regex compilados del idioma, con su regla"""
+        return self.patterns.get(language, [])
+
+    def get_scanner(self, languages: Collection[str]) -> Optional[RegexScanner]:
+        """
+        Scanner de los patrones de varios idiomas (un solo scan combinado)
+
+        Se arma en el primer uso de cada combinación de idiomas.
+        """
+        key = frozenset(languages)
+        if key not in self._scanners:
+            patterns = [item for lang in sorted(key) for item in self.patterns.get(lang, [])]
+            self._scanners[key] = RegexScanner(patterns) if patterns else None
+        return self._scanners[key]
+
+    def describe(self) -> Dict:
+        """Retorna información del snapshot para logs y métricas"""
+        return {
+            "version": self.version,
+            "built_at": self.built_at,
+            "word_count": self.word_count,
+            "fingerprint": self.fingerprint,
+            "pending_deltas": self.pending_deltas,
+            "folding": self.folding,
+            "languages": sorted(self.languages),
+        }
@@ -0,0 +1,293 @@
+"""
+Formato binario del snapshot compilado de la lista negra
+
+Un archivo contiene el automata (todos los idiomas) como arreglos planos
+de uint32 y las reglas codificadas una por una. Se carga con mmap
+sin copiar ni reconstruir nada: los automatas se recorren directo sobre el
+archivo y cada regla se decodifica recién cuando un match la necesita.
+
+Layout (little-endian, también los arreglos):
+    header   magic, formato, versión, crc32 del payload, fingerprint, largo
+    payload  largo del índice (u32) + índice JSON + secciones alineadas a 4 bytes
+
+En un host big-endian los arreglos se invierten al escribir y se copian
+invertidos al cargar (sin mmap directo).
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Optional, Tuple
+from app.core.aho_corasick import AhoCorasickMatcher, FrozenAhoCorasickMatcher
+from app.core.blacklist_snapshot import BlacklistRule, BlacklistSnapshot
+from app.utils.logger import log
+
+MAGIC = b"BLSNAP\x00\x01"
+FORMAT_VERSION = 4
+HEADER = struct.Struct("<8sIqI16sQ")
+INDEX_SIZE = struct.Struct("<I")
+
+# Los arreglos del archivo son u32 little-endian
+NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _le_bytes(values: array) -> bytes:
+    """Bytes de un arreglo en little-endian"""
+    if not NATIVE_LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class SnapshotFormatError(Exception):
+    """Archivo de snapshot inválido, corrupto o de otro formato"""
+
+
+class RuleTable:
+    """Reglas codificadas en el snapshot, decodificadas de a una y cacheadas"""
+
+    def __init__(self, offsets, blob):
+        self._offsets = offsets
+        self._blob = blob
+        self._cache: Dict[int, BlacklistRule] = {}
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> BlacklistRule:
+        rule = self._cache.get(index)
+        if rule is None:
+            raw = self._blob[self._offsets[index]:self._offsets[index + 1]]
+            rule = self._cache[index] = BlacklistRule(*json.loads(bytes(raw)))
+        return rule
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+
+def dump_snapshot(snapshot: BlacklistSnapshot) -> bytes:
+    """
+    Serializa un snapshot recién compilado
+
+    Args:
+        snapshot: Snapshot sin deltas pendientes (automata base completo)
+
+    Returns:
+        Bytes del archivo
+    """
+    if snapshot.pending_deltas:
+        raise ValueError("Cannot serialize a snapshot with pending deltas")
+
+    rules = list(snapshot.rules.values())
+    rule_index = {rule.rule_id: index for index, rule in enumerate(rules)}
+
+    sections: Dict[str, bytes] = {}
+    rule_offsets = array("I", [0])
+    blob = bytearray()
+    for rule in rules:
+        blob += json.dumps(list(rule), ensure_ascii=False, separators=(",", ":")).encode()
+        rule_offsets.append(len(blob))
+    sections["rule_offsets"] = _le_bytes(rule_offsets)
+    sections["rule_blob"] = bytes(blob)
+
+    matcher = snapshot.matcher
+    word_count = 0
+    if matcher is not None:
+        if not isinstance(matcher, AhoCorasickMatcher):
+            raise ValueError("Cannot serialize a snapshot loaded from a file")
+        for name, values in matcher.export().items():
+            sections[f"matcher.{name}"] = _le_bytes(values)
+        sections["matcher.word_rules"] = _le_bytes(array(
+            "I", (rule_index[rule.rule_id] for rule in matcher.payloads)
+        ))
+        word_count = len(matcher)
+
+    patterns = {
+        lang: [rule_index[rule.rule_id] for _, rule in items]
+        for lang, items in snapshot.patterns.items()
+    }
+
+    # Índice: sección -> (offset, largo) dentro del área de datos
+    layout = {}
+    data = bytearray()
+    for name, content in sections.items():
+        layout[name] = (len(data), len(content))
+        data += content
+        data += b"\x00" * (-len(data) % 4)
+
+    index = json.dumps({
+        "folding": snapshot.folding,
+        "word_count": len(rules),
+        "languages": sorted(snapshot.languages),
+        "matcher_words": word_count,
+        "patterns": patterns,
+        "sections": layout,
+    }, separators=(",", ":")).encode()
+    index += b" " * (-(INDEX_SIZE.size + len(index)) % 4)
+
+    payload = INDEX_SIZE.pack(len(index)) + index + bytes(data)
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        snapshot.version,
+        zlib.crc32(payload),
+        snapshot.fingerprint.encode().ljust(16, b"\x00"),
+        len(payload),
+    )
+    return header + payload
+
+
+def read_header(buffer) -> Tuple[int, int, str, int]:
+    """
+    Lee y valida el header
+
+    Args:
+        buffer: Bytes o mmap del archivo
+
+    Returns:
+        (versión, crc32, fingerprint, largo del payload)
+    """
+    if len(buffer) < HEADER.size:
+        raise SnapshotFormatError("Snapshot too short")
+    magic, fmt, version, checksum, fingerprint, length = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or fmt != FORMAT_VERSION:
+        raise SnapshotFormatError("Unknown snapshot format")
+    if len(buffer) != HEADER.size + length:
+        raise SnapshotFormatError("Truncated snapshot")
+    return version, checksum, fingerprint.rstrip(b"\x00").decode(), length
+
+
+def load_snapshot(buffer, expected_checksum: Optional[int] = None) -> BlacklistSnapshot:
+    """
+    Carga un snapshot sin copiar los arreglos (sirve con bytes o mmap)
+
+    Args:
+        buffer: Contenido del archivo
+        expected_checksum: crc32 esperado (el publicado en Redis para la versión)
+
+    Returns:
+        Snapshot listo para consultas
+    """
+    version, checksum, fingerprint, _ = read_header(buffer)
+    if expected_checksum is not None and checksum != expected_checksum:
+        raise SnapshotFormatError("Snapshot checksum does not match the published one")
+
+    view = memoryview(buffer)[HEADER.size:]
+    if zlib.crc32(view) != checksum:
+        raise SnapshotFormatError("Snapshot checksum mismatch (corrupted file)")
+
+    (index_size,) = INDEX_SIZE.unpack_from(view, 0)
+    index = json.loads(bytes(view[INDEX_SIZE.size:INDEX_SIZE.size + index_size]))
+    data = view[INDEX_SIZE.size + index_size:]
+
+    def section(name: str, typecode: str = "I"):
+        offset, length = index["sections"][name]
+        raw = data[offset:offset + length]
+        if typecode == "B":
+            return raw
+        if NATIVE_LITTLE_ENDIAN:
+            return raw.cast(typecode)
+        values = array(typecode, bytes(raw))
+        values.byteswap()
+        return values
+
+    rules = RuleTable(section("rule_offsets"), section("rule_blob", "B"))
+
+    snapshot = BlacklistSnapshot(version)
+    snapshot.folding = index["folding"]
+    snapshot._fingerprint = fingerprint
+    snapshot._word_count = index["word_count"]
+    snapshot._rules = None
+    snapshot._rules_loader = lambda: iter(rules)
+    snapshot._base_id_set = None
+    snapshot._buffer = buffer  # mantiene vivo el mmap
+
+    snapshot.languages = set(index["languages"])
+    if index["matcher_words"]:
+        arrays = {
+            name: section(f"matcher.{name}")
+            for name in ("edge_offsets", "edge_chars", "edge_targets", "fail",
+                         "out_offsets", "out_words", "word_lengths")
+        }
+        word_rules = section("matcher.word_rules")
+        snapshot.matcher = FrozenAhoCorasickMatcher(
+            arrays,
+            lambda i: rules[word_rules[i]],
+            index["matcher_words"]
+        )
+
+    for lang, indices in index["patterns"].items():
+        compiled = [snapshot._compile_pattern(rules[i]) for i in indices]
+        snapshot.patterns[lang] = [item for item in compiled if item]
+
+    return snapshot
+
+
+def snapshot_path(directory: str, version: int, checksum: int) -> str:
+    """Ruta del archivo de un snapshot (la versión sola no alcanza si Redis se reinicia)"""
+    return os.path.join(directory, f"blacklist-v{version}-{checksum:08x}.bin")
+
+
+def write_snapshot_file(directory: str, data: bytes, keep: int = 2) -> str:
+    """
+    Escribe el snapshot de forma atómica y borra los más viejos
+
+    Args:
+        directory: Directorio de snapshots
+        data: Bytes de dump_snapshot
+        keep: Archivos a conservar
+
+    Returns:
+        Ruta escrita
+    """
+    version, checksum, _, _ = read_header(data)
+    os.makedirs(directory, exist_ok=True)
+    path = snapshot_path(directory, version, checksum)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+    files = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory)
+         if name.startswith("blacklist-v") and name.endswith(".bin")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for old in files[keep:]:
+        try:
+            os.unlink(old)
+        except OSError:
+            pass
+
+    return path
+
+
+def read_snapshot_file(directory: str, version: int, checksum: int) -> Optional[BlacklistSnapshot]:
+    """
+    Carga un snapshot del disco con mmap
+
+    Args:
+        directory: Directorio de snapshots
+        version: Versión buscada
+        checksum: crc32 publicado para esa versión
+
+    Returns:
+        Snapshot o None si no existe o no es válido
+    """
+    path = snapshot_path(directory, version, checksum)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return load_snapshot(mapped, checksum)
+    except (OSError, ValueError, SnapshotFormatError) as e:
+        log.warning(f"Ignoring blacklist snapshot file {path}: {e}")
+        return None
@@ -0,0 +1,289 @@
+"""
+Backends de inferencia en CPU para el modelo de toxicidad
+
+- torch:       PyTorch eager fp32 (Detoxify tal cual)
+- torch_int8:  PyTorch con cuantización dinámica int8 de las capas Linear
+- onnx:        grafo exportado a ONNX Runtime (fp32)
+- onnx_int8:   grafo ONNX cuantizado a int8
+- remote:      cliente del daemon local de inferencia (app/core/inference_server.py)
+
+Los grafos ONNX se generan con scripts/export_model.py.
+"""
+
+import json
+import os
+import socket
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from app.config.settings import settings
+from app.core.inference_protocol import ProtocolError, encode_frame, recv_frame
+from app.utils.logger import log
+from app.utils.exceptions import ModerationEngineException
+
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_INT8_MODEL_FILE = "model.int8.onnx"
+ONNX_METADATA_FILE = "metadata.json"
+
+
+class InferenceBackend:
+    """
+    Interfaz común de los backends de inferencia
+
+    Cada backend expone `class_names`, `tokenizer` y `predict`, que recibe
+    una lista de textos y retorna una matriz N x C de probabilidades.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.class_names: List[str] = []
+        self.tokenizer = None
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        """
+        Ejecuta el modelo sobre un batch de textos
+
+        Args:
+            texts: Lista de textos (no vacíos)
+
+        Returns:
+            Matriz (len(texts) x len(class_names)) de scores entre 0 y 1
+        """
+        raise NotImplementedError
+
+    def describe(self) -> Dict:
+        """Retorna información del backend para logs y métricas"""
+        return {
+            "backend": self.name,
+            "model": settings.DETOXIFY_MODEL,
+            "class_names": list(self.class_names),
+        }
+
+
+class TorchEagerBackend(InferenceBackend):
+    """Detoxify en PyTorch eager (fp32)"""
+
+    name = "torch"
+
+    def __init__(self, model_type: Optional[str] = None):
+        super().__init__()
+        from detoxify import Detoxify
+
+        self.detoxify = Detoxify(model_type or settings.DETOXIFY_MODEL, device="cpu")
+        self.model = self.detoxify.model
+        self.model.eval()
+        self.tokenizer = self.detoxify.tokenizer
+        self.class_names = list(self.detoxify.class_names)
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        import torch
+
+        inputs = self.tokenizer(
+            list(texts),
+            return_tensors="pt",
+            truncation=True,
+            padding=True
+        )
+        with torch.inference_mode():
+            logits = self.model(**inputs)[0]
+        return torch.sigmoid(logits).cpu().numpy().astype(np.float64)
+
+
+class TorchDynamicInt8Backend(TorchEagerBackend):
+    """Detoxify con cuantización dinámica int8 (capas Linear)"""
+
+    name = "torch_int8"
+
+    def __init__(self, model_type: Optional[str] = None):
+        super().__init__(model_type)
+        import torch
+
+        self.model = torch.quantization.quantize_dynamic(
+            self.model,
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+        self.model.eval()
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    """Grafo ONNX exportado, ejecutado con ONNX Runtime"""
+
+    name = "onnx"
+    model_file = ONNX_MODEL_FILE
+
+    def __init__(self, model_dir: Optional[str] = None):
+        super().__init__()
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ModerationEngineException(
+                f"ONNX backend requires onnxruntime: {e}"
+            )
+
+        model_dir = model_dir or settings.ONNX_MODEL_DIR
+        model_path = os.path.join(model_dir, self.model_file)
+        if not os.path.exists(model_path):
+            raise ModerationEngineException(
+                f"ONNX model not found: {model_path} "
+                f"(run scripts/export_model.py export)"
+            )
+
+        with open(os.path.join(model_dir, ONNX_METADATA_FILE)) as f:
+            metadata = json.load(f)
+
+        options = ort.SessionOptions()
+        if settings.TORCH_NUM_THREADS > 0:
+            options.intra_op_num_threads = settings.TORCH_NUM_THREADS
+
+        self.session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.class_names = list(metadata["class_names"])
+        self.model_path = model_path
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            list(texts),
+            return_tensors="np",
+            truncation=True,
+            padding=True
+        )
+        feeds = {
+            name: encoded[name].astype(np.int64)
+            for name in self.input_names
+            if name in encoded
+        }
+        logits = self.session.run(None, feeds)[0]
+        return 1.0 / (1.0 + np.exp(-logits.astype(np.float64)))
+
+    def describe(self) -> Dict:
+        info = super().describe()
+        info["model_path"] = self.model_path
+        return info
+
+
+class OnnxRuntimeInt8Backend(OnnxRuntimeBackend):
+    """Grafo ONNX cuantizado a int8"""
+
+    name = "onnx_int8"
+    model_file = ONNX_INT8_MODEL_FILE
+
+
+class RemoteInferenceBackend(InferenceBackend):
+    """
+    Cliente del daemon de inferencia por Unix domain socket
+
+    El worker no carga torch ni el modelo; cada thread del executor usa su
+    propia conexión y el daemon agrupa los textos de todos los workers.
+    Sin tokenizer local, el chunking cuenta palabras en lugar de tokens.
+    """
+
+    name = "remote"
+
+    def __init__(self, socket_path: Optional[str] = None):
+        super().__init__()
+        self.socket_path = socket_path or settings.INFERENCE_SERVER_SOCKET
+        self._local = threading.local()
+
+        info = self._request({"op": "describe"})
+        self.class_names = list(info["class_names"])
+        self.server_backend = info["backend"]
+        self.name = f"remote:{self.server_backend.get('backend')}"
+
+    def _connection(self) -> socket.socket:
+        """Conexión del thread actual (se crea si no existe)"""
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(settings.INFERENCE_SERVER_TIMEOUT)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        """Cierra la conexión del thread actual"""
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            finally:
+                self._local.sock = None
+
+    def _request(self, payload: Dict) -> Dict:
+        """
+        Envía un request y espera la respuesta (reintenta una vez reconectando)
+
+        Args:
+            payload: Request del protocolo
+
+        Returns:
+            Response del daemon
+        """
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(encode_frame(payload))
+                response = recv_frame(sock)
+                break
+            except (OSError, ProtocolError) as e:
+                self._close()
+                if attempt == 1:
+                    raise ModerationEngineException(
+                        f"Inference server unavailable at {self.socket_path}: {e}"
+                    )
+
+        if "error" in response:
+            raise ModerationEngineException(f"Inference server error: {response['error']}")
+        return response
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        response = self._request({"op": "predict", "texts": list(texts)})
+        return np.asarray(response["scores"], dtype=np.float64).reshape(
+            len(texts), len(self.class_names)
+        )
+
+    def describe(self) -> Dict:
+        info = super().describe()
+        info["socket_path"] = self.socket_path
+        info["server"] = self.server_backend
+        return info
+
+
+BACKENDS = {
+    TorchEagerBackend.name: TorchEagerBackend,
+    TorchDynamicInt8Backend.name: TorchDynamicInt8Backend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OnnxRuntimeInt8Backend.name: OnnxRuntimeInt8Backend,
+    RemoteInferenceBackend.name: RemoteInferenceBackend,
+}
+
+
+def create_backend(name: Optional[str] = None) -> InferenceBackend:
+    """
+    Crea el backend de inferencia configurado
+
+    Args:
+        name: Nombre del backend (por defecto settings.INFERENCE_BACKEND)
+
+    Returns:
+        Instancia del backend con el modelo cargado
+    """
+    name = name or settings.INFERENCE_BACKEND
+    backend_cls = BACKENDS.get(name)
+
+    if backend_cls is None:
+        raise ModerationEngineException(
+            f"Unknown inference backend '{name}' "
+            f"(available: {', '.join(BACKENDS)})"
+        )
+
+    log.info(f"Loading inference backend: {name} ({settings.DETOXIFY_MODEL})")
+    return backend_cls()
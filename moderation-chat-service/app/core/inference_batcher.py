@@ -0,0 +1,192 @@
+"""
+Cola de inferencia con micro-batching dinámico para Detoxify
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from app.config.settings import settings
+from app.core.inference_executor import get_inference_executor
+from app.utils.logger import log
+from app.utils.exceptions import ModerationEngineException
+
+
+PredictFn = Callable[[List[str]], List[Dict[str, float]]]
+
+
+class InferenceBatcher:
+    """
+    Agrupa requests concurrentes en un solo forward pass del modelo
+
+    Cada request se encola; un worker junta hasta `max_batch_size` textos
+    o espera como máximo `max_wait_ms` desde el primero, ejecuta el batch
+    completo y entrega a cada caller su propio resultado.
+
+    Los batches corren en el executor de inferencia; hasta
+    `max_concurrent_batches` pueden ejecutarse a la vez (uno por worker).
+    """
+
+    def __init__(
+        self,
+        predict_fn: PredictFn,
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        max_concurrent_batches: Optional[int] = None
+    ):
+        """
+        Inicializa el batcher
+
+        Args:
+            predict_fn: Función síncrona que recibe una lista de textos y
+                retorna una lista de dicts de scores (mismo orden)
+            max_batch_size: Tamaño máximo de batch
+            max_wait_ms: Espera máxima para completar un batch (ms)
+            max_concurrent_batches: Batches ejecutándose en paralelo
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size or settings.INFERENCE_MAX_BATCH_SIZE
+        self.max_wait = (
+            max_wait_ms if max_wait_ms is not None else settings.INFERENCE_MAX_WAIT_MS
+        ) / 1000.0
+        self.max_concurrent_batches = (
+            max_concurrent_batches or settings.INFERENCE_POOL_SIZE
+        )
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batch_tasks: set = set()
+        self._in_flight = 0
+
+        # Métricas
+        self._total_requests = 0
+        self._total_batches = 0
+        self._max_batch_seen = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+        self._total_inference = 0.0
+        self._last_batch_size = 0
+
+    def _ensure_worker(self):
+        """Crea la cola y el worker en el event loop actual (lazy)"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = asyncio.create_task(self._run())
+            log.info(
+                f"Inference batcher started: max_batch_size={self.max_batch_size}, "
+                f"max_wait_ms={self.max_wait * 1000:.1f}"
+            )
+
+    async def predict(self, text: str) -> Dict[str, float]:
+        """
+        Encola un texto y espera su resultado
+
+        Args:
+            text: Texto a analizar
+
+        Returns:
+            Dict con scores de Detoxify para ese texto
+        """
+        self._ensure_worker()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future, time.perf_counter()))
+        return await future
+
+    async def _run(self):
+        """Loop del worker: arma batches y los ejecuta"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # Esperar un slot libre primero: mientras todos los workers están
+            # ocupados la cola sigue creciendo y el próximo batch sale más grande
+            await self._slots.acquire()
+            first = await self._queue.get()
+            batch = [first]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._process_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _process_batch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        """
+        Ejecuta un batch y resuelve los futures de cada caller
+
+        Args:
+            batch: Lista de tuplas (texto, future, timestamp de encolado)
+        """
+        loop = asyncio.get_running_loop()
+        texts = [text for text, _, _ in batch]
+
+        started = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            waited = started - enqueued_at
+            self._total_wait += waited
+            self._max_wait_seen = max(self._max_wait_seen, waited)
+
+        self._in_flight += 1
+        try:
+            results = await loop.run_in_executor(
+                get_inference_executor(), self.predict_fn, texts
+            )
+        except Exception as e:
+            log.error(f"Error in batched inference (size={len(batch)}): {e}")
+            error = ModerationEngineException(f"Batched inference failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+            self._total_inference += time.perf_counter() - started
+            self._total_batches += 1
+            self._total_requests += len(batch)
+            self._last_batch_size = len(batch)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def stop(self):
+        """Detiene el worker"""
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    def get_metrics(self) -> dict:
+        """Retorna métricas de la cola para ajustar latencia vs throughput"""
+        batches = self._total_batches or 1
+        requests = self._total_requests or 1
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "batches_in_flight": self._in_flight,
+            "total_requests": self._total_requests,
+            "total_batches": self._total_batches,
+            "avg_batch_size": self._total_requests / batches,
+            "max_batch_size_seen": self._max_batch_seen,
+            "last_batch_size": self._last_batch_size,
+            "avg_wait_ms": self._total_wait / requests * 1000,
+            "max_wait_ms_seen": self._max_wait_seen * 1000,
+            "avg_inference_ms": self._total_inference / batches * 1000,
+        }
@@ -0,0 +1,78 @@
+"""
+Executor dedicado para inferencia (Detoxify, langdetect) fuera del event loop
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from app.config.settings import settings
+from app.utils.logger import log
+
+
+_inference_executor: Optional[ThreadPoolExecutor] = None
+_torch_configured = False
+
+
+def configure_torch_threads():
+    """
+    Configura los threads intra-op de torch (una sola vez por proceso)
+
+    Con INFERENCE_POOL_SIZE workers, cada forward pass usa
+    TORCH_NUM_THREADS threads; el total no debería superar los cores.
+    """
+    global _torch_configured
+    if _torch_configured:
+        return
+
+    _torch_configured = True
+
+    if settings.TORCH_NUM_THREADS <= 0:
+        return
+
+    try:
+        import torch
+        torch.set_num_threads(settings.TORCH_NUM_THREADS)
+        log.info(f"Torch intra-op threads set to {settings.TORCH_NUM_THREADS}")
+    except Exception as e:
+        log.warning(f"Could not configure torch threads: {e}")
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Obtiene el executor singleton de inferencia"""
+    global _inference_executor
+    if _inference_executor is None:
+        _inference_executor = ThreadPoolExecutor(
+            max_workers=settings.INFERENCE_POOL_SIZE,
+            thread_name_prefix="inference"
+        )
+        log.info(f"Inference executor created: workers={settings.INFERENCE_POOL_SIZE}")
+    return _inference_executor
+
+
+async def run_in_inference_executor(func: Callable, *args, **kwargs) -> Any:
+    """
+    Ejecuta una función síncrona (CPU-bound) en el executor de inferencia
+
+    Args:
+        func: Función a ejecutar
+        *args: Argumentos posicionales
+        **kwargs: Argumentos con nombre
+
+    Returns:
+        Resultado de la función
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_inference_executor(),
+        partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_inference_executor():
+    """Cierra el executor de inferencia"""
+    global _inference_executor
+    if _inference_executor is not None:
+        _inference_executor.shutdown(wait=False, cancel_futures=True)
+        _inference_executor = None
+        log.info("Inference executor shut down")
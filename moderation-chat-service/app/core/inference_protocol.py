@@ -0,0 +1,101 @@
+"""
+Protocolo del daemon de inferencia (frames JSON con prefijo de largo)
+
+Cada frame es un entero de 4 bytes big-endian con el largo del cuerpo,
+seguido del cuerpo JSON en UTF-8.
+
+Requests:
+    {"op": "describe"}
+    {"op": "predict", "texts": ["...", ...]}
+
+Responses:
+    {"backend": {...}, "class_names": [...]}
+    {"scores": [[...], ...]}
+    {"error": "..."}
+"""
+
+import asyncio
+import json
+import socket
+import struct
+from typing import Any, Dict
+
+HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Frame inválido o conexión cerrada a mitad de un frame"""
+
+
+def encode_frame(payload: Dict[str, Any]) -> bytes:
+    """
+    Serializa un mensaje como frame
+
+    Args:
+        payload: Dict serializable a JSON
+
+    Returns:
+        Bytes del frame (header + cuerpo)
+    """
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    if len(body) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {len(body)} bytes")
+    return HEADER.pack(len(body)) + body
+
+
+def _decode_body(body: bytes) -> Dict[str, Any]:
+    """Deserializa el cuerpo de un frame"""
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise ProtocolError(f"Invalid frame body: {e}")
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    """
+    Lee un frame desde un stream asyncio
+
+    Args:
+        reader: Stream de la conexión
+
+    Returns:
+        Mensaje deserializado
+
+    Raises:
+        asyncio.IncompleteReadError: Si el cliente cerró la conexión
+    """
+    header = await reader.readexactly(HEADER.size)
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {size} bytes")
+    return _decode_body(await reader.readexactly(size))
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Lee exactamente `size` bytes de un socket bloqueante"""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            raise ProtocolError("Connection closed by inference server")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def recv_frame(sock: socket.socket) -> Dict[str, Any]:
+    """
+    Lee un frame desde un socket bloqueante
+
+    Args:
+        sock: Socket conectado
+
+    Returns:
+        Mensaje deserializado
+    """
+    (size,) = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if size > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {size} bytes")
+    return _decode_body(_recv_exact(sock, size))
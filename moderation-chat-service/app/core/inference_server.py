@@ -0,0 +1,145 @@
+"""
+Daemon local de inferencia compartido por todos los workers de uvicorn
+
+Un solo proceso carga el modelo y atiende a los workers por un Unix domain
+socket; los textos de todos los workers se agrupan en el mismo
+InferenceBatcher. Los workers usan INFERENCE_BACKEND=remote.
+
+Uso:
+    INFERENCE_SERVER_BACKEND=onnx_int8 python -m app.core.inference_server
+"""
+
+import asyncio
+import os
+import signal
+from typing import List, Optional
+from app.config.settings import settings
+from app.core.inference_backends import InferenceBackend, create_backend
+from app.core.inference_batcher import InferenceBatcher
+from app.core.inference_executor import configure_torch_threads, shutdown_inference_executor
+from app.core.inference_protocol import ProtocolError, encode_frame, read_frame
+from app.utils.logger import log, setup_logger
+
+
+class InferenceServer:
+    """
+    Servidor de inferencia sobre Unix domain socket
+
+    Cada conexión (una por thread de inferencia de cada worker) envía
+    requests de a uno; los textos se encolan en el batcher compartido.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, backend_name: Optional[str] = None):
+        """
+        Inicializa el servidor
+
+        Args:
+            socket_path: Ruta del socket (por defecto INFERENCE_SERVER_SOCKET)
+            backend_name: Backend local a cargar (por defecto INFERENCE_SERVER_BACKEND)
+        """
+        self.socket_path = socket_path or settings.INFERENCE_SERVER_SOCKET
+        self.backend_name = backend_name or settings.INFERENCE_SERVER_BACKEND
+
+        self.backend: Optional[InferenceBackend] = None
+        self.batcher: Optional[InferenceBatcher] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._connections = 0
+
+    def _predict_rows(self, texts: List[str]) -> List[List[float]]:
+        """Ejecuta el backend y retorna una fila de scores por texto"""
+        return self.backend.predict(texts).tolist()
+
+    async def start(self):
+        """Carga el modelo y abre el socket"""
+        if self.backend_name == "remote":
+            raise ValueError("The inference server cannot use the remote backend")
+
+        configure_torch_threads()
+        self.backend = await asyncio.to_thread(create_backend, self.backend_name)
+        self.batcher = InferenceBatcher(self._predict_rows)
+
+        # Socket de una ejecución anterior
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        log.info(f"✅ Inference server listening on {self.socket_path} ({self.backend.name})")
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atiende los requests de una conexión hasta que se cierre"""
+        self._connections += 1
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+
+                writer.write(encode_frame(await self._dispatch(request)))
+                await writer.drain()
+
+        except (ProtocolError, ConnectionError) as e:
+            log.warning(f"Inference client disconnected: {e}")
+        finally:
+            self._connections -= 1
+            writer.close()
+
+    async def _dispatch(self, request: dict) -> dict:
+        """Ejecuta un request y arma la respuesta"""
+        op = request.get("op")
+
+        try:
+            if op == "predict":
+                texts = request.get("texts") or []
+                scores = await asyncio.gather(*(self.batcher.predict(text) for text in texts))
+                return {"scores": scores}
+
+            if op == "describe":
+                return {
+                    "backend": self.backend.describe(),
+                    "class_names": list(self.backend.class_names),
+                }
+
+            if op == "metrics":
+                return {
+                    "connections": self._connections,
+                    "batcher": self.batcher.get_metrics(),
+                }
+
+            return {"error": f"Unknown op '{op}'"}
+
+        except Exception as e:
+            log.error(f"Inference server error ({op}): {e}")
+            return {"error": str(e)}
+
+    async def stop(self):
+        """Cierra el socket y detiene el batcher"""
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.batcher:
+            await self.batcher.stop()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        shutdown_inference_executor()
+        log.info("Inference server stopped")
+
+
+async def serve():
+    """Ejecuta el servidor hasta recibir SIGINT/SIGTERM"""
+    server = InferenceServer()
+    await server.start()
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await stop_event.wait()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    setup_logger()
+    asyncio.run(serve())
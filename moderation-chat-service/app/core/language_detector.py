@@ -2,20 +2,56 @@
 Detector de idioma para mensajes
 """
 
-from typing import Optional
-from langdetect import detect, LangDetectException
+from typing import List, Optional, Tuple
 from app.config.settings import settings
+from app.core.language_models import LanguageIdentifier, create_language_identifier
 from app.utils.logger import log
 
 
 class LanguageDetector:
     """
-    Detector de idioma usando langdetect
+    Detector de idioma sobre un motor intercambiable (LANGUAGE_IDENTIFIER)
     """
     
-    def __init__(self):
+    def __init__(self, identifier: Optional[LanguageIdentifier] = None):
+        """
+        Inicializa el detector
+        
+        Args:
+            identifier: Motor de identificación (por defecto el configurado)
+        """
         self.supported_languages = settings.supported_languages_list
         self.default_language = "es"
+        self.identifier = identifier or create_language_identifier()
+    
+    def _identify(self, text: str) -> List[Tuple[str, float]]:
+        """Idiomas soportados con su confianza (vacío si falla o no hay señal)"""
+        try:
+            return self.identifier.identify(text)
+        except Exception as e:
+            log.error(f"Unexpected error in language detection: {e}")
+            return []
+    
+    def detect_with_confidence(self, text: str) -> Tuple[str, float]:
+        """
+        Detecta el idioma de un texto junto con su confianza
+        
+        Args:
+            text: Texto a analizar
+            
+        Returns:
+            (código ISO, confianza entre 0 y 1); el idioma por defecto con
+            confianza 0 si no se pudo detectar
+        """
+        if not text or not text.strip():
+            return self.default_language, 0.0
+        
+        detected = self._identify(text)
+        if not detected:
+            log.debug(f"Language detection without result, using default '{self.default_language}'")
+            return self.default_language, 0.0
+        
+        return detected[0]
     
     def detect_language(self, text: str) -> str:
         """
@@ -27,29 +63,34 @@ class LanguageDetector:
         Returns:
             Código ISO del idioma detectado
         """
-        if not text or not text.strip():
-            return self.default_language
+        return self.detect_with_confidence(text)[0]
+    
+    def detect_candidates(self, text: str) -> List[str]:
+        """
+        Detecta los idiomas probables de un texto, del más al menos probable
         
-        try:
-            detected_lang = detect(text)
-            
-            # Verificar si el idioma detectado está soportado
-            if detected_lang in self.supported_languages:
-                return detected_lang
-            
-            # Si no está soportado, usar idioma por defecto
-            log.debug(
-                f"Detected language '{detected_lang}' not supported, "
-                f"using default '{self.default_language}'"
-            )
-            return self.default_language
+        Los mensajes cortos se detectan mal, así que para ellos se devuelven
+        todos los idiomas soportados; la lista negra los revisa en un solo scan.
+        
+        Args:
+            text: Texto a analizar
             
-        except LangDetectException as e:
-            log.warning(f"Language detection failed: {e}, using default '{self.default_language}'")
-            return self.default_language
-        except Exception as e:
-            log.error(f"Unexpected error in language detection: {e}")
-            return self.default_language
+        Returns:
+            Códigos ISO soportados (al menos uno)
+        """
+        if not text or not text.strip():
+            return [self.default_language]
+        
+        candidates = [
+            lang for lang, confidence in self._identify(text)
+            if confidence >= settings.BLACKLIST_LANGUAGE_MIN_PROBABILITY
+        ]
+        candidates = candidates[:settings.BLACKLIST_MAX_CANDIDATE_LANGUAGES] or [self.default_language]
+        
+        if len(text.strip()) < settings.BLACKLIST_SHORT_TEXT_CHARS:
+            candidates += [lang for lang in self.supported_languages if lang not in candidates]
+        
+        return candidates
     
     def is_supported(self, language: str) -> bool:
         """
@@ -63,9 +104,28 @@ class LanguageDetector:
         """
         return language in self.supported_languages
     
+    def normalize_hint(self, language: Optional[str]) -> Optional[str]:
+        """
+        Normaliza el idioma indicado por el cliente ("ES", "es-AR", "pt_BR" → código base)
+        
+        Args:
+            language: Idioma indicado (opcional)
+            
+        Returns:
+            Código ISO soportado, o None si no se indicó o no está soportado
+        """
+        if not language:
+            return None
+        hint = language.strip().lower().replace("_", "-").split("-")[0]
+        return hint if self.is_supported(hint) else None
+    
     def get_supported_languages(self) -> list[str]:
         """Retorna la lista de idiomas soportados"""
         return self.supported_languages.copy()
+    
+    def describe(self) -> dict:
+        """Retorna información del motor de identificación"""
+        return self.identifier.describe()
 
 
 # Singleton instance
@@ -0,0 +1,252 @@
+"""
+Motores de identificación de idioma
+
+- langdetect:  langdetect con semilla fija (lento, carga perfiles en la primera llamada)
+- ngram:       Naive Bayes sobre n-gramas de 1 a 3 caracteres, restringido a
+               los idiomas soportados y precalculado en una matriz de
+               log-probabilidades (determinista, sin muestreo aleatorio)
+
+Los perfiles de n-gramas son los que trae el paquete langdetect (o los de
+LANGUAGE_PROFILES_DIR, mismo formato JSON). scripts/benchmark_language_detector.py
+compara la latencia y el acuerdo entre motores.
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config.settings import settings
+from app.utils.logger import log
+from app.utils.exceptions import ModerationEngineException
+
+# Suavizado para n-gramas que un idioma no tiene en su perfil
+NGRAM_ALPHA = 0.5
+
+# Máximo de caracteres del texto que se usan para identificar el idioma
+MAX_TEXT_CHARS = 300
+
+# Palabras y caracteres muy frecuentes por idioma, para textos cortos
+STOPWORDS = {
+    "es": {"el", "la", "de", "que", "y", "en", "los", "es", "no", "por", "un", "una", "con", "para", "eres", "hola", "pero", "muy", "qué", "sí", "gracias"},
+    "en": {"the", "and", "is", "you", "to", "of", "it", "in", "that", "are", "this", "what", "hello", "hi", "not", "with", "your", "thanks", "lol"},
+    "pt": {"o", "de", "que", "e", "não", "em", "um", "uma", "os", "você", "é", "obrigado", "muito", "mas", "isso", "tudo", "olá"},
+    "fr": {"le", "la", "les", "et", "est", "je", "tu", "vous", "pas", "des", "une", "un", "que", "c'est", "merci", "bonjour", "avec", "pour"},
+    "de": {"der", "die", "das", "und", "ist", "ich", "du", "nicht", "ein", "eine", "zu", "mit", "sie", "danke", "hallo", "was", "auf"},
+    "it": {"il", "di", "che", "e", "è", "non", "un", "una", "per", "sono", "ciao", "grazie", "gli", "della", "come", "anche", "molto"},
+}
+MARKERS = {
+    "es": "ñ¿¡",
+    "pt": "ãõç",
+    "fr": "çœêèû",
+    "de": "ßäöü",
+    "it": "ìò",
+}
+
+# Peso (en log-probabilidad) de cada pista de texto corto
+SHORT_TEXT_BOOST = 0.5
+
+_NON_LETTERS = re.compile(r"[^\w']+|[\d_]+")
+
+
+def normalize_for_ngrams(text: str) -> str:
+    """Minúsculas y todo lo que no es letra como espacio"""
+    return " ".join(_NON_LETTERS.sub(" ", text[:MAX_TEXT_CHARS].lower()).split())
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    exp = np.exp(scores - scores.max())
+    return exp / exp.sum()
+
+
+class LanguageIdentifier:
+    """
+    Interfaz común de los motores de identificación de idioma
+
+    `identify` retorna los idiomas soportados con su confianza, del más al
+    menos probable.
+    """
+
+    name = "base"
+
+    def __init__(self, languages: Optional[List[str]] = None):
+        self.languages = list(languages or settings.supported_languages_list)
+
+    def identify(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Identifica el idioma de un texto
+
+        Args:
+            text: Texto a analizar (no vacío)
+
+        Returns:
+            Lista (idioma, confianza) ordenada de mayor a menor; vacía si no
+            hay señal suficiente
+        """
+        raise NotImplementedError
+
+    def describe(self) -> Dict:
+        """Retorna información del motor para logs y métricas"""
+        return {"identifier": self.name, "languages": list(self.languages)}
+
+
+class LangdetectIdentifier(LanguageIdentifier):
+    """langdetect, con semilla fija para que el resultado sea reproducible"""
+
+    name = "langdetect"
+
+    def __init__(self, languages: Optional[List[str]] = None):
+        super().__init__(languages)
+        from langdetect import DetectorFactory, detect_langs
+
+        DetectorFactory.seed = 0
+        self._detect_langs = detect_langs
+
+    def identify(self, text: str) -> List[Tuple[str, float]]:
+        from langdetect import LangDetectException
+
+        try:
+            detected = self._detect_langs(text)
+        except LangDetectException:
+            return []
+        return [(d.lang, d.prob) for d in detected if d.lang in self.languages]
+
+
+class NgramIdentifier(LanguageIdentifier):
+    """
+    Naive Bayes de n-gramas de caracteres (1 a 3) sobre los idiomas soportados
+
+    Cada n-grama conocido es una fila de log P(n-grama | idioma); identificar
+    un texto es sumar las filas de sus n-gramas, sin aleatoriedad.
+    """
+
+    name = "ngram"
+
+    def __init__(
+        self,
+        languages: Optional[List[str]] = None,
+        profiles_dir: Optional[str] = None
+    ):
+        """
+        Carga los perfiles y arma la matriz de log-probabilidades
+
+        Args:
+            languages: Idiomas a considerar (por defecto los soportados)
+            profiles_dir: Directorio de perfiles (por defecto los de langdetect)
+        """
+        super().__init__(languages)
+        profiles_dir = profiles_dir or settings.LANGUAGE_PROFILES_DIR or self._default_profiles_dir()
+
+        profiles = []
+        for lang in list(self.languages):
+            path = os.path.join(profiles_dir, lang)
+            if not os.path.exists(path):
+                log.warning(f"No n-gram profile for language '{lang}' in {profiles_dir}")
+                self.languages.remove(lang)
+                continue
+            with open(path, encoding="utf-8") as f:
+                profiles.append(json.load(f))
+
+        if not profiles:
+            raise ModerationEngineException(f"No language profiles found in {profiles_dir}")
+
+        # Perfiles con mayúsculas separadas: se suman en minúsculas
+        freqs: List[Dict[str, int]] = []
+        for profile in profiles:
+            merged: Dict[str, int] = {}
+            for gram, count in profile["freq"].items():
+                gram = gram.lower()
+                merged[gram] = merged.get(gram, 0) + count
+            freqs.append(merged)
+
+        grams = sorted(set().union(*freqs))
+        self.index = {gram: row for row, gram in enumerate(grams)}
+        self.log_probs = np.empty((len(grams), len(profiles)), dtype=np.float32)
+
+        for column, (profile, freq) in enumerate(zip(profiles, freqs)):
+            totals = profile["n_words"]
+            counts = np.array([freq.get(gram, 0) for gram in grams], dtype=np.float64)
+            lengths = np.array([len(gram) for gram in grams]) - 1
+            self.log_probs[:, column] = np.log((counts + NGRAM_ALPHA) / np.take(totals, lengths))
+
+        self.stopwords = [STOPWORDS.get(lang, set()) for lang in self.languages]
+        self.markers = [MARKERS.get(lang, "") for lang in self.languages]
+
+    @staticmethod
+    def _default_profiles_dir() -> str:
+        import langdetect
+
+        return os.path.join(os.path.dirname(langdetect.__file__), "profiles")
+
+    def _rows(self, text: str) -> List[int]:
+        """Filas de la matriz de los n-gramas del texto"""
+        index = self.index
+        rows = []
+        for word in text.split(" "):
+            padded = f" {word} "
+            for n in (1, 2, 3):
+                for i in range(len(padded) - n + 1):
+                    row = index.get(padded[i:i + n])
+                    if row is not None:
+                        rows.append(row)
+        return rows
+
+    def identify(self, text: str) -> List[Tuple[str, float]]:
+        text = normalize_for_ngrams(text)
+        rows = self._rows(text)
+        if not rows:
+            return []
+
+        # Log-verosimilitud promedio por n-grama (la confianza no depende del largo)
+        scores = self.log_probs[rows].sum(axis=0, dtype=np.float64) / len(rows)
+
+        letters = len(text.replace(" ", ""))
+        if letters < settings.LANGUAGE_SHORT_TEXT_CHARS:
+            # Texto corto: pocas evidencias, pesan palabras y caracteres típicos
+            words = set(text.split(" "))
+            hints = np.array([
+                len(words & stopwords) + sum(1 for char in markers if char in text)
+                for stopwords, markers in zip(self.stopwords, self.markers)
+            ], dtype=np.float64)
+            scores = scores + hints * SHORT_TEXT_BOOST
+            scale = settings.LANGUAGE_CONFIDENCE_SCALE * letters / settings.LANGUAGE_SHORT_TEXT_CHARS
+        else:
+            scale = settings.LANGUAGE_CONFIDENCE_SCALE
+
+        probs = _softmax(scores * scale)
+        order = np.argsort(-probs, kind="stable")
+        return [(self.languages[i], float(probs[i])) for i in order]
+
+    def describe(self) -> Dict:
+        info = super().describe()
+        info["ngrams"] = len(self.index)
+        return info
+
+
+IDENTIFIERS = {
+    LangdetectIdentifier.name: LangdetectIdentifier,
+    NgramIdentifier.name: NgramIdentifier,
+}
+
+
+def create_language_identifier(name: Optional[str] = None) -> LanguageIdentifier:
+    """
+    Crea el motor de identificación de idioma configurado
+
+    Args:
+        name: Nombre del motor (por defecto settings.LANGUAGE_IDENTIFIER)
+
+    Returns:
+        Instancia del motor lista para usar
+    """
+    name = name or settings.LANGUAGE_IDENTIFIER
+    identifier_cls = IDENTIFIERS.get(name)
+
+    if identifier_cls is None:
+        raise ModerationEngineException(
+            f"Unknown language identifier '{name}' "
+            f"(available: {', '.join(IDENTIFIERS)})"
+        )
+
+    log.info(f"Loading language identifier: {name}")
+    return identifier_cls()
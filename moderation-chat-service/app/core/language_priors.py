@@ -0,0 +1,173 @@
+"""
+Idioma habitual por canal y por usuario, aprendido de las detecciones recientes
+
+La mayoría de los canales escriben en un solo idioma: cuando el prior es
+fuerte se usa directamente y se evita detectar el idioma de cada mensaje.
+Los conteos decaen con cada observación (pesan más los mensajes recientes),
+viven en memoria (LRU acotado) y se copian a Redis para que otras réplicas
+arranquen con el prior ya aprendido.
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from app.config.cache import RedisCache
+from app.config.settings import settings
+from app.utils.logger import log
+
+
+class LanguagePrior:
+    """Conteos con decaimiento de los idiomas vistos en un canal o usuario"""
+
+    __slots__ = ("counts", "since_sync", "since_check")
+
+    def __init__(self, counts: Optional[Dict[str, float]] = None):
+        self.counts: Dict[str, float] = dict(counts or {})
+        self.since_sync = 0
+        self.since_check = 0
+
+    @property
+    def total(self) -> float:
+        return sum(self.counts.values())
+
+    def observe(self, language: str, decay: float):
+        """Suma una observación y envejece las anteriores"""
+        for lang in self.counts:
+            self.counts[lang] *= decay
+        self.counts[language] = self.counts.get(language, 0.0) + 1.0
+        self.since_sync += 1
+
+    def top(self) -> Tuple[Optional[str], float, float]:
+        """(idioma dominante, fracción del total, total)"""
+        if not self.counts:
+            return None, 0.0, 0.0
+        total = self.total
+        language = max(self.counts, key=self.counts.get)
+        return language, self.counts[language] / total, total
+
+
+class LanguagePriors:
+    """
+    Priors de idioma por canal y por usuario
+
+    El prior del usuario tiene prioridad sobre el del canal. Cada
+    LANGUAGE_PRIOR_RECHECK_EVERY usos se vuelve a detectar el idioma para que
+    un prior que deja de ser cierto se corrija solo.
+    """
+
+    def __init__(self, cache: Optional[RedisCache] = None):
+        """
+        Inicializa los priors
+
+        Args:
+            cache: Cliente de Redis (opcional, sin él solo en memoria)
+        """
+        self.cache = cache
+        self.cache_prefix = "language_prior:"
+        self.decay = settings.LANGUAGE_PRIOR_DECAY
+        self.min_observations = settings.LANGUAGE_PRIOR_MIN_OBSERVATIONS
+        self.min_share = settings.LANGUAGE_PRIOR_MIN_SHARE
+        self.recheck_every = settings.LANGUAGE_PRIOR_RECHECK_EVERY
+        self.max_entries = settings.LANGUAGE_PRIOR_MAX_ENTRIES
+
+        self._priors: "OrderedDict[str, LanguagePrior]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, prior: LanguagePrior) -> LanguagePrior:
+        """Guarda un prior en memoria (LRU)"""
+        self._priors[key] = prior
+        self._priors.move_to_end(key)
+        while len(self._priors) > self.max_entries:
+            self._priors.popitem(last=False)
+        return prior
+
+    async def _load(self, key: str) -> LanguagePrior:
+        """Prior de memoria o, la primera vez en esta réplica, de Redis"""
+        prior = self._priors.get(key)
+        if prior is not None:
+            self._priors.move_to_end(key)
+            return prior
+
+        counts = None
+        if self.cache is not None:
+            counts = await self.cache.get(self.cache_prefix + key)
+        return self._remember(key, LanguagePrior(counts if isinstance(counts, dict) else None))
+
+    def _strong(self, prior: LanguagePrior) -> Optional[str]:
+        """Idioma del prior si es confiable"""
+        language, share, total = prior.top()
+        if language and total >= self.min_observations and share >= self.min_share:
+            return language
+        return None
+
+    async def get_language(self, channel_id: str, user_id: str) -> Optional[str]:
+        """
+        Idioma a usar sin detección, si el prior es fuerte
+
+        Args:
+            channel_id: ID del canal
+            user_id: ID del usuario
+
+        Returns:
+            Código ISO, o None si hay que detectar el idioma
+        """
+        for key in (f"user:{user_id}", f"channel:{channel_id}"):
+            prior = await self._load(key)
+            language = self._strong(prior)
+            if language is None:
+                continue
+
+            prior.since_check += 1
+            if self.recheck_every and prior.since_check >= self.recheck_every:
+                # Muestra: se detecta igual y el resultado actualiza el prior
+                prior.since_check = 0
+                break
+
+            self.hits += 1
+            return language
+
+        self.misses += 1
+        return None
+
+    def observe(self, channel_id: str, user_id: str, language: str):
+        """
+        Registra un idioma detectado (o indicado por el cliente)
+
+        Args:
+            channel_id: ID del canal
+            user_id: ID del usuario
+            language: Código ISO del idioma
+        """
+        for key in (f"user:{user_id}", f"channel:{channel_id}"):
+            prior = self._priors.get(key) or self._remember(key, LanguagePrior())
+            prior.observe(language, self.decay)
+
+            if self.cache is not None and prior.since_sync >= settings.LANGUAGE_PRIOR_SYNC_EVERY:
+                prior.since_sync = 0
+                self._schedule_sync(key, dict(prior.counts))
+
+    def _schedule_sync(self, key: str, counts: Dict[str, float]):
+        """Copia el prior a Redis en segundo plano"""
+        task = asyncio.create_task(
+            self.cache.set(self.cache_prefix + key, counts, ttl=settings.LANGUAGE_PRIOR_TTL)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._on_sync_done)
+
+    def _on_sync_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.warning(f"Language prior sync failed: {task.exception()}")
+
+    def get_metrics(self) -> Dict:
+        """Métricas de uso de los priors"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._priors),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -2,14 +2,33 @@
 Motor de moderación usando Detoxify (multilenguaje)
 """
 
-from typing import Dict, Optional
-from detoxify import Detoxify
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import time
+import numpy as np
 from app.config.settings import settings
 from app.core.language_detector import LanguageDetector
+from app.core.analysis_context import AnalysisContext
+from app.core.inference_batcher import InferenceBatcher
+from app.core.inference_backends import InferenceBackend, create_backend
+from app.core.text_chunker import TextChunker, preprocess_for_model, split_all
+from app.core.inference_executor import (
+    configure_torch_threads,
+    run_in_inference_executor,
+)
 from app.utils.logger import log
 from app.utils.exceptions import ModerationEngineException
 
 
+# Textos de calentamiento (distintos idiomas y largos)
+WARMUP_TEXTS = [
+    "hola",
+    "Hello everyone, see you tomorrow at the meeting.",
+    "Eres un idiota, nadie te quiere aquí. Cállate de una vez.",
+    " ".join(["Olá, tudo bem? Vamos almoçar juntos hoje no centro."] * 8),
+]
+
+
 class ModerationEngine:
     """
     Motor de moderación usando Detoxify para detección de toxicidad
@@ -24,11 +43,15 @@ class ModerationEngine:
         """
         self.language_detector = language_detector or LanguageDetector()
         
-        # Cargar modelo Detoxify
+        # Threads intra-op de torch (antes de cargar el modelo)
+        configure_torch_threads()
+        
+        # Cargar modelo Detoxify en el backend configurado
         try:
-            log.info(f"Loading Detoxify model: {settings.DETOXIFY_MODEL}")
-            self.model = Detoxify(settings.DETOXIFY_MODEL)
-            log.info("✅ Detoxify model loaded successfully")
+            self.backend: InferenceBackend = create_backend()
+            log.info(f"✅ Detoxify model loaded successfully ({self.backend.name})")
+        except ModerationEngineException:
+            raise
         except Exception as e:
             log.error(f"❌ Failed to load Detoxify model: {e}")
             raise ModerationEngineException(f"Failed to load Detoxify model: {e}")
@@ -39,6 +62,96 @@ class ModerationEngine:
             'medium': settings.TOXICITY_THRESHOLD_MEDIUM,
             'high': settings.TOXICITY_THRESHOLD_HIGH
         }
+        
+        # Chunking por tokens para mensajes largos (opcional)
+        self.chunker: Optional[TextChunker] = None
+        if settings.CHUNKING_ENABLED:
+            self.chunker = TextChunker(
+                self.backend.tokenizer,
+                settings.CHUNK_MAX_TOKENS,
+                settings.CHUNK_OVERLAP_TOKENS
+            )
+        
+        # Cola de micro-batching (opcional)
+        self.batcher: Optional[InferenceBatcher] = None
+        if settings.INFERENCE_BATCHING_ENABLED:
+            self.batcher = InferenceBatcher(self.predict_batch)
+    
+    def warmup(self) -> float:
+        """
+        Ejecuta inferencias de calentamiento antes de recibir tráfico
+        
+        Carga los perfiles de langdetect y pasa textos de distintos largos
+        por el modelo para que el primer request no pague la inicialización.
+        
+        Returns:
+            Duración del calentamiento en milisegundos
+        """
+        started = time.perf_counter()
+        
+        self.language_detector.detect_language("Hola, ¿cómo estás? Nos vemos mañana.")
+        self.predict_batch(WARMUP_TEXTS)
+        for text in WARMUP_TEXTS:
+            self.predict_batch([text])
+        
+        elapsed = (time.perf_counter() - started) * 1000
+        log.info(f"🔥 Moderation engine warmed up in {elapsed:.0f}ms")
+        return elapsed
+    
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Ejecuta Detoxify sobre varios textos en un solo forward pass
+        
+        Args:
+            texts: Lista de textos (no vacíos)
+            
+        Returns:
+            Lista de dicts {categoría: score}, en el mismo orden que texts
+        """
+        if not texts:
+            return []
+        
+        matrix, class_names = self._predict_matrix(texts)
+        return [dict(zip(class_names, row)) for row in matrix.tolist()]
+    
+    def _predict_matrix(self, texts: List[str]) -> Tuple[np.ndarray, List[str]]:
+        """
+        Ejecuta Detoxify y retorna los scores como matriz
+        
+        Los textos se preprocesan y los que superan CHUNK_MAX_TOKENS se
+        dividen en ventanas; el score de cada categoría es el máximo entre
+        las ventanas del texto.
+        
+        Args:
+            texts: Lista de textos (no vacíos)
+            
+        Returns:
+            Tupla (matriz N x C de scores, nombres de las C categorías)
+        """
+        if settings.TEXT_PREPROCESSING_ENABLED:
+            texts = [preprocess_for_model(text) or text for text in texts]
+        
+        # Mensajes largos se dividen en ventanas de tokens con solapamiento
+        chunks, starts = split_all(self.chunker, texts)
+        
+        if len(chunks) == len(texts):
+            # El backend procesa la lista como un solo tensor con padding
+            return self.backend.predict(list(chunks)), self.backend.class_names
+        
+        # Ventanas ordenadas por longitud y en batches para acotar el padding
+        order = np.argsort([len(chunk) for chunk in chunks], kind='stable')
+        chunk_matrix = None
+        batch_size = settings.BATCH_ANALYZE_BATCH_SIZE
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            bucket_matrix = self.backend.predict([chunks[j] for j in bucket])
+            if chunk_matrix is None:
+                chunk_matrix = np.empty((len(chunks), bucket_matrix.shape[1]), dtype=np.float64)
+            chunk_matrix[bucket] = bucket_matrix
+        
+        # Max-pooling por categoría sobre las ventanas de cada texto
+        matrix = np.maximum.reduceat(chunk_matrix, starts, axis=0)
+        return matrix, self.backend.class_names
     
     def analyze_text(self, text: str) -> Dict:
         """
@@ -55,27 +168,8 @@ class ModerationEngine:
         
         try:
             # Ejecutar Detoxify
-            results = self.model.predict(text)
-            
-            # Calcular score máximo
-            max_score = max(results.values())
-            
-            # Detectar categorías relevantes (score > 0.5)
-            detected_categories = [
-                category for category, score in results.items()
-                if score > 0.5
-            ]
-            
-            return {
-                'toxicity': float(results.get('toxicity', 0)),
-                'severe_toxicity': float(results.get('severe_toxicity', 0)),
-                'obscene': float(results.get('obscene', 0)),
-                'threat': float(results.get('threat', 0)),
-                'insult': float(results.get('insult', 0)),
-                'identity_hate': float(results.get('identity_hate', 0)),
-                'max_score': float(max_score),
-                # NO incluir detected_categories aquí, se retorna por separado
-            }
+            results = self.predict_batch([text])[0]
+            return self._format_scores(results)
             
         except Exception as e:
             log.error(f"Error analyzing text with Detoxify: {e}")
@@ -106,35 +200,75 @@ class ModerationEngine:
             # 1. Detectar idioma
             language = self.language_detector.detect_language(text)
             
-            # 2. Analizar con Detoxify
-            detoxify_result = self.analyze_text(text)
+            # 2. Analizar con Detoxify (un solo forward pass)
+            results = self.predict_batch([text])[0]
             
-            # 3. Extraer categorías detectadas (del resultado completo)
-            results_with_categories = self.model.predict(text)
-            detected_categories = [
-                category for category, score in results_with_categories.items()
-                if score > 0.5
-            ]
+            return self._build_analysis(results, language)
             
-            # 4. Determinar toxicidad
-            toxicity_score = detoxify_result['max_score']
-            is_toxic = toxicity_score >= self.thresholds['low']
+        except ModerationEngineException:
+            raise
+        except Exception as e:
+            log.error(f"Error in message analysis: {e}")
+            raise ModerationEngineException(f"Message analysis failed: {e}")
+    
+    async def analyze_message_async(self, text: str) -> Dict:
+        """
+        Análisis completo de un mensaje sin bloquear el event loop
+        
+        Args:
+            text: Texto del mensaje
+            
+        Returns:
+            Dict con análisis completo
+        """
+        return await self.analyze_context(AnalysisContext(text))
+    
+    async def analyze_context(self, context: AnalysisContext) -> Dict:
+        """
+        Análisis completo a partir de un contexto compartido
+        
+        Reutiliza el idioma y los scores si ya están en el contexto; si no,
+        los calcula una sola vez y los deja guardados para las etapas
+        siguientes. Requests concurrentes se agrupan en un mismo forward
+        pass y todo el trabajo de CPU corre en el executor de inferencia.
+        
+        Args:
+            context: Contexto de análisis del mensaje
             
-            # 5. Calcular severidad
-            severity = self._calculate_severity(toxicity_score)
+        Returns:
+            Dict con análisis completo
+        """
+        if context.is_empty:
+            return self.analyze_message(context.text)
+        
+        try:
+            # 1. Detectar idioma (solo si no viene en el contexto)
+            if context.language is None:
+                with context.timed('language'):
+                    if settings.BLACKLIST_MULTI_LANGUAGE:
+                        context.candidate_languages = await run_in_inference_executor(
+                            self.language_detector.detect_candidates,
+                            context.normalized_text
+                        )
+                        context.language = context.candidate_languages[0]
+                    else:
+                        context.language = await run_in_inference_executor(
+                            self.language_detector.detect_language,
+                            context.normalized_text
+                        )
+                        context.candidate_languages = [context.language]
             
-            # 6. Calcular confianza
-            confidence = min(toxicity_score * 1.2, 1.0) if is_toxic else 0.95
+            # 2. Analizar con Detoxify (un solo forward pass por mensaje)
+            if context.scores is None:
+                with context.timed('detoxify'):
+                    if self.batcher is not None:
+                        context.scores = await self.batcher.predict(context.normalized_text)
+                    else:
+                        context.scores = (await run_in_inference_executor(
+                            self.predict_batch, [context.normalized_text]
+                        ))[0]
             
-            return {
-                'is_toxic': is_toxic,
-                'toxicity_score': toxicity_score,
-                'severity': severity,
-                'language': language,
-                'detoxify_scores': detoxify_result,  # Sin detected_categories
-                'detoxify_categories': detected_categories,  # Separado
-                'confidence': confidence
-            }
+            return self._build_analysis(context.scores, context.language)
             
         except ModerationEngineException:
             raise
@@ -142,17 +276,170 @@ class ModerationEngine:
             log.error(f"Error in message analysis: {e}")
             raise ModerationEngineException(f"Message analysis failed: {e}")
     
+    def _format_scores(self, results: Dict[str, float]) -> Dict:
+        """
+        Normaliza los scores crudos de Detoxify al formato de respuesta
+        
+        Args:
+            results: Dict {categoría: score} de Detoxify
+            
+        Returns:
+            Dict con scores por categoría y max_score
+        """
+        return {
+            'toxicity': float(results.get('toxicity', 0)),
+            'severe_toxicity': float(results.get('severe_toxicity', 0)),
+            'obscene': float(results.get('obscene', 0)),
+            'threat': float(results.get('threat', 0)),
+            'insult': float(results.get('insult', 0)),
+            'identity_hate': float(results.get('identity_hate', 0)),
+            'max_score': float(max(results.values())) if results else 0.0,
+            # NO incluir detected_categories aquí, se retorna por separado
+        }
+    
+    def _build_analysis(self, results: Dict[str, float], language: str) -> Dict:
+        """
+        Construye el análisis completo a partir de los scores crudos
+        
+        Args:
+            results: Dict {categoría: score} de Detoxify
+            language: Idioma detectado
+            
+        Returns:
+            Dict con análisis completo
+        """
+        detoxify_result = self._format_scores(results)
+        
+        # Extraer categorías detectadas (score > 0.5)
+        detected_categories = [
+            category for category, score in results.items()
+            if score > 0.5
+        ]
+        
+        # Determinar toxicidad
+        toxicity_score = detoxify_result['max_score']
+        is_toxic = toxicity_score >= self.thresholds['low']
+        
+        # Calcular severidad
+        severity = self._calculate_severity(toxicity_score)
+        
+        # Calcular confianza
+        confidence = min(toxicity_score * 1.2, 1.0) if is_toxic else 0.95
+        
+        return {
+            'is_toxic': is_toxic,
+            'toxicity_score': toxicity_score,
+            'severity': severity,
+            'language': language,
+            'detoxify_scores': detoxify_result,  # Sin detected_categories
+            'detoxify_categories': detected_categories,  # Separado
+            'confidence': confidence
+        }
+    
     def batch_analyze(self, texts: list[str]) -> list[Dict]:
         """
         Analiza múltiples textos en batch
         
+        Los textos se ordenan por longitud en tokens y se procesan en
+        batches de BATCH_ANALYZE_BATCH_SIZE para minimizar el padding.
+        Severidad, categorías y confianza se calculan con operaciones
+        vectorizadas sobre la matriz de scores.
+        
         Args:
             texts: Lista de textos a analizar
             
         Returns:
-            Lista de resultados de análisis
+            Lista de resultados de análisis (mismo orden que texts)
         """
-        return [self.analyze_message(text) for text in texts]
+        results: list[Optional[Dict]] = [None] * len(texts)
+        
+        # Textos vacíos no pasan por el modelo
+        indices = []
+        for i, text in enumerate(texts):
+            if text and text.strip():
+                indices.append(i)
+            else:
+                results[i] = self.analyze_message(text)
+        
+        if not indices:
+            return results
+        
+        try:
+            valid_texts = [texts[i] for i in indices]
+            
+            # 1. Ordenar por longitud para que cada batch tenga poco padding
+            lengths = self._token_lengths(valid_texts)
+            order = np.argsort(lengths, kind='stable')
+            
+            # 2. Ejecutar Detoxify por batches y rearmar la matriz en orden original
+            batch_size = settings.BATCH_ANALYZE_BATCH_SIZE
+            matrix = None
+            class_names: List[str] = []
+            for start in range(0, len(order), batch_size):
+                bucket = order[start:start + batch_size]
+                bucket_matrix, class_names = self._predict_matrix(
+                    [valid_texts[j] for j in bucket]
+                )
+                if matrix is None:
+                    matrix = np.empty((len(valid_texts), bucket_matrix.shape[1]), dtype=np.float64)
+                matrix[bucket] = bucket_matrix
+            
+            # 3. Métricas vectorizadas sobre la matriz de scores
+            max_scores = matrix.max(axis=1)
+            is_toxic = max_scores >= self.thresholds['low']
+            severities = np.select(
+                [
+                    max_scores >= self.thresholds['high'],
+                    max_scores >= self.thresholds['medium'],
+                    is_toxic
+                ],
+                ['high', 'medium', 'low'],
+                default='none'
+            )
+            confidences = np.where(is_toxic, np.minimum(max_scores * 1.2, 1.0), 0.95)
+            category_mask = matrix > 0.5
+            names = np.asarray(class_names)
+            
+            # 4. Idioma y armado de resultados
+            for row, i in enumerate(indices):
+                scores = dict(zip(class_names, matrix[row].tolist()))
+                results[i] = {
+                    'is_toxic': bool(is_toxic[row]),
+                    'toxicity_score': float(max_scores[row]),
+                    'severity': str(severities[row]),
+                    'language': self.language_detector.detect_language(texts[i]),
+                    'detoxify_scores': self._format_scores(scores),
+                    'detoxify_categories': names[category_mask[row]].tolist(),
+                    'confidence': float(confidences[row])
+                }
+            
+            return results
+            
+        except Exception as e:
+            log.error(f"Error in batch analysis: {e}")
+            raise ModerationEngineException(f"Batch analysis failed: {e}")
+    
+    def _token_lengths(self, texts: List[str]) -> np.ndarray:
+        """
+        Calcula la longitud en tokens de cada texto
+        
+        Usa el tokenizer del modelo si está disponible; si no, la longitud
+        en caracteres (suficiente para ordenar).
+        
+        Args:
+            texts: Lista de textos
+            
+        Returns:
+            Array con la longitud de cada texto
+        """
+        tokenizer = self.backend.tokenizer
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(list(texts), add_special_tokens=False)['input_ids']
+                return np.asarray([len(ids) for ids in encoded])
+            except Exception as e:
+                log.debug(f"Tokenizer length failed, using char length: {e}")
+        return np.asarray([len(text) for text in texts])
     
     def _calculate_severity(self, score: float) -> str:
         """
@@ -186,6 +473,27 @@ class ModerationEngine:
             'detected_categories': []
         }
     
+    def benign_scores(self) -> Dict[str, float]:
+        """Scores en cero para mensajes resueltos sin Detoxify (pre-filtro)"""
+        return {category: 0.0 for category in self.backend.class_names}
+    
+    def cache_version(self) -> str:
+        """
+        Versión de los resultados del motor (modelo + umbrales)
+        
+        Cambia cuando cambia el modelo, el backend, los umbrales o el
+        preprocesamiento/chunking, para invalidar resultados cacheados.
+        """
+        chunking = (
+            f"{self.chunker.max_tokens}/{self.chunker.overlap}" if self.chunker else "off"
+        )
+        raw = (
+            f"{settings.DETOXIFY_MODEL}|{self.backend.name}|{self.thresholds['low']}|"
+            f"{self.thresholds['medium']}|{self.thresholds['high']}|"
+            f"{settings.TEXT_PREPROCESSING_ENABLED}|{chunking}"
+        )
+        return hashlib.sha1(raw.encode()).hexdigest()[:12]
+    
     def get_thresholds(self) -> Dict[str, float]:
         """Retorna los umbrales configurados"""
         return self.thresholds.copy()
@@ -212,6 +520,19 @@ class ModerationEngine:
             self.thresholds['high'] = high
         
         log.info(f"Thresholds updated: {self.thresholds}")
+    
+    def get_metrics(self) -> Dict:
+        """Retorna métricas del motor de inferencia"""
+        return {
+            'backend': self.backend.describe(),
+            'language_identifier': self.language_detector.describe(),
+            'batching_enabled': self.batcher is not None,
+            'chunking': {
+                'max_tokens': self.chunker.max_tokens,
+                'overlap': self.chunker.overlap
+            } if self.chunker else None,
+            'batcher': self.batcher.get_metrics() if self.batcher else None
+        }
 
 
 # Singleton instance
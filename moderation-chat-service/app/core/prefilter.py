@@ -0,0 +1,320 @@
+"""
+Pre-filtro barato (n-gramas hasheados + modelo lineal) para evitar Detoxify
+en mensajes claramente benignos
+
+El modelo se entrena offline con etiquetas de Detoxify
+(scripts/train_prefilter.py) y el umbral de escalamiento se calibra para
+alcanzar un recall objetivo sobre los mensajes tóxicos.
+"""
+
+import json
+import math
+import os
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.config.settings import settings
+from app.utils.logger import log
+from app.utils.exceptions import ModerationEngineException
+
+
+class PrefilterModel:
+    """
+    Clasificador lineal sobre n-gramas de caracteres y palabras hasheados
+
+    Los n-gramas se proyectan a `2 ** hash_bits` buckets con crc32
+    (determinístico entre procesos) y el vector se normaliza con L2.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: float = 0.0,
+        threshold: float = 0.5,
+        hash_bits: int = 18,
+        char_ngrams: Tuple[int, int] = (2, 4),
+        metadata: Optional[Dict] = None
+    ):
+        """
+        Inicializa el modelo
+
+        Args:
+            weights: Pesos por bucket (tamaño 2 ** hash_bits)
+            bias: Sesgo del modelo lineal
+            threshold: Umbral de escalamiento a Detoxify
+            hash_bits: Bits del espacio de hashing
+            char_ngrams: Rango (min, max) de n-gramas de caracteres
+            metadata: Información del entrenamiento (recall, short-circuit, etc.)
+        """
+        self.hash_bits = hash_bits
+        self.dim = 1 << hash_bits
+        self.char_ngrams = tuple(char_ngrams)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.threshold = float(threshold)
+        self.metadata = metadata or {}
+
+        if self.weights.shape != (self.dim,):
+            raise ModerationEngineException(
+                f"Prefilter weights must have {self.dim} entries, got {self.weights.shape}"
+            )
+
+    @classmethod
+    def empty(cls, hash_bits: int = 18, char_ngrams: Tuple[int, int] = (2, 4)) -> "PrefilterModel":
+        """Crea un modelo con pesos en cero (punto de partida del entrenamiento)"""
+        return cls(np.zeros(1 << hash_bits), hash_bits=hash_bits, char_ngrams=char_ngrams)
+
+    def features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extrae las features hasheadas de un texto
+
+        Args:
+            text: Texto del mensaje
+
+        Returns:
+            Tupla (índices de bucket, valores normalizados)
+        """
+        counts: Dict[int, float] = {}
+        mask = self.dim - 1
+        lowered = " ".join(text.lower().split())
+
+        # Palabras completas
+        for word in lowered.split(" "):
+            if word:
+                bucket = zlib.crc32(b"w:" + word.encode()) & mask
+                counts[bucket] = counts.get(bucket, 0.0) + 1.0
+
+        # N-gramas de caracteres (con bordes de palabra)
+        padded = f" {lowered} ".encode()
+        min_n, max_n = self.char_ngrams
+        for n in range(min_n, max_n + 1):
+            for i in range(len(padded) - n + 1):
+                bucket = zlib.crc32(padded[i:i + n]) & mask
+                counts[bucket] = counts.get(bucket, 0.0) + 1.0
+
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+        indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        values /= np.sqrt(np.dot(values, values))
+        return indices, values
+
+    def score(self, text: str) -> float:
+        """
+        Probabilidad estimada de que Detoxify marque el texto como tóxico
+
+        Args:
+            text: Texto del mensaje
+
+        Returns:
+            Score entre 0 y 1
+        """
+        indices, values = self.features(text)
+        z = self.bias + float(np.dot(self.weights[indices], values))
+        return 1.0 / (1.0 + math.exp(-max(min(z, 50.0), -50.0)))
+
+    def save(self, path: str):
+        """
+        Guarda el modelo en un archivo .npz
+
+        Args:
+            path: Ruta destino
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        config = {
+            "bias": self.bias,
+            "threshold": self.threshold,
+            "hash_bits": self.hash_bits,
+            "char_ngrams": list(self.char_ngrams),
+            "metadata": self.metadata,
+        }
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                weights=self.weights.astype(np.float32),
+                config=np.array(json.dumps(config))
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "PrefilterModel":
+        """
+        Carga un modelo guardado con save()
+
+        Args:
+            path: Ruta del archivo .npz
+
+        Returns:
+            Modelo cargado
+        """
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            weights = data["weights"].astype(np.float64)
+
+        return cls(
+            weights,
+            bias=config["bias"],
+            threshold=config["threshold"],
+            hash_bits=config["hash_bits"],
+            char_ngrams=tuple(config["char_ngrams"]),
+            metadata=config.get("metadata")
+        )
+
+
+class Prefilter:
+    """
+    Etapa de cascada previa a Detoxify
+
+    Los mensajes con score menor al umbral de escalamiento se consideran
+    benignos y no pasan por el transformer; el resto se escala. La lista
+    negra se sigue aplicando a todos los mensajes.
+    """
+
+    def __init__(self, model: PrefilterModel, threshold: Optional[float] = None):
+        """
+        Inicializa la etapa
+
+        Args:
+            model: Modelo entrenado
+            threshold: Umbral de escalamiento (por defecto el calibrado en el modelo)
+        """
+        self.model = model
+        self.threshold = threshold if threshold is not None else model.threshold
+
+        # Contadores
+        self._total = 0
+        self._short_circuited = 0
+        self._total_time = 0.0
+
+    @classmethod
+    def from_settings(cls) -> Optional["Prefilter"]:
+        """
+        Crea el pre-filtro según la configuración
+
+        Returns:
+            Prefilter listo o None si está deshabilitado o no hay modelo
+        """
+        if not settings.PREFILTER_ENABLED:
+            return None
+
+        path = settings.PREFILTER_MODEL_PATH
+        if not os.path.exists(path):
+            log.warning(f"⚠️ Prefilter enabled but model not found: {path} (disabled)")
+            return None
+
+        model = PrefilterModel.load(path)
+        prefilter = cls(model, settings.PREFILTER_ESCALATION_THRESHOLD)
+        log.info(
+            f"✅ Prefilter loaded: threshold={prefilter.threshold:.4f}, "
+            f"trained_recall={model.metadata.get('recall')}"
+        )
+        return prefilter
+
+    def should_escalate(self, text: str) -> Tuple[bool, float]:
+        """
+        Decide si un mensaje debe pasar por Detoxify
+
+        Args:
+            text: Texto normalizado del mensaje
+
+        Returns:
+            Tupla (escalar a Detoxify, score del pre-filtro)
+        """
+        started = time.perf_counter()
+        score = self.model.score(text)
+        self._total_time += time.perf_counter() - started
+
+        escalate = score >= self.threshold
+        self._total += 1
+        if not escalate:
+            self._short_circuited += 1
+
+        return escalate, score
+
+    def get_metrics(self) -> Dict:
+        """Retorna contadores de tráfico resuelto sin Detoxify"""
+        total = self._total or 1
+
+        return {
+            "threshold": self.threshold,
+            "trained_recall": self.model.metadata.get("recall"),
+            "total": self._total,
+            "short_circuited": self._short_circuited,
+            "escalated": self._total - self._short_circuited,
+            "short_circuit_ratio": self._short_circuited / total,
+            "avg_latency_us": self._total_time / total * 1e6,
+        }
+
+
+def calibrate_threshold(scores: np.ndarray, labels: np.ndarray, recall_target: float) -> float:
+    """
+    Calcula el umbral más alto que mantiene el recall objetivo
+
+    Args:
+        scores: Scores del pre-filtro
+        labels: Etiquetas (1 = tóxico según Detoxify)
+        recall_target: Fracción mínima de tóxicos que debe escalarse
+
+    Returns:
+        Umbral de escalamiento
+    """
+    positives = np.sort(scores[labels == 1])
+    if len(positives) == 0:
+        return 0.5
+
+    # Se permite dejar pasar como máximo (1 - recall) de los tóxicos
+    allowed_misses = int(math.floor((1.0 - recall_target) * len(positives)))
+    return float(np.nextafter(positives[allowed_misses], 0.0))
+
+
+def train_prefilter(
+    texts: List[str],
+    labels: np.ndarray,
+    hash_bits: int = 18,
+    epochs: int = 5,
+    learning_rate: float = 0.5,
+    l2: float = 1e-6
+) -> PrefilterModel:
+    """
+    Entrena el modelo lineal con SGD (regresión logística)
+
+    Args:
+        texts: Textos de entrenamiento
+        labels: Etiquetas 0/1
+        hash_bits: Bits del espacio de hashing
+        epochs: Pasadas sobre el dataset
+        learning_rate: Tasa de aprendizaje inicial
+        l2: Regularización L2
+
+    Returns:
+        Modelo entrenado (umbral sin calibrar)
+    """
+    model = PrefilterModel.empty(hash_bits=hash_bits)
+    samples = [model.features(text) for text in texts]
+    labels = np.asarray(labels, dtype=np.float64)
+
+    # Compensar el desbalance (la mayoría del tráfico es benigno)
+    positives = max(labels.sum(), 1.0)
+    negatives = max(len(labels) - labels.sum(), 1.0)
+    class_weight = {1.0: len(labels) / (2 * positives), 0.0: len(labels) / (2 * negatives)}
+
+    rng = np.random.default_rng(42)
+    step = 0
+    for _ in range(epochs):
+        for i in rng.permutation(len(samples)):
+            indices, values = samples[i]
+            step += 1
+            lr = learning_rate / math.sqrt(step)
+
+            z = model.bias + float(np.dot(model.weights[indices], values))
+            p = 1.0 / (1.0 + math.exp(-max(min(z, 50.0), -50.0)))
+            grad = (p - labels[i]) * class_weight[labels[i]]
+
+            model.weights[indices] -= lr * (grad * values + l2 * model.weights[indices])
+            model.bias -= lr * grad
+
+    return model
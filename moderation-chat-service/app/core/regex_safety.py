@@ -0,0 +1,466 @@
+"""
+Patrones regex de la lista negra: validación de costo, motor lineal y scans combinados
+
+Los patrones se compilan con RE2 (tiempo lineal, dependencia de
+requirements.txt). Sin RE2 se usa `re`: los patrones que pueden hacer
+backtracking catastrófico se rechazan al agregarlos y no se cargan si ya
+estaban guardados, porque `re` no suelta el GIL y un scan lento no se puede
+cortar (ni en un executor). En runtime cada patrón se mide y, si un scan
+supera BLACKLIST_REGEX_BUDGET_MS, se deshabilita en el proceso.
+"""
+
+import re
+import time
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from app.config.settings import settings
+from app.utils.exceptions import BlacklistException
+from app.utils.logger import log
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+_re2_module = None
+
+REPEAT_OPS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+BACKREFERENCE_OPS = {sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS}
+LOOKAROUND_OPS = {sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+
+
+def _get_re2():
+    """Carga RE2 una sola vez (None si no está instalado)"""
+    global _re2_module
+    if _re2_module is None:
+        try:
+            import re2
+            _re2_module = re2
+        except ImportError:
+            _re2_module = False
+    return _re2_module or None
+
+
+def regex_engine() -> str:
+    """
+    Motor de regex en uso según BLACKLIST_REGEX_ENGINE
+
+    Returns:
+        're2' o 're'
+    """
+    engine = settings.BLACKLIST_REGEX_ENGINE
+    if engine == "re":
+        return "re"
+    if _get_re2() is not None:
+        return "re2"
+    if engine == "re2":
+        raise BlacklistException("BLACKLIST_REGEX_ENGINE=re2 requires google-re2")
+    return "re"
+
+
+def compile_pattern(pattern: str):
+    """
+    Compila un patrón (sin distinguir mayúsculas) con el motor en uso
+
+    Args:
+        pattern: Expresión regular
+
+    Returns:
+        Objeto compilado con search/finditer
+
+    Raises:
+        re.error: Si el patrón no compila
+    """
+    if regex_engine() == "re2":
+        try:
+            return _get_re2().compile(f"(?i:{pattern})")
+        except Exception as e:
+            raise re.error(str(e))
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _subpatterns(value):
+    """Sub-árboles contenidos en el argumento de un nodo del parser"""
+    if isinstance(value, sre_parse.SubPattern):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _subpatterns(item)
+
+
+# Caracteres contra los que se comparan las clases (latín, griego, cirílico):
+# alcanza para saber si dos clases se solapan
+_UNIVERSE_CODES = [*range(0x0, 0x300), *range(0x370, 0x530)]
+
+
+def _fold(code: int) -> int:
+    """Código del carácter en minúsculas (los patrones se usan con IGNORECASE)"""
+    return ord(chr(code).lower()[0])
+
+
+def _char_class(predicate) -> FrozenSet[int]:
+    return frozenset(_fold(code) for code in _UNIVERSE_CODES if predicate(chr(code)))
+
+
+ANY_CHAR = _char_class(lambda char: True)
+
+CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: _char_class(str.isdecimal),
+    sre_constants.CATEGORY_NOT_DIGIT: _char_class(lambda char: not char.isdecimal()),
+    sre_constants.CATEGORY_SPACE: _char_class(str.isspace),
+    sre_constants.CATEGORY_NOT_SPACE: _char_class(lambda char: not char.isspace()),
+    sre_constants.CATEGORY_WORD: _char_class(lambda char: char.isalnum() or char == "_"),
+    sre_constants.CATEGORY_NOT_WORD: _char_class(lambda char: not (char.isalnum() or char == "_")),
+}
+
+
+def _char_set(op, av) -> Optional[FrozenSet[int]]:
+    """Caracteres que matchea un nodo de un solo carácter (None si no lo es)"""
+    if op == sre_constants.LITERAL:
+        return frozenset({_fold(av)})
+    if op == sre_constants.NOT_LITERAL:
+        return ANY_CHAR - {_fold(av)}
+    if op == sre_constants.ANY:
+        return ANY_CHAR
+    if op == sre_constants.CATEGORY:
+        return CATEGORIES.get(av, ANY_CHAR)
+    if op != sre_constants.IN:
+        return None
+
+    chars: Set[int] = set()
+    negate = False
+    for item_op, item_av in av:
+        if item_op == sre_constants.NEGATE:
+            negate = True
+        elif item_op == sre_constants.LITERAL:
+            chars.add(_fold(item_av))
+        elif item_op == sre_constants.RANGE:
+            low, high = item_av
+            chars.update(_fold(code) for code in _UNIVERSE_CODES if low <= code <= high)
+            chars.update(_fold(code) for code in range(low, min(high, low + 0x100) + 1))
+        else:
+            chars |= CATEGORIES.get(item_av, ANY_CHAR)
+    return ANY_CHAR - chars if negate else frozenset(chars)
+
+
+def _first_chars(tree) -> Tuple[FrozenSet[int], bool]:
+    """
+    Caracteres con los que puede empezar un match del sub-árbol
+
+    Returns:
+        (conjunto de códigos, True si puede matchear vacío)
+    """
+    first: Set[int] = set()
+
+    for op, av in tree:
+        nullable = False
+        chars = _char_set(op, av)
+
+        if chars is not None:
+            first |= chars
+        elif op == sre_constants.SUBPATTERN:
+            chars, nullable = _first_chars(av[-1])
+            first |= chars
+        elif op == sre_constants.BRANCH:
+            for branch in av[1]:
+                chars, branch_nullable = _first_chars(branch)
+                first |= chars
+                nullable = nullable or branch_nullable
+        elif op in REPEAT_OPS:
+            chars, inner_nullable = _first_chars(av[2])
+            first |= chars
+            nullable = av[0] == 0 or inner_nullable
+        elif op == sre_constants.AT or op in LOOKAROUND_OPS:
+            # Anclas y aserciones no consumen caracteres
+            nullable = True
+        else:
+            # Backreferences y otros: cualquier cosa, posiblemente vacía
+            first |= ANY_CHAR
+            nullable = True
+
+        if not nullable:
+            return frozenset(first), False
+
+    return frozenset(first), True
+
+
+def _branches_overlap(branches) -> bool:
+    """True si dos ramas pueden empezar igual (o una puede ser vacía)"""
+    seen: Set[int] = set()
+    for branch in branches:
+        chars, nullable = _first_chars(branch)
+        if nullable or chars & seen:
+            return True
+        seen |= chars
+    return False
+
+
+def _walk(tree, in_repeat: bool, open_sets: List[FrozenSet[int]], issues: Set[str]) -> List[FrozenSet[int]]:
+    """
+    Recorre el árbol del parser buscando construcciones costosas
+
+    Args:
+        tree: Secuencia de nodos
+        in_repeat: Si la secuencia está dentro de un cuantificador que repite
+        open_sets: Clases de los cuantificadores ilimitados previos que todavía
+            pueden absorber lo que sigue (`\w*` seguido de `a` sigue abierto)
+        issues: Problemas encontrados
+
+    Returns:
+        Clases abiertas al final de la secuencia
+    """
+    for op, av in tree:
+        if op in BACKREFERENCE_OPS:
+            issues.add("backreferences are not allowed")
+        elif op in LOOKAROUND_OPS:
+            issues.add("lookaround assertions are not allowed")
+
+        chars = _char_set(op, av)
+        if chars is not None:
+            open_sets = [open_set for open_set in open_sets if chars <= open_set]
+
+        elif op in REPEAT_OPS:
+            low, high, body = av
+            unbounded = high == sre_constants.MAXREPEAT
+            body_chars, body_nullable = _first_chars(body)
+
+            if high > 1 and body_nullable:
+                # (a?){25}: cada repetición puede matchear vacío o no
+                issues.add("quantified group can match the empty string (catastrophic backtracking)")
+            if unbounded and in_repeat:
+                issues.add("nested quantifiers (catastrophic backtracking)")
+
+            _walk(body, in_repeat or high > 1, [], issues)
+
+            if unbounded:
+                if any(open_set & body_chars for open_set in open_sets):
+                    # \w*\w*: el texto se puede repartir entre ambos de muchas formas
+                    issues.add("adjacent unbounded quantifiers over overlapping characters (catastrophic backtracking)")
+                open_sets = open_sets + [body_chars]
+            elif low > 0:
+                open_sets = [open_set for open_set in open_sets if body_chars <= open_set]
+
+        elif op == sre_constants.SUBPATTERN:
+            # Un grupo es parte de la misma secuencia
+            open_sets = _walk(av[-1], in_repeat, open_sets, issues)
+
+        elif op == sre_constants.BRANCH:
+            if in_repeat and _branches_overlap(av[1]):
+                # (a|aa)+: cada repetición puede partir el texto de muchas formas
+                issues.add("overlapping alternatives under a quantifier (catastrophic backtracking)")
+            after: List[FrozenSet[int]] = []
+            for branch in av[1]:
+                after.extend(_walk(branch, in_repeat, open_sets, issues))
+            open_sets = after
+
+        elif op in BACKREFERENCE_OPS:
+            open_sets = []
+
+        else:
+            for sub in _subpatterns(av):
+                _walk(sub, in_repeat, [], issues)
+
+    return open_sets
+
+
+def analyze_pattern(pattern: str) -> List[str]:
+    """
+    Analiza el costo de un patrón antes de aceptarlo
+
+    Con RE2 solo se exige que compile (el scan es lineal); con `re` además
+    se rechazan cuantificadores anidados, cuantificadores ilimitados
+    seguidos que comparten caracteres (`\\w*\\w*`), grupos repetidos que
+    pueden matchear vacío, alternativas que se solapan bajo un
+    cuantificador, backreferences y lookarounds.
+
+    Args:
+        pattern: Expresión regular
+
+    Returns:
+        Lista de problemas (vacía si el patrón es aceptable)
+    """
+    try:
+        compile_pattern(pattern)
+    except re.error as e:
+        return [f"invalid pattern: {e}"]
+
+    if regex_engine() == "re2":
+        return []
+
+    issues: Set[str] = set()
+    _walk(sre_parse.parse(pattern), False, [], issues)
+    return sorted(issues)
+
+
+class RegexStats:
+    """Tiempo de CPU por patrón (para encontrar reglas caras) y patrones deshabilitados"""
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        """
+        Inicializa las estadísticas
+
+        Args:
+            budget_ms: Tiempo máximo de un scan (por defecto BLACKLIST_REGEX_BUDGET_MS, 0 = sin límite)
+        """
+        budget_ms = settings.BLACKLIST_REGEX_BUDGET_MS if budget_ms is None else budget_ms
+        self.budget_ns = int(budget_ms * 1_000_000)
+
+        # rule_id -> [scans, total_ns, max_ns, matches]
+        self.rules: Dict[str, List[int]] = {}
+        self.patterns: Dict[str, str] = {}
+        self.disabled: Dict[str, str] = {}
+        self.combined_scans = 0
+        self.combined_ns = 0
+        self.combined_skips = 0
+
+    def record(self, rule, elapsed_ns: int, matches: int):
+        """
+        Registra un scan de un patrón y lo deshabilita si excede el presupuesto
+
+        Args:
+            rule: Regla del patrón (BlacklistRule)
+            elapsed_ns: Duración del scan
+            matches: Coincidencias encontradas
+        """
+        stats = self.rules.get(rule.rule_id)
+        if stats is None:
+            stats = self.rules[rule.rule_id] = [0, 0, 0, 0]
+            self.patterns[rule.rule_id] = rule.word
+        stats[0] += 1
+        stats[1] += elapsed_ns
+        stats[2] = max(stats[2], elapsed_ns)
+        stats[3] += matches
+
+        if self.budget_ns and elapsed_ns > self.budget_ns and rule.rule_id not in self.disabled:
+            self.disabled[rule.rule_id] = rule.word
+            log.error(
+                f"Regex rule {rule.rule_id} ('{rule.word}') took {elapsed_ns / 1e6:.1f}ms, "
+                f"disabled in this process"
+            )
+
+    def record_combined(self, elapsed_ns: int, matched: bool):
+        """Registra un scan combinado (prefiltro de todos los patrones de un idioma)"""
+        self.combined_scans += 1
+        self.combined_ns += elapsed_ns
+        if not matched:
+            self.combined_skips += 1
+
+    def is_disabled(self, rule_id: str) -> bool:
+        """True si el patrón fue deshabilitado por exceder el presupuesto"""
+        return rule_id in self.disabled
+
+    def reset(self):
+        """Limpia estadísticas y rehabilita todos los patrones"""
+        self.__init__(self.budget_ns / 1_000_000)
+
+    def get_metrics(self, top: int = 20) -> Dict:
+        """
+        Retorna los patrones más caros y el efecto de los scans combinados
+
+        Args:
+            top: Cantidad de patrones a listar (por tiempo total)
+        """
+        ranked = sorted(self.rules.items(), key=lambda item: item[1][1], reverse=True)[:top]
+        return {
+            "engine": regex_engine(),
+            "budget_ms": self.budget_ns / 1_000_000,
+            "combined_scans": self.combined_scans,
+            "combined_skip_rate": self.combined_skips / self.combined_scans if self.combined_scans else 0.0,
+            "combined_avg_us": self.combined_ns / self.combined_scans / 1000 if self.combined_scans else 0.0,
+            "disabled": [
+                {"rule_id": rule_id, "pattern": pattern}
+                for rule_id, pattern in self.disabled.items()
+            ],
+            "patterns": [
+                {
+                    "rule_id": rule_id,
+                    "pattern": self.patterns[rule_id],
+                    "scans": scans,
+                    "total_ms": round(total_ns / 1e6, 3),
+                    "avg_us": round(total_ns / scans / 1000, 2) if scans else 0.0,
+                    "max_ms": round(max_ns / 1e6, 3),
+                    "matches": matches,
+                }
+                for rule_id, (scans, total_ns, max_ns, matches) in ranked
+            ],
+        }
+
+
+class RegexScanner:
+    """
+    Patrones regex de un idioma con un scan combinado como prefiltro
+
+    Todos los patrones seguros se unen en una sola alternación; si no hay
+    coincidencia (el caso normal) el texto se recorre una vez en total. Solo
+    cuando algo coincide se corre cada patrón para obtener sus matches.
+    """
+
+    def __init__(self, patterns: List[Tuple[object, object]]):
+        """
+        Inicializa el scanner
+
+        Args:
+            patterns: Lista de (patrón compilado, regla)
+        """
+        self.patterns = patterns
+        self.combined = None
+        self.standalone: List[Tuple[object, object]] = []
+
+        combinable = []
+        for compiled, rule in patterns:
+            if self._combinable(rule.word):
+                combinable.append(rule.word)
+            else:
+                self.standalone.append((compiled, rule))
+
+        if combinable:
+            try:
+                self.combined = compile_pattern("|".join(f"(?:{word})" for word in combinable))
+            except re.error as e:
+                log.warning(f"Could not combine regex patterns, scanning individually: {e}")
+                self.standalone = list(patterns)
+
+    @staticmethod
+    def _combinable(pattern: str) -> bool:
+        """Un patrón entra en la alternación si es seguro y compila envuelto en un grupo"""
+        if analyze_pattern(pattern):
+            return False
+        try:
+            compile_pattern(f"(?:{pattern})")
+            return True
+        except re.error:
+            return False
+
+    def scan(self, text: str, stats: RegexStats) -> List[Tuple[str, int, int, object]]:
+        """
+        Busca todos los patrones en el texto
+
+        Args:
+            text: Texto original
+            stats: Estadísticas donde registrar tiempos
+
+        Returns:
+            Lista de (texto coincidente, inicio, fin, regla)
+        """
+        found = []
+        patterns = self.patterns
+
+        if self.combined is not None:
+            started = time.perf_counter_ns()
+            matched = self.combined.search(text) is not None
+            stats.record_combined(time.perf_counter_ns() - started, matched)
+            # Sin coincidencias: solo quedan los patrones que no se pudieron combinar
+            if not matched:
+                patterns = self.standalone
+
+        for compiled, rule in patterns:
+            if stats.is_disabled(rule.rule_id):
+                continue
+
+            started = time.perf_counter_ns()
+            matches = [(m.group(0), m.start(), m.end(), rule) for m in compiled.finditer(text)]
+            stats.record(rule, time.perf_counter_ns() - started, len(matches))
+            found.extend(matches)
+
+        return found
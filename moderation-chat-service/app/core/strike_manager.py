@@ -2,16 +2,30 @@
 Gestor de strikes y baneos
 """
 
-from typing import Dict, Optional
+import asyncio
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from app.repositories.strike_repository import StrikeRepository
 from app.repositories.ban_repository import BanRepository
+from app.repositories.violation_repository import ViolationRepository
+from app.core.ban_cache import BanCache
 from app.models.user_strike import UserStrike
 from app.models.ban import Ban
+from app.models.violation import Violation
 from app.config.settings import settings
 from app.utils.logger import log
 from app.utils.exceptions import StrikeException
 
+# Round trips a MongoDB por acción al registrar una violación: el update
+# atómico del strike (que incluye el ban) + la violación + el registro de ban.
+# Violación y ban van en paralelo; con DECISION_COMMIT_TRANSACTION se suma el
+# commit de la transacción.
+DECISION_ROUND_TRIPS = {
+    'warning': 2,
+    'temp_ban': 3,
+    'perm_ban': 3,
+}
+
 
 class StrikeManager:
     """
@@ -21,7 +35,9 @@ class StrikeManager:
     def __init__(
         self,
         strike_repository: StrikeRepository,
-        ban_repository: BanRepository
+        ban_repository: BanRepository,
+        ban_cache: Optional[BanCache] = None,
+        violation_repository: Optional[ViolationRepository] = None
     ):
         """
         Inicializa el gestor de strikes
@@ -29,9 +45,14 @@ class StrikeManager:
         Args:
             strike_repository: Repository de strikes
             ban_repository: Repository de baneos
+            ban_cache: Cache del estado de baneo (opcional)
+            violation_repository: Repository de violaciones (para registrarlas
+                junto con el strike)
         """
         self.strike_repo = strike_repository
         self.ban_repo = ban_repository
+        self.violation_repo = violation_repository
+        self.ban_cache = ban_cache
         
         # Configuración del sistema de strikes
         self.max_strikes_temp_ban = settings.MAX_STRIKES_BEFORE_TEMP_BAN
@@ -43,16 +64,24 @@ class StrikeManager:
         user_id: str,
         channel_id: str,
         severity: str,
-        reason: str
+        reason: str,
+        violation: Optional[Violation] = None
     ) -> Dict:
         """
-        Aplica un strike a un usuario
+        Aplica un strike a un usuario y persiste la decisión
+        
+        La decisión se calcula en el mismo update atómico del strike (que
+        también deja el ban en user_strikes); después se escriben la
+        violación y el registro de ban en paralelo, o todo en una
+        transacción si DECISION_COMMIT_TRANSACTION está habilitado.
+        Round trips a MongoDB por acción en DECISION_ROUND_TRIPS.
         
         Args:
             user_id: ID del usuario
             channel_id: ID del canal
             severity: Severidad de la violación
             reason: Razón del strike
+            violation: Violación a registrar con la acción tomada (opcional)
             
         Returns:
             Dict con acción tomada:
@@ -64,55 +93,114 @@ class StrikeManager:
             }
         """
         try:
-            # 1. Incrementar strike
-            strike = await self.strike_repo.increment_strike(user_id, channel_id)
+            if settings.DECISION_COMMIT_TRANSACTION:
+                client = self.strike_repo.db.client
+                async with await client.start_session() as session:
+                    # Reintenta la transacción y el commit ante errores transitorios
+                    strike, result, ban = await session.with_transaction(
+                        lambda s: self._commit_decision(user_id, channel_id, reason, violation, s)
+                    )
+            else:
+                strike, result, ban = await self._commit_decision(
+                    user_id, channel_id, reason, violation
+                )
             
             log.info(
                 f"Strike applied: user={user_id}, channel={channel_id}, "
-                f"count={strike.strike_count}, severity={severity}"
+                f"count={strike.strike_count}, severity={severity}, action={result['action']}"
             )
             
-            # 2. Determinar acción basada en strikes
-            action_result = await self._determine_action(
-                strike,
-                user_id,
-                channel_id,
-                severity,
-                reason
-            )
+            if ban is not None:
+                if self.ban_cache is not None:
+                    await self.ban_cache.on_ban(user_id, channel_id, ban.banned_until)
+                log.warning(
+                    f"{ban.ban_type.capitalize()} ban applied: user={user_id}, channel={channel_id}, "
+                    f"until={ban.banned_until.isoformat() if ban.banned_until else 'never'}"
+                )
             
-            return action_result
+            return result
             
         except Exception as e:
             log.error(f"Error applying strike: {e}")
             raise StrikeException(f"Failed to apply strike: {e}")
     
-    async def _determine_action(
+    async def _commit_decision(
+        self,
+        user_id: str,
+        channel_id: str,
+        reason: str,
+        violation: Optional[Violation],
+        session=None
+    ) -> Tuple[UserStrike, Dict, Optional[Ban]]:
+        """
+        Incrementa el strike (con el ban incluido) y escribe violación y ban
+        
+        Args:
+            user_id: ID del usuario
+            channel_id: ID del canal
+            reason: Razón del strike
+            violation: Violación a registrar (opcional)
+            session: Sesión con transacción abierta (opcional)
+            
+        Returns:
+            (strike actualizado, resultado de la acción, ban creado o None)
+        """
+        strike = await self.strike_repo.increment_strike(
+            user_id,
+            channel_id,
+            temp_ban_at=self.max_strikes_temp_ban,
+            perm_ban_at=self.max_strikes_perm_ban,
+            session=session
+        )
+        result, ban = self._determine_action(strike, user_id, channel_id, reason)
+        
+        writes = []
+        if violation is not None:
+            violation.action_taken = result['action']
+            violation.strike_count_at_time = strike.strike_count
+            writes.append(self.violation_repo.create_violation(violation, session=session))
+        if ban is not None:
+            writes.append(self.ban_repo.create_ban(ban, session=session))
+        
+        if session is not None:
+            # Una transacción no admite operaciones concurrentes
+            for write in writes:
+                await write
+        elif writes:
+            await asyncio.gather(*writes)
+        
+        return strike, result, ban
+    
+    def _determine_action(
         self,
         strike: UserStrike,
         user_id: str,
         channel_id: str,
-        severity: str,
         reason: str
-    ) -> Dict:
+    ) -> Tuple[Dict, Optional[Ban]]:
         """
         Determina qué acción tomar basado en el número de strikes
         
         Args:
-            strike: Objeto UserStrike actualizado
+            strike: Objeto UserStrike actualizado (con el ban ya aplicado)
             user_id: ID del usuario
             channel_id: ID del canal
-            severity: Severidad
             reason: Razón
             
         Returns:
-            Dict con acción y detalles
+            (dict con acción y detalles, registro de ban a crear o None)
         """
         strike_count = strike.strike_count
         
         # Caso 1: Ban permanente
         if strike_count >= self.max_strikes_perm_ban:
-            await self._apply_permanent_ban(strike, user_id, channel_id, reason)
+            ban = Ban.create_permanent(
+                user_id=user_id,
+                channel_id=channel_id,
+                reason=reason,
+                total_violations=strike_count,
+                banned_by="system"
+            )
             
             return {
                 'action': 'perm_ban',
@@ -122,11 +210,19 @@ class StrikeManager:
                     'type': 'permanent',
                     'expires_at': None
                 }
-            }
+            }, ban
         
         # Caso 2: Ban temporal
         elif strike_count >= self.max_strikes_temp_ban:
-            ban_until = await self._apply_temporary_ban(strike, user_id, channel_id, reason)
+            ban_until = strike.ban_expires_at or datetime.utcnow() + timedelta(hours=self.temp_ban_hours)
+            ban = Ban.create_temporary(
+                user_id=user_id,
+                channel_id=channel_id,
+                reason=reason,
+                banned_until=ban_until,
+                total_violations=strike_count,
+                banned_by="system"
+            )
             
             return {
                 'action': 'temp_ban',
@@ -136,7 +232,7 @@ class StrikeManager:
                     'type': 'temporary',
                     'expires_at': ban_until.isoformat()
                 }
-            }
+            }, ban
         
         # Caso 3: Solo advertencia
         else:
@@ -145,83 +241,7 @@ class StrikeManager:
                 'strike_count': strike_count,
                 'message': f'Advertencia. Strike {strike_count}/{self.max_strikes_temp_ban}',
                 'ban_info': None
-            }
-    
-    async def _apply_temporary_ban(
-        self,
-        strike: UserStrike,
-        user_id: str,
-        channel_id: str,
-        reason: str
-    ) -> datetime:
-        """
-        Aplica un ban temporal
-        
-        Args:
-            strike: UserStrike
-            user_id: ID del usuario
-            channel_id: ID del canal
-            reason: Razón del ban
-            
-        Returns:
-            Fecha de expiración del ban
-        """
-        # Actualizar strike
-        await self.strike_repo.apply_ban(user_id, channel_id, "temporary")
-        
-        # Crear registro de ban
-        ban_until = datetime.utcnow() + timedelta(hours=self.temp_ban_hours)
-        ban = Ban.create_temporary(
-            user_id=user_id,
-            channel_id=channel_id,
-            reason=reason,
-            banned_until=ban_until,
-            total_violations=strike.strike_count,
-            banned_by="system"
-        )
-        
-        await self.ban_repo.create_ban(ban)
-        
-        log.warning(
-            f"Temporary ban applied: user={user_id}, channel={channel_id}, "
-            f"until={ban_until.isoformat()}"
-        )
-        
-        return ban_until
-    
-    async def _apply_permanent_ban(
-        self,
-        strike: UserStrike,
-        user_id: str,
-        channel_id: str,
-        reason: str
-    ):
-        """
-        Aplica un ban permanente
-        
-        Args:
-            strike: UserStrike
-            user_id: ID del usuario
-            channel_id: ID del canal
-            reason: Razón del ban
-        """
-        # Actualizar strike
-        await self.strike_repo.apply_ban(user_id, channel_id, "permanent")
-        
-        # Crear registro de ban
-        ban = Ban.create_permanent(
-            user_id=user_id,
-            channel_id=channel_id,
-            reason=reason,
-            total_violations=strike.strike_count,
-            banned_by="system"
-        )
-        
-        await self.ban_repo.create_ban(ban)
-        
-        log.warning(
-            f"Permanent ban applied: user={user_id}, channel={channel_id}"
-        )
+            }, None
     
     async def is_user_banned(
         self,
@@ -239,6 +259,12 @@ class StrikeManager:
             Tupla (is_banned, ban_info)
         """
         try:
+            # Cache en memoria: los no baneados se resuelven sin MongoDB
+            if self.ban_cache is not None:
+                cached = await self.ban_cache.lookup(user_id, channel_id)
+                if cached is False:
+                    return False, None
+            
             # Verificar strike
             strike = await self.strike_repo.get_by_user_and_channel(user_id, channel_id)
             
@@ -285,6 +311,9 @@ class StrikeManager:
             # Actualizar ban
             success = await self.ban_repo.unban_user(user_id, channel_id, unbanned_by, reason)
             
+            if self.ban_cache is not None:
+                await self.ban_cache.on_unban(user_id, channel_id)
+            
             if success:
                 log.info(
                     f"User unbanned: user={user_id}, channel={channel_id}, "
@@ -382,6 +411,9 @@ class StrikeManager:
             # Actualizar bans
             bans_updated = await self.ban_repo.check_and_expire_bans()
             
+            if self.ban_cache is not None:
+                await self.ban_cache.prune_expired()
+            
             total = strikes_updated + bans_updated
             if total > 0:
                 log.info(f"Expired bans updated: {total}")
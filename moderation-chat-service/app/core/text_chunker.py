@@ -0,0 +1,134 @@
+"""
+Preprocesamiento y chunking por tokens de mensajes para el modelo de toxicidad
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+
+# URLs, menciones y caracteres repetidos (solo para la entrada del modelo)
+URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+MENTION_PATTERN = re.compile(r"(?<!\w)@\w+")
+REPEATED_CHAR_PATTERN = re.compile(r"(\S)\1{3,}")
+WORD_PATTERN = re.compile(r"\S+")
+
+
+def preprocess_for_model(text: str) -> str:
+    """
+    Reduce tokens sin cambiar el contenido relevante para toxicidad
+
+    - URLs -> "URL"
+    - Menciones -> "@user"
+    - Caracteres repetidos 4+ veces -> 3 ("noooooo" -> "nooo")
+
+    Args:
+        text: Texto del mensaje
+
+    Returns:
+        Texto preprocesado
+    """
+    text = URL_PATTERN.sub("URL", text)
+    text = MENTION_PATTERN.sub("@user", text)
+    text = REPEATED_CHAR_PATTERN.sub(r"\1\1\1", text)
+    return " ".join(text.split())
+
+
+class TextChunker:
+    """
+    Divide textos largos en ventanas de tokens con solapamiento
+
+    Cada ventana es un substring del texto original (usando los offsets del
+    tokenizer), así el modelo nunca trunca contenido y el costo de un
+    mensaje largo crece linealmente con su longitud.
+    """
+
+    def __init__(self, tokenizer, max_tokens: int, overlap: int):
+        """
+        Inicializa el chunker
+
+        Args:
+            tokenizer: Tokenizer del modelo (HF fast tokenizer) o None
+            max_tokens: Tokens máximos por ventana (sin tokens especiales)
+            overlap: Tokens compartidos entre ventanas consecutivas
+        """
+        self.tokenizer = tokenizer
+
+        model_max = getattr(tokenizer, "model_max_length", None)
+        if isinstance(model_max, int) and model_max < 100_000:
+            max_tokens = min(max_tokens, model_max - 2)
+
+        self.max_tokens = max(max_tokens, 1)
+        self.overlap = min(max(overlap, 0), self.max_tokens - 1)
+
+    def _token_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Retorna los spans (inicio, fin) en caracteres de cada token
+
+        Usa los offsets del tokenizer; si no están disponibles, cada palabra
+        cuenta como un token.
+        """
+        if self.tokenizer is not None:
+            try:
+                encoded = self.tokenizer(
+                    text,
+                    add_special_tokens=False,
+                    return_offsets_mapping=True
+                )
+                spans = [tuple(span) for span in encoded["offset_mapping"]]
+                if spans:
+                    return spans
+            except Exception:
+                pass
+        return [match.span() for match in WORD_PATTERN.finditer(text)]
+
+    def split(self, text: str) -> List[str]:
+        """
+        Divide un texto en ventanas de a lo más max_tokens tokens
+
+        Args:
+            text: Texto (ya preprocesado)
+
+        Returns:
+            Lista de chunks (un solo elemento si el texto cabe entero)
+        """
+        # Camino rápido: la mayoría de los mensajes de chat son cortos
+        if len(text) <= self.max_tokens // 2:
+            return [text]
+
+        spans = self._token_spans(text)
+        if len(spans) <= self.max_tokens:
+            return [text]
+
+        chunks = []
+        step = self.max_tokens - self.overlap
+        for start in range(0, len(spans), step):
+            end = min(start + self.max_tokens, len(spans))
+            chunk = text[spans[start][0]:spans[end - 1][1]].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end == len(spans):
+                break
+
+        return chunks or [text]
+
+
+def split_all(chunker: Optional[TextChunker], texts: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    Divide varios textos y retorna los chunks y el índice inicial de cada texto
+
+    Args:
+        chunker: Chunker a usar (None = sin chunking)
+        texts: Textos a dividir
+
+    Returns:
+        Tupla (chunks concatenados, offset del primer chunk de cada texto)
+    """
+    if chunker is None:
+        return list(texts), list(range(len(texts)))
+
+    chunks: List[str] = []
+    starts: List[int] = []
+    for text in texts:
+        starts.append(len(chunks))
+        chunks.extend(chunker.split(text))
+    return chunks, starts
@@ -0,0 +1,179 @@
+"""
+Plegado de texto para la lista negra (casefold, acentos, homoglifos, leet, repeticiones)
+
+El texto y las palabras de la lista negra se pliegan con las mismas tablas,
+así "ıd1ooota", "IDIÓTA" o "id<U+200B>iota" coinciden con "idiota" usando el
+automata de palabras exactas, sin regex escritas a mano. El plegado se hace
+en una sola pasada y conserva, por cada carácter plegado, su rango en el
+texto original.
+
+Las rachas de una misma letra se reducen a una ("tooonto" → "tonto") y se
+guarda el largo de cada racha: con `runs_compatible` una letra doble de la
+palabra solo coincide con una doble (o alargada) del texto, así "perra" y
+"pera" o "ass" y "as" siguen siendo palabras distintas.
+"""
+
+import unicodedata
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+# Caracteres invisibles usados para partir palabras
+ZERO_WIDTH = {
+    "\u00ad",  # soft hyphen
+    "\u200b", "\u200c", "\u200d", "\u200e", "\u200f",
+    "\u2060", "\u2061", "\u2062", "\u2063", "\u2064",
+    "\ufeff",
+}
+
+# Letras cirílicas/griegas que se ven como latinas
+HOMOGLYPHS = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h",
+    "о": "o", "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "і": "i",
+    "ј": "j", "ѕ": "s", "ԁ": "d", "ԛ": "q", "ԝ": "w",
+    "α": "a", "β": "b", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o",
+    "ρ": "p", "τ": "t", "υ": "u", "χ": "x",
+    "ı": "i", "ł": "l", "ø": "o", "đ": "d", "ß": "ss", "æ": "ae", "œ": "oe",
+}
+
+# Sustituciones leet: dígitos junto a una letra, símbolos seguidos de una
+# letra (así "2024" o "idiota!" no cambian)
+LEET_DIGITS = {"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b"}
+LEET_SYMBOLS = {"@": "a", "$": "s", "!": "i", "|": "l", "€": "e"}
+
+# Letras que no se despojan de su diacrítico (cambian la palabra: año/ano)
+PRESERVED = {"ñ"}
+
+# Desde este largo una racha del texto se considera alargada ("tooonto") y
+# coincide tanto con una letra simple como con una doble de la palabra
+ELONGATED_RUN = 3
+
+
+@lru_cache(maxsize=8192)
+def _fold_char(char: str) -> str:
+    """Plegado de un carácter: casefold, homoglifos y eliminación de acentos"""
+    if char in ZERO_WIDTH:
+        return ""
+
+    char = char.casefold()
+    if char in PRESERVED:
+        return char
+    if char in HOMOGLYPHS:
+        return HOMOGLYPHS[char]
+
+    decomposed = unicodedata.normalize("NFKD", char)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _build_table() -> dict:
+    """Tabla precalculada para Latin-1, Latin Extended y los homoglifos"""
+    chars = [chr(code) for code in range(0x250)]
+    chars += list(HOMOGLYPHS) + [c.upper() for c in HOMOGLYPHS] + list(ZERO_WIDTH)
+    return {char: _fold_char(char) for char in chars}
+
+
+FOLD_TABLE = _build_table()
+
+
+class FoldedText(NamedTuple):
+    """Texto plegado con el rango original y el largo de racha de cada carácter"""
+
+    text: str
+    starts: List[int]
+    ends: List[int]
+    runs: List[int]
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """
+        Traduce un rango del texto plegado al texto original
+
+        Args:
+            start: Offset inicial en el texto plegado
+            end: Offset final (exclusivo) en el texto plegado
+
+        Returns:
+            (inicio, fin) en el texto original
+        """
+        return self.starts[start], self.ends[end - 1]
+
+    def runs_compatible(self, start: int, end: int, word: str) -> bool:
+        """
+        Verifica que las rachas de un match respeten las letras dobles de la palabra
+
+        Args:
+            start: Offset inicial en el texto plegado
+            end: Offset final (exclusivo) en el texto plegado
+            word: Palabra original de la regla (sin plegar)
+
+        Returns:
+            True si cada racha del texto es igual a la de la palabra, o alargada
+        """
+        word_runs = _word_runs(word)
+        if len(word_runs) != end - start:
+            return False
+        text_runs = self.runs
+        for offset, word_run in enumerate(word_runs):
+            text_run = text_runs[start + offset]
+            if text_run != word_run and text_run < ELONGATED_RUN:
+                return False
+        return True
+
+
+def fold_text(text: str) -> FoldedText:
+    """
+    Pliega un texto en una sola pasada
+
+    - casefold, acentos fuera (salvo ñ), homoglifos → latín
+    - caracteres de ancho cero eliminados
+    - leet (0→o, 1→i, @→a, ...) solo dentro de palabras
+    - rachas de letras iguales se reducen a una ("tooonto" → "tonto"); el
+      largo de cada racha queda en `runs`
+
+    Args:
+        text: Texto original
+
+    Returns:
+        FoldedText con offsets al original
+    """
+    table = FOLD_TABLE
+    length = len(text)
+    out: List[str] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    runs: List[int] = []
+    last = ""
+
+    for i, char in enumerate(text):
+        next_alpha = i + 1 < length and text[i + 1].isalpha()
+        if char in LEET_DIGITS and (next_alpha or (i > 0 and text[i - 1].isalpha())):
+            folded = LEET_DIGITS[char]
+        elif char in LEET_SYMBOLS and next_alpha:
+            folded = LEET_SYMBOLS[char]
+        else:
+            folded = table.get(char)
+            if folded is None:
+                folded = _fold_char(char)
+
+        for c in folded:
+            if c == last and c.isalpha():
+                # Misma letra repetida: extiende el rango y la racha del carácter anterior
+                ends[-1] = i + 1
+                runs[-1] += 1
+                continue
+            out.append(c)
+            starts.append(i)
+            ends.append(i + 1)
+            runs.append(1)
+            last = c
+
+    return FoldedText("".join(out), starts, ends, runs)
+
+
+@lru_cache(maxsize=65536)
+def _word_runs(word: str) -> Tuple[int, ...]:
+    """Rachas de una palabra de la lista negra (una racha larga cuenta como doble)"""
+    return tuple(min(run, 2) for run in fold_text(word).runs)
+
+
+def fold_word(word: str) -> str:
+    """Pliega una palabra de la lista negra (mismas reglas que el texto)"""
+    return fold_text(word).text
@@ -0,0 +1,194 @@
+"""
+Cache de veredictos por hash de contenido (LRU en proceso + Redis)
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+from app.config.cache import RedisCache
+from app.config.settings import settings
+from app.utils.logger import log
+
+
+class VerdictCache:
+    """
+    Cache de dos niveles para idioma + scores de Detoxify
+
+    - Nivel 1: LRU en proceso con tamaño máximo y TTL
+    - Nivel 2: Redis (compartido entre réplicas)
+
+    Las claves incluyen una versión (modelo + umbrales); al cambiar la
+    versión el LRU se vacía y las claves viejas de Redis dejan de usarse.
+    Textos idénticos en vuelo comparten un solo cálculo.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCache,
+        version_fn: Callable[[], str],
+        max_size: Optional[int] = None,
+        ttl: Optional[int] = None,
+        redis_ttl: Optional[int] = None
+    ):
+        """
+        Inicializa el cache de veredictos
+
+        Args:
+            cache: Cliente Redis
+            version_fn: Función que retorna la versión actual (modelo + umbrales)
+            max_size: Entradas máximas en el LRU en proceso
+            ttl: TTL de las entradas en proceso (segundos)
+            redis_ttl: TTL de las entradas en Redis (segundos)
+        """
+        self.cache = cache
+        self.version_fn = version_fn
+        self.max_size = max_size or settings.VERDICT_CACHE_MAX_SIZE
+        self.ttl = ttl or settings.VERDICT_CACHE_TTL
+        self.redis_ttl = redis_ttl or settings.VERDICT_CACHE_REDIS_TTL
+
+        self.cache_prefix = "verdict"
+
+        self._entries: "OrderedDict[str, tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._version: Optional[str] = None
+
+        # Contadores
+        self._hits_local = 0
+        self._hits_redis = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    @staticmethod
+    def content_key(normalized_text: str) -> str:
+        """
+        Calcula la clave de un texto normalizado
+
+        Args:
+            normalized_text: Texto ya normalizado
+
+        Returns:
+            Hash hexadecimal del contenido
+        """
+        return hashlib.sha256(normalized_text.encode()).hexdigest()
+
+    def _check_version(self) -> str:
+        """Invalida el LRU si cambió la versión (modelo o umbrales)"""
+        version = self.version_fn()
+        if version != self._version:
+            if self._version is not None:
+                log.info(f"Verdict cache version changed: {self._version} -> {version}")
+            self._entries.clear()
+            self._version = version
+        return version
+
+    def _get_local(self, key: str) -> Optional[Dict]:
+        """Busca en el LRU en proceso"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_local(self, key: str, value: Dict):
+        """Guarda en el LRU en proceso, expulsando la entrada más antigua"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    async def get_or_compute(
+        self,
+        normalized_text: str,
+        compute: Callable[[], Awaitable[Dict]]
+    ) -> Dict:
+        """
+        Obtiene el veredicto de un texto o lo calcula una sola vez
+
+        Args:
+            normalized_text: Texto normalizado del mensaje
+            compute: Corrutina que calcula el veredicto si no está en cache
+                ({'language': str | None, 'languages': List[str], 'scores': Dict[str, float]})
+
+        Returns:
+            Veredicto cacheado o recién calculado
+        """
+        version = self._check_version()
+        key = f"{version}:{self.content_key(normalized_text)}"
+
+        # 1. LRU en proceso
+        value = self._get_local(key)
+        if value is not None:
+            self._hits_local += 1
+            return value
+
+        # 2. Mismo texto ya en vuelo: esperar ese cálculo
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._coalesced += 1
+            return await asyncio.shield(inflight)
+
+        # El cálculo corre en su propia tarea: si se cancela el request que lo
+        # inició, los que esperan el mismo texto igual reciben el resultado
+        task = asyncio.create_task(self._load(key, compute))
+        task.add_done_callback(lambda t: self._finish(key, t))
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Busca el veredicto en Redis o lo calcula, y lo guarda en ambos niveles"""
+        # 3. Redis
+        cache_key = f"{self.cache_prefix}:{key}"
+        value = await self.cache.get(cache_key)
+
+        if isinstance(value, dict):
+            self._hits_redis += 1
+        else:
+            # 4. Calcular y guardar en ambos niveles
+            self._misses += 1
+            value = await compute()
+            await self.cache.set(cache_key, value, ttl=self.redis_ttl)
+
+        self._set_local(key, value)
+        return value
+
+    def _finish(self, key: str, task: asyncio.Task):
+        """Quita un cálculo terminado de los en vuelo (y marca su error como visto)"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self):
+        """Vacía el LRU en proceso"""
+        self._entries.clear()
+
+    def get_metrics(self) -> dict:
+        """Retorna contadores de hit/miss del cache"""
+        lookups = self._hits_local + self._hits_redis + self._misses + self._coalesced
+
+        return {
+            "version": self._version,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "in_flight": len(self._inflight),
+            "hits_local": self._hits_local,
+            "hits_redis": self._hits_redis,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "hit_ratio": (
+                (self._hits_local + self._hits_redis + self._coalesced) / lookups
+                if lookups else 0.0
+            ),
+        }
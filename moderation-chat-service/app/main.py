@@ -13,6 +13,8 @@ from app.config.settings import settings
 from app.config.database import mongodb
 from app.config.cache import redis_cache
 from app.config.events import rabbitmq
+from app.core.inference_executor import shutdown_inference_executor
+from app.services.startup_orchestrator import startup_orchestrator
 from app.api.v1.router import api_router
 from app.utils.logger import log, setup_logger
 from app.utils.exceptions import ModerationServiceException
@@ -31,18 +33,9 @@ async def lifespan(app: FastAPI):
     log.info(f"Environment: {settings.ENVIRONMENT}")
     
     try:
-        # Connect to MongoDB
-        await mongodb.connect()
-        await mongodb.create_indexes()
-        
-        # Connect to Redis
-        await redis_cache.connect()
-        
-        # Connect to RabbitMQ
-        if settings.RABBITMQ_ENABLED:
-            await rabbitmq.connect()
-        
-        log.info("✅ All services connected successfully")
+        # Connect MongoDB, Redis and RabbitMQ concurrently while the model
+        # loads; warm-up and blacklist continue in background (see /ready)
+        await startup_orchestrator.start()
         
     except Exception as e:
         log.error(f"❌ Failed to start services: {e}")
@@ -54,10 +47,12 @@ async def lifespan(app: FastAPI):
     log.info("Shutting down services...")
     
     try:
+        await startup_orchestrator.stop()
         await mongodb.disconnect()
         await redis_cache.disconnect()
         if settings.RABBITMQ_ENABLED:
             await rabbitmq.disconnect()
+        shutdown_inference_executor()
         
         log.info("✅ All services disconnected successfully")
         
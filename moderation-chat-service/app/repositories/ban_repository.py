@@ -16,12 +16,13 @@ class BanRepository(BaseRepository[Ban]):
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, "bans")
     
-    async def create_ban(self, ban: Ban) -> Ban:
+    async def create_ban(self, ban: Ban, session=None) -> Ban:
         """
         Crea un nuevo registro de ban
         
         Args:
             ban: Objeto Ban
+            session: Sesión de MongoDB (opcional, para transacciones)
             
         Returns:
             Ban con ID asignado
@@ -29,7 +30,7 @@ class BanRepository(BaseRepository[Ban]):
         ban_dict = ban.to_dict()
         ban_dict.pop("_id", None)
         
-        ban_id = await self.create(ban_dict)
+        ban_id = await self.create(ban_dict, session=session)
         ban.id = ban_id
         
         log.info(
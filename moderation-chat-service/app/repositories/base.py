@@ -5,6 +5,8 @@ Repository base con métodos comunes
 from typing import TypeVar, Generic, Optional, List, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.utils.logger import log
 from app.utils.exceptions import DatabaseException
 
@@ -21,22 +23,26 @@ class BaseRepository(Generic[T]):
         self.collection: AsyncIOMotorCollection = db[collection_name]
         self.collection_name = collection_name
     
-    async def create(self, document: dict) -> Optional[str]:
+    async def create(self, document: dict, session=None) -> Optional[str]:
         """
         Crea un documento
         
         Args:
             document: Diccionario con los datos del documento
+            session: Sesión de MongoDB (opcional, para transacciones)
             
         Returns:
             ID del documento creado
         """
         try:
-            result = await self.collection.insert_one(document)
+            result = await self.collection.insert_one(document, session=session)
             log.debug(f"Created document in {self.collection_name}: {result.inserted_id}")
             return str(result.inserted_id)
         except Exception as e:
             log.error(f"Error creating document in {self.collection_name}: {e}")
+            if session is not None:
+                # Con sus labels, para que with_transaction decida si reintentar
+                raise
             raise DatabaseException(f"Failed to create document: {e}")
     
     async def find_by_id(self, document_id: str) -> Optional[dict]:
@@ -137,6 +143,53 @@ class BaseRepository(Generic[T]):
             log.error(f"Error updating document in {self.collection_name}: {e}")
             raise DatabaseException(f"Failed to update document: {e}")
     
+    async def find_one_and_update(
+        self,
+        query: dict,
+        update: Any,
+        upsert: bool = False,
+        session=None
+    ) -> Optional[dict]:
+        """
+        Actualiza un documento y lo retorna ya actualizado (un solo round trip)
+        
+        Con upsert, dos inserciones concurrentes pueden chocar con un índice
+        único; la que pierde se reintenta una vez y actualiza el documento
+        creado por la otra. Dentro de una transacción no se reintenta (el
+        error ya la abortó) y el error de MongoDB se propaga tal cual, con
+        sus labels, para que `with_transaction` decida si reintentar.
+        
+        Args:
+            query: Criterios para encontrar el documento
+            update: Operadores de actualización o pipeline de agregación
+            upsert: Si crear el documento si no existe
+            session: Sesión de MongoDB (opcional, para transacciones)
+            
+        Returns:
+            Documento actualizado o None si no existe (sin upsert)
+        """
+        retry = upsert and session is None
+        for attempt in range(2 if retry else 1):
+            try:
+                return await self.collection.find_one_and_update(
+                    query,
+                    update,
+                    upsert=upsert,
+                    return_document=ReturnDocument.AFTER,
+                    session=session
+                )
+            except DuplicateKeyError:
+                if retry and not attempt:
+                    continue
+                if session is not None:
+                    raise
+                raise DatabaseException(f"Concurrent upsert conflict in {self.collection_name}")
+            except Exception as e:
+                log.error(f"Error updating document in {self.collection_name}: {e}")
+                if session is not None:
+                    raise
+                raise DatabaseException(f"Failed to update document: {e}")
+    
     async def update_by_id(
         self,
         document_id: str,
@@ -2,12 +2,17 @@
 Repository para gestión de lista negra
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
 from app.repositories.base import BaseRepository
 from app.models.blacklist_word import BlacklistWord
 from app.utils.logger import log
+from app.utils.exceptions import DatabaseException
+
+# Código de error de MongoDB para violación de índice único
+DUPLICATE_KEY_ERROR = 11000
 
 
 class BlacklistRepository(BaseRepository[BlacklistWord]):
@@ -174,10 +179,32 @@ class BlacklistRepository(BaseRepository[BlacklistWord]):
             words: Lista de BlacklistWord
             
         Returns:
-            Número de palabras insertadas
+            Número de palabras insertadas (0 si falla; el error queda en el log)
         """
-        if not words:
+        try:
+            inserted, _ = await self.bulk_insert_skip_duplicates(words)
+        except DatabaseException:
             return 0
+        return inserted
+    
+    async def bulk_insert_skip_duplicates(self, words: List[BlacklistWord]) -> Tuple[int, int]:
+        """
+        Inserta múltiples palabras sin orden, omitiendo las ya existentes
+        
+        Las palabras que chocan con el índice único (word, language) no
+        detienen el lote; el resto se inserta igual.
+        
+        Args:
+            words: Lista de BlacklistWord
+            
+        Returns:
+            Tupla (insertadas, duplicadas)
+            
+        Raises:
+            DatabaseException: Si falla algo distinto de un duplicado
+        """
+        if not words:
+            return 0, 0
         
         words_dict = [word.to_dict() for word in words]
         for word in words_dict:
@@ -185,12 +212,20 @@ class BlacklistRepository(BaseRepository[BlacklistWord]):
         
         try:
             result = await self.collection.insert_many(words_dict, ordered=False)
-            inserted = len(result.inserted_ids)
-            log.info(f"Bulk inserted {inserted} blacklist words")
-            return inserted
+            inserted, duplicates = len(result.inserted_ids), 0
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            duplicates = sum(1 for error in errors if error.get("code") == DUPLICATE_KEY_ERROR)
+            if duplicates != len(errors):
+                log.error(f"Error in bulk insert: {errors[0].get('errmsg')}")
+                raise DatabaseException(f"Bulk insert failed: {errors[0].get('errmsg')}")
+            inserted = e.details.get("nInserted", 0)
         except Exception as e:
             log.error(f"Error in bulk insert: {e}")
-            return 0
+            raise DatabaseException(f"Bulk insert failed: {e}")
+        
+        log.info(f"Bulk inserted {inserted} blacklist words ({duplicates} duplicates skipped)")
+        return inserted, duplicates
     
     async def get_stats(self) -> dict:
         """
@@ -3,8 +3,9 @@ Repository para gestión de strikes
 """
 
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.config.settings import settings
 from app.repositories.base import BaseRepository
 from app.models.user_strike import UserStrike
 from app.utils.logger import log
@@ -103,28 +104,83 @@ class StrikeRepository(BaseRepository[UserStrike]):
     async def increment_strike(
         self,
         user_id: str,
-        channel_id: str
+        channel_id: str,
+        temp_ban_at: Optional[int] = None,
+        perm_ban_at: Optional[int] = None,
+        session=None
     ) -> UserStrike:
         """
         Incrementa el contador de strikes de un usuario
         
+        Un solo find_one_and_update con upsert y pipeline: crea el registro
+        si no existe y aplica la ventana de reset (UserStrike.should_reset_strikes)
+        en el servidor, así dos violaciones concurrentes no pierden strikes.
+        Con umbrales, el mismo update aplica el ban que corresponda al nuevo
+        contador (sin un apply_ban aparte).
+        
         Args:
             user_id: ID del usuario
             channel_id: ID del canal
+            temp_ban_at: Strikes desde los que se aplica ban temporal (opcional)
+            perm_ban_at: Strikes desde los que se aplica ban permanente (opcional)
+            session: Sesión de MongoDB (opcional, para transacciones)
             
         Returns:
             UserStrike actualizado
         """
-        strike = await self.get_or_create(user_id, channel_id)
+        now = datetime.utcnow()
+        reset_at = now + timedelta(days=settings.STRIKE_RESET_DAYS)
         
-        # Verificar si necesita reset
-        if strike.should_reset_strikes():
-            strike.reset_strikes()
-        else:
-            strike.increment_strike()
+        # Misma regla que should_reset_strikes(); un registro nuevo nunca se resetea
+        current_reset_at = {"$ifNull": ["$strikes_reset_at", reset_at]}
+        expired = {"$gte": [now, current_reset_at]}
         
-        await self.update_strike(strike)
-        return strike
+        pipeline = [{
+            "$set": {
+                "strike_count": {
+                    "$cond": [expired, 0, {"$add": [{"$ifNull": ["$strike_count", 0]}, 1]}]
+                },
+                "last_violation": {"$cond": [expired, None, now]},
+                "strikes_reset_at": {"$cond": [expired, reset_at, current_reset_at]},
+                "is_banned": {"$ifNull": ["$is_banned", False]},
+                "created_at": {"$ifNull": ["$created_at", now]},
+                "updated_at": now
+            }
+        }]
+        
+        if temp_ban_at is not None and perm_ban_at is not None:
+            # Segunda etapa: ve el strike_count ya incrementado
+            permanent = {"$gte": ["$strike_count", perm_ban_at]}
+            temporary = {"$gte": ["$strike_count", temp_ban_at]}
+            
+            def by_ban(if_permanent, if_temporary, otherwise):
+                return {"$switch": {
+                    "branches": [
+                        {"case": permanent, "then": if_permanent},
+                        {"case": temporary, "then": if_temporary}
+                    ],
+                    "default": otherwise
+                }}
+            
+            pipeline.append({
+                "$set": {
+                    "is_banned": by_ban(True, True, "$is_banned"),
+                    "ban_type": by_ban("permanent", "temporary", "$ban_type"),
+                    "ban_expires_at": by_ban(
+                        None,
+                        now + timedelta(hours=settings.TEMP_BAN_HOURS),
+                        "$ban_expires_at"
+                    )
+                }
+            })
+        
+        doc = await self.find_one_and_update(
+            {"user_id": user_id, "channel_id": channel_id},
+            pipeline,
+            upsert=True,
+            session=session
+        )
+        return UserStrike(**doc)
     
     async def reset_strikes(
         self,
@@ -141,13 +197,19 @@ class StrikeRepository(BaseRepository[UserStrike]):
         Returns:
             True si se reseteó correctamente
         """
-        strike = await self.get_by_user_and_channel(user_id, channel_id)
-        
-        if strike:
-            strike.reset_strikes()
-            return await self.update_strike(strike)
-        
-        return False
+        now = datetime.utcnow()
+        doc = await self.find_one_and_update(
+            {"user_id": user_id, "channel_id": channel_id},
+            {
+                "$set": {
+                    "strike_count": 0,
+                    "last_violation": None,
+                    "strikes_reset_at": now + timedelta(days=settings.STRIKE_RESET_DAYS),
+                    "updated_at": now
+                }
+            }
+        )
+        return doc is not None
     
     async def apply_ban(
         self,
@@ -166,15 +228,27 @@ class StrikeRepository(BaseRepository[UserStrike]):
         Returns:
             UserStrike actualizado
         """
-        strike = await self.get_or_create(user_id, channel_id)
-        
-        if ban_type == "temporary":
-            strike.apply_temp_ban()
-        else:
-            strike.apply_perm_ban()
+        now = datetime.utcnow()
+        temporary = ban_type == "temporary"
         
-        await self.update_strike(strike)
-        return strike
+        doc = await self.find_one_and_update(
+            {"user_id": user_id, "channel_id": channel_id},
+            {
+                "$set": {
+                    "is_banned": True,
+                    "ban_type": "temporary" if temporary else "permanent",
+                    "ban_expires_at": now + timedelta(hours=settings.TEMP_BAN_HOURS) if temporary else None,
+                    "updated_at": now
+                },
+                "$setOnInsert": {
+                    "strike_count": 0,
+                    "strikes_reset_at": now + timedelta(days=settings.STRIKE_RESET_DAYS),
+                    "created_at": now
+                }
+            },
+            upsert=True
+        )
+        return UserStrike(**doc)
     
     async def remove_ban(
         self,
@@ -191,13 +265,18 @@ class StrikeRepository(BaseRepository[UserStrike]):
         Returns:
             True si se removió correctamente
         """
-        strike = await self.get_by_user_and_channel(user_id, channel_id)
-        
-        if strike:
-            strike.unban()
-            return await self.update_strike(strike)
-        
-        return False
+        doc = await self.find_one_and_update(
+            {"user_id": user_id, "channel_id": channel_id},
+            {
+                "$set": {
+                    "is_banned": False,
+                    "ban_type": None,
+                    "ban_expires_at": None,
+                    "updated_at": datetime.utcnow()
+                }
+            }
+        )
+        return doc is not None
     
     async def get_banned_users(
         self,
@@ -16,12 +16,13 @@ class ViolationRepository(BaseRepository[Violation]):
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db, "violations")
     
-    async def create_violation(self, violation: Violation) -> Violation:
+    async def create_violation(self, violation: Violation, session=None) -> Violation:
         """
         Crea una nueva violación
         
         Args:
             violation: Objeto Violation
+            session: Sesión de MongoDB (opcional, para transacciones)
             
         Returns:
             Violation con ID asignado
@@ -29,7 +30,7 @@ class ViolationRepository(BaseRepository[Violation]):
         violation_dict = violation.to_dict()
         violation_dict.pop("_id", None)
         
-        violation_id = await self.create(violation_dict)
+        violation_id = await self.create(violation_dict, session=session)
         violation.id = violation_id
         
         log.info(
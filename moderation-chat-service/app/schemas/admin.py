@@ -222,3 +222,32 @@ class ChannelStatsResponse(BaseModel):
                 "avg_strikes": 2.3
             }
         }
+
+
+class ServiceMetricsResponse(BaseModel):
+    """Response con métricas de rendimiento del servicio"""
+    
+    timestamp: str = Field(..., description="Timestamp ISO")
+    metrics: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Métricas por componente"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "timestamp": "2025-10-13T10:30:00Z",
+                "metrics": {
+                    "inference": {
+                        "batching_enabled": True,
+                        "batcher": {
+                            "queue_depth": 0,
+                            "total_requests": 1200,
+                            "total_batches": 310,
+                            "avg_batch_size": 3.87,
+                            "avg_wait_ms": 2.4
+                        }
+                    }
+                }
+            }
+        }
@@ -20,7 +20,7 @@ class AddWordRequest(BaseModel):
         ...,
         min_length=2,
         max_length=5,
-        description="Código ISO del idioma"
+        description='Código ISO del idioma ("all" = aplica a todos los idiomas)'
     )
     category: str = Field(
         ...,
@@ -192,3 +192,41 @@ class BlacklistStatsResponse(BaseModel):
                 }
             }
         }
+
+
+class ImportRowError(BaseModel):
+    """Fila rechazada en una importación"""
+    
+    line: int = Field(..., description="Número de línea en el archivo")
+    error: str = Field(..., description="Motivo del rechazo")
+
+
+class BlacklistImportResponse(BaseModel):
+    """Response de la importación masiva"""
+    
+    total_rows: int = Field(..., description="Filas leídas (sin contar líneas vacías ni encabezado)")
+    inserted: int = Field(..., description="Palabras insertadas")
+    duplicates: int = Field(..., description="Filas omitidas por ya existir (en la DB o en el archivo)")
+    invalid: int = Field(..., description="Filas inválidas")
+    errors: List[ImportRowError] = Field(
+        default_factory=list,
+        description="Detalle de las primeras filas inválidas"
+    )
+    snapshot_version: Optional[int] = Field(
+        default=None,
+        description="Versión de la lista negra tras el rebuild (None si no se insertó nada)"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "total_rows": 5000,
+                "inserted": 4890,
+                "duplicates": 102,
+                "invalid": 8,
+                "errors": [
+                    {"line": 17, "error": "severity: Input should be 'low', 'medium' or 'high'"}
+                ],
+                "snapshot_version": 42
+            }
+        }
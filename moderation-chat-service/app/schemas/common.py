@@ -94,3 +94,40 @@ class HealthResponse(BaseModel):
                 }
             }
         }
+
+
+class ReadinessResponse(BaseModel):
+    """Schema para readiness check"""
+    
+    status: str = Field(..., description="ready | not_ready")
+    timestamp: str = Field(..., description="Timestamp ISO")
+    stages: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Estado de cada etapa del arranque"
+    )
+    timings_ms: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Duración de cada etapa en milisegundos"
+    )
+    error: Optional[str] = Field(
+        default=None,
+        description="Error del arranque (si falló)"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status": "ready",
+                "timestamp": "2025-10-13T10:30:00Z",
+                "stages": {
+                    "model": "ready",
+                    "mongodb": "ready",
+                    "redis": "ready",
+                    "rabbitmq": "ready",
+                    "warmup": "ready",
+                    "blacklist": "ready"
+                },
+                "timings_ms": {"model": 8421.3, "warmup": 912.4},
+                "error": None
+            }
+        }
@@ -38,6 +38,12 @@ class ModerateMessageRequest(BaseModel):
         default=None,
         description="Metadata adicional del mensaje"
     )
+    language: Optional[str] = Field(
+        default=None,
+        min_length=2,
+        max_length=10,
+        description="Código ISO del idioma, con o sin región: 'es', 'es-AR' (opcional, evita la detección)"
+    )
     
     class Config:
         json_schema_extra = {
@@ -46,6 +52,7 @@ class ModerateMessageRequest(BaseModel):
                 "user_id": "user_789",
                 "channel_id": "channel_abc",
                 "content": "Este es un mensaje de prueba",
+                "language": "es",
                 "metadata": {
                     "thread_id": "thread_001",
                     "timestamp": "2025-10-13T10:30:00Z"
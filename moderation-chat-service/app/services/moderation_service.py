@@ -13,6 +13,11 @@ from app.core.blacklist_manager import BlacklistManager
 from app.core.strike_manager import StrikeManager
 from app.core.event_publisher import EventPublisher
 from app.core.language_detector import LanguageDetector
+from app.core.language_priors import LanguagePriors
+from app.core.ban_cache import BanCache
+from app.core.analysis_context import AnalysisContext
+from app.core.verdict_cache import VerdictCache
+from app.core.prefilter import Prefilter
 
 from app.repositories.violation_repository import ViolationRepository
 from app.repositories.strike_repository import StrikeRepository
@@ -22,6 +27,7 @@ from app.repositories.blacklist_repository import BlacklistRepository
 from app.models.violation import Violation
 from app.config.cache import RedisCache
 from app.config.events import RabbitMQEventBus
+from app.config.settings import settings
 from app.utils.logger import log
 from app.utils.exceptions import ModerationServiceException
 
@@ -40,7 +46,8 @@ class ModerationService:
         self,
         db: AsyncIOMotorDatabase,
         cache: RedisCache,
-        event_bus: RabbitMQEventBus
+        event_bus: RabbitMQEventBus,
+        moderation_engine: Optional[ModerationEngine] = None
     ):
         """
         Inicializa el servicio de moderación
@@ -49,6 +56,7 @@ class ModerationService:
             db: Base de datos MongoDB
             cache: Cliente Redis
             event_bus: Cliente RabbitMQ
+            moderation_engine: Motor ya cargado (opcional, si no se crea aquí)
         """
         # Repositories
         self.violation_repo = ViolationRepository(db)
@@ -57,16 +65,46 @@ class ModerationService:
         self.blacklist_repo = BlacklistRepository(db)
         
         # Core Logic
-        self.language_detector = LanguageDetector()
-        self.moderation_engine = ModerationEngine(self.language_detector)
+        if moderation_engine is not None:
+            self.moderation_engine = moderation_engine
+            self.language_detector = moderation_engine.language_detector
+        else:
+            self.language_detector = LanguageDetector()
+            self.moderation_engine = ModerationEngine(self.language_detector)
         self.blacklist_manager = BlacklistManager(self.blacklist_repo, cache)
-        self.strike_manager = StrikeManager(self.strike_repo, self.ban_repo)
+        self.ban_cache: Optional[BanCache] = None
+        if settings.BAN_CACHE_ENABLED:
+            self.ban_cache = BanCache(cache, self.strike_repo)
+        self.strike_manager = StrikeManager(
+            self.strike_repo,
+            self.ban_repo,
+            self.ban_cache,
+            violation_repository=self.violation_repo
+        )
         self.event_publisher = EventPublisher(event_bus)
+        
+        # Cache de veredictos por contenido (opcional)
+        self.verdict_cache: Optional[VerdictCache] = None
+        if settings.VERDICT_CACHE_ENABLED:
+            self.verdict_cache = VerdictCache(
+                cache,
+                version_fn=self.moderation_engine.cache_version
+            )
+        
+        # Idioma habitual por canal/usuario para saltear la detección (opcional)
+        self.language_priors: Optional[LanguagePriors] = None
+        if settings.LANGUAGE_PRIORS_ENABLED:
+            self.language_priors = LanguagePriors(cache)
+        
+        # Pre-filtro en cascada antes de Detoxify (opcional)
+        self.prefilter: Optional[Prefilter] = Prefilter.from_settings()
     
     async def initialize(self):
         """Inicializa el servicio (carga cache, etc.)"""
         log.info("Initializing ModerationService...")
         await self.blacklist_manager.initialize()
+        if self.ban_cache is not None:
+            await self.ban_cache.initialize()
         log.info("✅ ModerationService initialized")
     
     async def moderate_message(
@@ -75,7 +113,8 @@ class ModerationService:
         user_id: str,
         channel_id: str,
         content: str,
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        language: Optional[str] = None
     ) -> Dict:
         """
         Flujo completo de moderación de un mensaje
@@ -86,6 +125,7 @@ class ModerationService:
             channel_id: ID del canal
             content: Contenido del mensaje
             metadata: Metadata adicional
+            language: Idioma indicado por el cliente (opcional, evita la detección)
             
         Returns:
             Dict con resultado de moderación
@@ -105,30 +145,29 @@ class ModerationService:
                 log.warning(f"User is banned: user={user_id}, channel={channel_id}")
                 return self._create_banned_response(ban_info)
             
-            # 2. Detectar idioma
-            language = self.language_detector.detect_language(content)
+            # 2-5. Analizar (idioma, Detoxify, lista negra) en una sola pasada
+            #      El idioma sale del hint, del prior del usuario/canal o se detecta
+            #      El hint llega como "ES", "es-AR" o "pt_BR": se usa el código base
+            hint = self.language_detector.normalize_hint(language)
+            prior = None
+            if hint is None and self.language_priors is not None:
+                prior = await self.language_priors.get_language(channel_id, user_id)
             
-            # 3. Analizar con Detoxify
-            detoxify_analysis = self.moderation_engine.analyze_message(content)
+            context = AnalysisContext(content, language=hint or prior)
+            combined_analysis = await self._analyze(context)
+            language = context.language
             
-            # 4. Verificar lista negra
-            blacklist_result = await self.blacklist_manager.check_text(
-                content, language
-            )
-            
-            # 5. Combinar resultados
-            combined_analysis = self._combine_analysis(
-                detoxify_analysis,
-                blacklist_result
-            )
+            if self.language_priors is not None and prior is None and language:
+                self.language_priors.observe(channel_id, user_id, language)
             
             # 6. Determinar si es tóxico
             if not combined_analysis['is_toxic']:
                 log.info(f"Message approved: message={message_id}")
                 return self._create_approved_response(combined_analysis)
             
-            # 7. El mensaje es tóxico - registrar violación
-            violation = await self._create_violation(
+            # 7-8. El mensaje es tóxico - aplicar strike y registrar la violación
+            #      (una sola decisión persistida, ver DECISION_ROUND_TRIPS)
+            violation = self._build_violation(
                 message_id=message_id,
                 user_id=user_id,
                 channel_id=channel_id,
@@ -137,12 +176,12 @@ class ModerationService:
                 metadata=metadata
             )
             
-            # 8. Aplicar strike
             strike_result = await self.strike_manager.apply_strike(
                 user_id=user_id,
                 channel_id=channel_id,
                 severity=combined_analysis['severity'],
-                reason=f"Contenido inapropiado detectado. Score: {combined_analysis['toxicity_score']:.2f}"
+                reason=f"Contenido inapropiado detectado. Score: {combined_analysis['toxicity_score']:.2f}",
+                violation=violation
             )
             
             # 9. Publicar eventos
@@ -172,8 +211,87 @@ class ModerationService:
             log.error(f"Error in moderate_message: {e}")
             raise ModerationServiceException(f"Moderation failed: {e}")
     
+    async def _analyze(self, context: AnalysisContext) -> Dict:
+        """
+        Ejecuta todas las etapas de análisis sobre un mismo contexto
+        
+        El idioma se detecta una sola vez y Detoxify corre un solo forward
+        pass; la lista negra reutiliza el texto normalizado del contexto.
+        Si el pre-filtro está habilitado, los mensajes benignos se resuelven
+        sin Detoxify (la lista negra se aplica igual).
+        
+        Args:
+            context: Contexto de análisis del mensaje
+            
+        Returns:
+            Análisis combinado
+        """
+        # 1. Pre-filtro: mensajes claramente benignos no pasan por Detoxify
+        if self.prefilter is not None and not context.is_empty:
+            with context.timed('prefilter'):
+                escalate, context.prefilter_score = self.prefilter.should_escalate(
+                    context.normalized_text
+                )
+            if not escalate:
+                context.scores = self.moderation_engine.benign_scores()
+        
+        # 2. Idioma + scores desde el cache de veredictos (si está habilitado)
+        if (
+            self.verdict_cache is not None
+            and not context.is_empty
+            and context.scores is None
+        ):
+            with context.timed('verdict_cache'):
+                verdict = await self.verdict_cache.get_or_compute(
+                    context.normalized_text,
+                    lambda: self._compute_verdict(context)
+                )
+            if context.language is None and verdict.get('language'):
+                context.language = verdict['language']
+                context.candidate_languages = verdict.get('languages') or [context.language]
+            context.scores = verdict['scores']
+        
+        # 3. Idioma + Detoxify (completa lo que falte en el contexto)
+        detoxify_analysis = await self.moderation_engine.analyze_context(context)
+        
+        # 4. Verificar lista negra
+        blacklist_result = await self.blacklist_manager.check_context(context)
+        
+        # 5. Combinar resultados
+        combined_analysis = self._combine_analysis(
+            context,
+            detoxify_analysis,
+            blacklist_result
+        )
+        
+        log.debug(f"Analysis timings (ms): {context.timings}")
+        return combined_analysis
+    
+    async def _compute_verdict(self, context: AnalysisContext) -> Dict:
+        """
+        Calcula el veredicto cacheable de un mensaje (idioma + scores)
+        
+        El idioma solo se cachea si fue detectado aquí; un idioma provisto
+        por el cliente no debe contaminar el cache.
+        
+        Args:
+            context: Contexto de análisis del mensaje
+            
+        Returns:
+            Dict {'language': str | None, 'languages': List[str], 'scores': Dict[str, float]}
+        """
+        detected = context.language is None
+        await self.moderation_engine.analyze_context(context)
+        
+        return {
+            'language': context.language if detected else None,
+            'languages': context.candidate_languages if detected else [],
+            'scores': context.scores
+        }
+    
     def _combine_analysis(
         self,
+        context: AnalysisContext,
         detoxify_result: Dict,
         blacklist_result: Dict
     ) -> Dict:
@@ -181,6 +299,7 @@ class ModerationService:
         Combina los resultados de Detoxify y lista negra
         
         Args:
+            context: Contexto de análisis del mensaje
             detoxify_result: Resultado de Detoxify
             blacklist_result: Resultado de lista negra
             
@@ -224,10 +343,12 @@ class ModerationService:
             'is_toxic': is_toxic,
             'toxicity_score': combined_score,
             'severity': severity,
-            'language': detoxify_result['language'],
+            'language': context.language or detoxify_result['language'],
             'detected_words': blacklist_result['detected_words'],
+            'blacklist_matches': blacklist_result.get('matches', []),
             'detoxify_scores': detoxify_result['detoxify_scores'],
-            'detoxify_categories': detoxify_result.get('detoxify_categories', [])  # ← Acceder correctamente
+            'detoxify_categories': detoxify_result.get('detoxify_categories', []),  # ← Acceder correctamente
+            'timings': dict(context.timings)
         }
     
     def _calculate_final_severity(
@@ -262,7 +383,7 @@ class ModerationService:
         
         return 'medium'
     
-    async def _create_violation(
+    def _build_violation(
         self,
         message_id: str,
         user_id: str,
@@ -272,7 +393,9 @@ class ModerationService:
         metadata: Optional[Dict]
     ) -> Violation:
         """
-        Crea un registro de violación
+        Arma el registro de violación (se guarda junto con el strike)
+        
+        La acción y el número de strikes se completan al aplicar el strike.
         
         Args:
             message_id: ID del mensaje
@@ -283,17 +406,12 @@ class ModerationService:
             metadata: Metadata adicional
             
         Returns:
-            Violation creada
+            Violation sin guardar
         """
         # Hash del contenido (no guardamos texto completo por privacidad)
         content_hash = hashlib.sha256(content.encode()).hexdigest()
         
-        # Obtener strike count actual
-        strike = await self.strike_repo.get_by_user_and_channel(user_id, channel_id)
-        strike_count = strike.strike_count if strike else 0
-        
-        # Crear violación
-        violation = Violation(
+        return Violation(
             user_id=user_id,
             channel_id=channel_id,
             message_id=message_id,
@@ -301,15 +419,10 @@ class ModerationService:
             detected_words=analysis['detected_words'],
             toxicity_score=analysis['toxicity_score'],
             severity=analysis['severity'],
-            action_taken='message_blocked',  # Se actualiza después
-            strike_count_at_time=strike_count,
+            action_taken='message_blocked',  # Se completa al aplicar el strike
+            strike_count_at_time=0,
             metadata=metadata or {}
         )
-        
-        # Guardar en BD
-        created_violation = await self.violation_repo.create_violation(violation)
-        
-        return created_violation
     
     async def _publish_events(
         self,
@@ -437,21 +550,9 @@ class ModerationService:
             Dict con análisis completo
         """
         try:
-            # Detectar idioma si no se provee
-            if not language:
-                language = self.language_detector.detect_language(text)
-            
-            # Analizar con Detoxify
-            detoxify_analysis = self.moderation_engine.analyze_message(text)
-            
-            # Verificar lista negra
-            blacklist_result = await self.blacklist_manager.check_text(text, language)
-            
-            # Combinar resultados
-            combined_analysis = self._combine_analysis(
-                detoxify_analysis,
-                blacklist_result
-            )
+            # Idioma provisto (opcional): evita la detección si está soportado
+            context = AnalysisContext(text, language=self.language_detector.normalize_hint(language))
+            combined_analysis = await self._analyze(context)
             
             return combined_analysis
             
@@ -627,6 +728,23 @@ class ModerationService:
             log.error(f"Error unbanning user: {e}")
             raise ModerationServiceException(f"Failed to unban user: {e}")
     
+    def get_metrics(self) -> Dict:
+        """
+        Obtiene métricas de rendimiento del servicio
+        
+        Returns:
+            Dict con métricas por componente
+        """
+        return {
+            'inference': self.moderation_engine.get_metrics(),
+            'verdict_cache': self.verdict_cache.get_metrics() if self.verdict_cache else None,
+            'prefilter': self.prefilter.get_metrics() if self.prefilter else None,
+            'ban_cache': self.ban_cache.get_metrics() if self.ban_cache else None,
+            'language_priors': self.language_priors.get_metrics() if self.language_priors else None,
+            'blacklist': self.blacklist_manager.get_snapshot_info(),
+            'blacklist_regex': self.blacklist_manager.get_regex_metrics()
+        }
+    
     async def check_expired_bans(self) -> int:
         """
         Verifica y actualiza bans expirados (tarea periódica)
@@ -0,0 +1,164 @@
+"""
+Orquestador de arranque: conexiones en paralelo, carga del modelo y readiness
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.config.settings import settings
+from app.config.database import mongodb
+from app.config.cache import redis_cache
+from app.config.events import rabbitmq
+from app.core.language_detector import LanguageDetector
+from app.core.moderation_engine import ModerationEngine
+from app.services.moderation_service import ModerationService
+from app.utils.logger import log
+
+
+class StartupOrchestrator:
+    """
+    Arranca el servicio sin que ningún worker reciba tráfico en frío
+
+    - MongoDB (+ índices), Redis y RabbitMQ se conectan en paralelo
+    - El modelo se carga en un thread mientras tanto
+    - Luego se calienta el modelo (inferencias + perfiles de langdetect)
+      y se construye la lista negra
+    - El servicio queda "ready" solo cuando todo lo anterior terminó
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+        self.service: Optional[ModerationService] = None
+        self.error: Optional[str] = None
+
+        self._started_at: Optional[float] = None
+        self._engine_task: Optional[asyncio.Task] = None
+        self._finish_task: Optional[asyncio.Task] = None
+        self._service_future: Optional[asyncio.Future] = None
+
+    @property
+    def started(self) -> bool:
+        """True si el arranque orquestado fue iniciado (lifespan)"""
+        return self._service_future is not None
+
+    @property
+    def is_ready(self) -> bool:
+        """True si el servicio está listo para recibir tráfico"""
+        return self.service is not None
+
+    async def _stage(self, name: str, func: Callable[[], Awaitable]):
+        """
+        Ejecuta una etapa registrando su estado y duración
+
+        Args:
+            name: Nombre de la etapa
+            func: Corrutina (sin argumentos) a ejecutar
+        """
+        self.stages[name] = "pending"
+        started = time.perf_counter()
+        try:
+            result = await func()
+            self.stages[name] = "ready"
+            return result
+        except Exception as e:
+            self.stages[name] = f"failed: {e}"
+            raise
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _connect_mongodb(self):
+        """Conecta a MongoDB y crea los índices"""
+        await mongodb.connect()
+        await mongodb.create_indexes()
+
+    async def start(self):
+        """
+        Conecta las dependencias en paralelo y lanza la carga del modelo
+
+        Retorna cuando las conexiones están listas (si alguna falla, el
+        arranque falla como antes); la carga y el calentamiento del modelo
+        siguen en segundo plano hasta que el servicio queda "ready".
+        """
+        self._started_at = time.perf_counter()
+        self._service_future = asyncio.get_running_loop().create_future()
+        self._service_future.add_done_callback(
+            lambda f: f.exception() if not f.cancelled() else None
+        )
+
+        # El modelo empieza a cargarse antes de conectar (en un thread)
+        self._engine_task = asyncio.create_task(
+            self._stage("model", lambda: asyncio.to_thread(ModerationEngine, LanguageDetector()))
+        )
+
+        connections = [
+            self._stage("mongodb", self._connect_mongodb),
+            self._stage("redis", redis_cache.connect),
+        ]
+        if settings.RABBITMQ_ENABLED:
+            connections.append(self._stage("rabbitmq", rabbitmq.connect))
+
+        await asyncio.gather(*connections)
+        log.info("✅ All services connected successfully")
+
+        self._finish_task = asyncio.create_task(self._finish())
+
+    async def _finish(self):
+        """Espera el modelo, lo calienta y construye el servicio"""
+        try:
+            engine = await self._engine_task
+
+            if settings.STARTUP_WARMUP_ENABLED:
+                await self._stage("warmup", lambda: asyncio.to_thread(engine.warmup))
+
+            service = ModerationService(
+                mongodb.db,
+                redis_cache,
+                rabbitmq,
+                moderation_engine=engine
+            )
+            await self._stage("blacklist", service.initialize)
+
+            self.service = service
+            self._service_future.set_result(service)
+
+            total = (time.perf_counter() - self._started_at) * 1000
+            log.info(f"✅ Service ready in {total:.0f}ms (stages: {self.timings})")
+
+        except Exception as e:
+            self.error = str(e)
+            log.error(f"❌ Startup failed, service will stay not-ready: {e}")
+            if not self._service_future.done():
+                self._service_future.set_exception(e)
+
+    async def wait_for_service(self) -> ModerationService:
+        """
+        Espera a que el servicio esté listo
+
+        Returns:
+            Instancia de ModerationService creada en el arranque
+        """
+        return await asyncio.shield(self._service_future)
+
+    async def stop(self):
+        """Cancela el arranque en segundo plano si sigue en curso"""
+        if self._finish_task and not self._finish_task.done():
+            self._finish_task.cancel()
+            try:
+                await self._finish_task
+            except asyncio.CancelledError:
+                pass
+
+    def get_status(self) -> Dict:
+        """Retorna el estado de cada etapa del arranque"""
+        return {
+            "ready": self.is_ready,
+            "stages": dict(self.stages),
+            "timings_ms": dict(self.timings),
+            "error": self.error,
+        }
+
+
+# Instancia global
+startup_orchestrator = StartupOrchestrator()
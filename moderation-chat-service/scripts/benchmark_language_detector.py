@@ -0,0 +1,133 @@
+"""
+Script para comparar los motores de identificación de idioma
+Uso:
+    python scripts/benchmark_language_detector.py
+    python scripts/benchmark_language_detector.py --corpus etiquetado.jsonl --repeat 5
+
+Mide la latencia por llamada (p50/p95/p99 y media) y el acierto de cada
+motor. El corpus es JSONL con campos "text" y "language"; sin corpus se usa
+una muestra incluida de mensajes de chat cortos y largos.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from app.core.language_models import IDENTIFIERS, create_language_identifier
+
+SAMPLE = {
+    "es": [
+        "hola que tal", "eres un idiota", "jaja no", "gracias amigo",
+        "¿dónde está el baño?", "nos vemos mañana en la casa de mi madre",
+        "no me gusta nada este juego, siempre pierdo contra los mismos",
+    ],
+    "en": [
+        "hello there", "you are an idiot", "thanks buddy",
+        "where is the bathroom?", "see you tomorrow at my mother's house",
+        "i really don't like this game, i always lose against the same people",
+    ],
+    "pt": [
+        "olá tudo bem", "você é um idiota", "obrigado amigo",
+        "onde fica o banheiro?", "nos vemos amanhã na casa da minha mãe",
+        "não gosto nada deste jogo, sempre perco contra os mesmos",
+    ],
+    "fr": [
+        "bonjour", "tu es un idiot", "merci mon ami",
+        "où sont les toilettes ?", "on se voit demain chez ma mère",
+        "je n'aime pas du tout ce jeu, je perds toujours contre les mêmes",
+    ],
+    "de": [
+        "hallo wie gehts", "du bist ein idiot", "danke freund",
+        "wo ist die toilette?", "wir sehen uns morgen bei meiner mutter",
+        "ich mag dieses spiel überhaupt nicht, ich verliere immer gegen dieselben",
+    ],
+    "it": [
+        "ciao come stai", "sei un idiota", "grazie amico",
+        "dove è il bagno?", "ci vediamo domani a casa di mia madre",
+        "non mi piace per niente questo gioco, perdo sempre contro gli stessi",
+    ],
+}
+
+
+def load_corpus(path: str) -> list:
+    """Carga pares (texto, idioma) de un JSONL"""
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                samples.append((record["text"], record["language"]))
+    return samples
+
+
+def percentile(values: list, q: float) -> float:
+    """Percentil por rango más cercano"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def benchmark(name: str, samples: list, repeat: int) -> dict:
+    """Mide un motor: carga, latencia por llamada y aciertos"""
+    started = time.perf_counter()
+    identifier = create_language_identifier(name)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    # Primera llamada aparte (langdetect carga sus perfiles acá)
+    started = time.perf_counter()
+    identifier.identify(samples[0][0])
+    first_ms = (time.perf_counter() - started) * 1000
+
+    latencies = []
+    correct = 0
+    stable = True
+    for text, language in samples:
+        results = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            detected = identifier.identify(text)
+            latencies.append((time.perf_counter() - started) * 1e6)
+            results.append(detected[0][0] if detected else None)
+        correct += results[0] == language
+        stable &= len(set(results)) == 1
+
+    return {
+        "name": name,
+        "load_ms": load_ms,
+        "first_ms": first_ms,
+        "p50_us": percentile(latencies, 0.50),
+        "p95_us": percentile(latencies, 0.95),
+        "p99_us": percentile(latencies, 0.99),
+        "mean_us": statistics.fmean(latencies),
+        "accuracy": correct / len(samples),
+        "deterministic": stable,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark language identifiers")
+    parser.add_argument("--corpus", help="JSONL con campos text y language")
+    parser.add_argument("--repeat", type=int, default=20, help="Llamadas por texto")
+    parser.add_argument("--identifiers", nargs="+", default=list(IDENTIFIERS))
+    args = parser.parse_args()
+
+    if args.corpus:
+        samples = load_corpus(args.corpus)
+    else:
+        samples = [(text, lang) for lang, texts in SAMPLE.items() for text in texts]
+    print(f"{len(samples)} texts x {args.repeat} calls\n")
+
+    print(f"{'identifier':<12}{'load ms':>10}{'1st ms':>10}{'p50 us':>10}{'p95 us':>10}"
+          f"{'p99 us':>10}{'mean us':>10}{'accuracy':>10}  deterministic")
+    for name in args.identifiers:
+        r = benchmark(name, samples, args.repeat)
+        print(f"{r['name']:<12}{r['load_ms']:>10.1f}{r['first_ms']:>10.1f}{r['p50_us']:>10.0f}"
+              f"{r['p95_us']:>10.0f}{r['p99_us']:>10.0f}{r['mean_us']:>10.0f}"
+              f"{r['accuracy']:>10.1%}  {r['deterministic']}")
+
+
+if __name__ == "__main__":
+    main()
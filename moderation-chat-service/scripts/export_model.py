@@ -0,0 +1,220 @@
+"""
+Script para exportar/cuantizar el modelo Detoxify y comparar backends
+Uso:
+    python scripts/export_model.py export --output /app/models/onnx
+    python scripts/export_model.py quantize --model-dir /app/models/onnx
+    python scripts/export_model.py parity --backends torch,torch_int8,onnx,onnx_int8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import numpy as np
+from app.config.settings import settings
+from app.core.inference_backends import (
+    BACKENDS,
+    ONNX_INT8_MODEL_FILE,
+    ONNX_METADATA_FILE,
+    ONNX_MODEL_FILE,
+    create_backend,
+)
+
+# Corpus fijo para el reporte de paridad (mezcla de idiomas y toxicidad)
+PARITY_CORPUS = [
+    "Hola, ¿cómo estás? Nos vemos mañana en clases.",
+    "Eres un idiota, nadie te quiere aquí.",
+    "Qué estúpido comentario, cállate de una vez.",
+    "Gracias por la ayuda con la tarea!",
+    "Hello everyone, the meeting starts at 10am.",
+    "You are a stupid idiot and I hate you.",
+    "I will find you and hurt you.",
+    "This is the best day ever, thanks team!",
+    "Olá, tudo bem? Vamos almoçar juntos hoje?",
+    "Você é um idiota completo.",
+    "Bonjour à tous, bonne journée.",
+    "Tu es vraiment un imbécile.",
+    "Guten Morgen, wie geht es dir?",
+    "Du bist so ein Idiot.",
+    "Ciao a tutti, ci vediamo stasera.",
+    "Sei proprio uno stupido.",
+    "lol",
+    "ok",
+    "jajajajajaja",
+    "mierda, otra vez se cayó el servidor",
+]
+
+
+def export_onnx(output_dir: str, opset: int):
+    """Exporta el modelo Detoxify a ONNX (fp32) junto con tokenizer y metadata"""
+    import torch
+    from detoxify import Detoxify
+
+    os.makedirs(output_dir, exist_ok=True)
+    detox = Detoxify(settings.DETOXIFY_MODEL, device="cpu")
+    detox.model.eval()
+
+    encoded = detox.tokenizer(["hola mundo"], return_tensors="pt")
+    input_names = [
+        name for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in encoded
+    ]
+
+    class LogitsWrapper(torch.nn.Module):
+        """Adapta el modelo HF para exportar solo los logits"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    model_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    print(f"Exporting {settings.DETOXIFY_MODEL} to {model_path} (opset {opset})...")
+    torch.onnx.export(
+        LogitsWrapper(detox.model),
+        tuple(encoded[name] for name in input_names),
+        model_path,
+        input_names=input_names,
+        output_names=["logits"],
+        dynamic_axes=dynamic_axes,
+        opset_version=opset,
+        do_constant_folding=True,
+    )
+
+    detox.tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, ONNX_METADATA_FILE), "w") as f:
+        json.dump(
+            {
+                "model_type": settings.DETOXIFY_MODEL,
+                "class_names": list(detox.class_names),
+                "input_names": input_names,
+                "opset": opset,
+            },
+            f,
+            indent=2,
+        )
+
+    print("Export completed!")
+
+
+def quantize_onnx(model_dir: str):
+    """Cuantiza dinámicamente el grafo ONNX a int8"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    source = os.path.join(model_dir, ONNX_MODEL_FILE)
+    target = os.path.join(model_dir, ONNX_INT8_MODEL_FILE)
+
+    print(f"Quantizing {source} -> {target}...")
+    quantize_dynamic(source, target, weight_type=QuantType.QInt8)
+    print("Quantization completed!")
+
+
+def load_corpus(path: str = None) -> list:
+    """Carga el corpus de paridad (un texto por línea) o usa el fijo"""
+    if not path:
+        return PARITY_CORPUS
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def parity_report(backends: list, corpus_path: str, tolerance: float, output: str):
+    """
+    Compara scores y latencia de cada backend contra torch (referencia)
+
+    Reporta delta máximo y medio por categoría, acuerdo en la decisión
+    tóxico/no tóxico y latencia por batch.
+    """
+    corpus = load_corpus(corpus_path)
+    low = settings.TOXICITY_THRESHOLD_LOW
+    print(f"Parity corpus: {len(corpus)} texts, tolerance={tolerance}")
+
+    reference = None
+    report = {"corpus_size": len(corpus), "tolerance": tolerance, "backends": {}}
+
+    for name in ["torch"] + [b for b in backends if b != "torch"]:
+        backend = create_backend(name)
+        backend.predict(corpus[:2])  # warm-up
+
+        started = time.perf_counter()
+        scores = backend.predict(corpus)
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        entry = {"latency_ms": round(latency_ms, 2)}
+
+        if reference is None:
+            reference = (scores, backend.class_names)
+        else:
+            ref_scores, class_names = reference
+            delta = np.abs(scores - ref_scores)
+            agreement = np.mean((scores.max(axis=1) >= low) == (ref_scores.max(axis=1) >= low))
+            entry.update({
+                "max_abs_delta": float(delta.max()),
+                "mean_abs_delta": float(delta.mean()),
+                "per_category_max_delta": {
+                    cat: float(delta[:, i].max()) for i, cat in enumerate(class_names)
+                },
+                "decision_agreement": float(agreement),
+                "within_tolerance": bool(delta.max() <= tolerance),
+            })
+
+        report["backends"][name] = entry
+        print(f"  {name:<11} {json.dumps(entry)}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {output}")
+
+    candidates = [
+        (entry["latency_ms"], name)
+        for name, entry in report["backends"].items()
+        if entry.get("within_tolerance", True)
+    ]
+    if candidates:
+        print(f"Fastest backend within tolerance: {min(candidates)[1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export/quantize Detoxify and compare backends")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Exportar a ONNX (fp32)")
+    export_parser.add_argument("--output", default=settings.ONNX_MODEL_DIR)
+    export_parser.add_argument("--opset", type=int, default=14)
+
+    quantize_parser = subparsers.add_parser("quantize", help="Cuantizar ONNX a int8")
+    quantize_parser.add_argument("--model-dir", default=settings.ONNX_MODEL_DIR)
+
+    parity_parser = subparsers.add_parser("parity", help="Reporte de paridad entre backends")
+    parity_parser.add_argument(
+        "--backends", default=",".join(b for b in BACKENDS if b != "remote")
+    )
+    parity_parser.add_argument("--corpus", default=None, help="Archivo con un texto por línea")
+    parity_parser.add_argument("--tolerance", type=float, default=0.05)
+    parity_parser.add_argument("--output", default=None, help="Guardar reporte JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.output, args.opset)
+    elif args.command == "quantize":
+        quantize_onnx(args.model_dir)
+    elif args.command == "parity":
+        parity_report(
+            [b.strip() for b in args.backends.split(",") if b.strip()],
+            args.corpus,
+            args.tolerance,
+            args.output,
+        )
+
+
+if __name__ == "__main__":
+    main()
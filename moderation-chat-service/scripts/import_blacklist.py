@@ -0,0 +1,82 @@
+"""
+Script para importar la lista negra en lote desde NDJSON o CSV
+Uso:
+    python scripts/import_blacklist.py palabras.ndjson
+    python scripts/import_blacklist.py vendor.csv --language en --category profanity --severity medium
+
+NDJSON: un objeto por línea con word, language, category, severity y
+opcionalmente is_regex y notes. CSV: encabezado con las mismas columnas.
+Las columnas faltantes se completan con --language/--category/--severity.
+Al terminar se publica una versión nueva de la lista negra en Redis.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from app.config.cache import redis_cache
+from app.config.database import mongodb
+from app.core.blacklist_importer import BlacklistImporter, detect_format, iter_text_lines
+from app.core.blacklist_manager import BlacklistManager
+from app.repositories.blacklist_repository import BlacklistRepository
+
+
+class FileStream:
+    """Adapta un archivo binario a la interfaz `async read(n)`"""
+
+    def __init__(self, handle):
+        self.handle = handle
+
+    async def read(self, size: int) -> bytes:
+        return self.handle.read(size)
+
+
+async def run(args):
+    await mongodb.connect()
+    await redis_cache.connect()
+
+    try:
+        repository = BlacklistRepository(mongodb.db)
+        importer = BlacklistImporter(
+            repository,
+            BlacklistManager(repository, redis_cache),
+            chunk_size=args.chunk_size
+        )
+
+        with open(args.path, "rb") as handle:
+            result = await importer.import_lines(
+                iter_text_lines(FileStream(handle)),
+                detect_format(args.path, args.format),
+                added_by=args.added_by,
+                defaults={
+                    "language": args.language,
+                    "category": args.category,
+                    "severity": args.severity,
+                }
+            )
+
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    finally:
+        await redis_cache.disconnect()
+        await mongodb.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa palabras a la lista negra")
+    parser.add_argument("path", help="Archivo .ndjson/.jsonl o .csv")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Formato (por defecto según la extensión)")
+    parser.add_argument("--language", help="Idioma para filas sin idioma")
+    parser.add_argument("--category", help="Categoría para filas sin categoría")
+    parser.add_argument("--severity", help="Severidad para filas sin severidad")
+    parser.add_argument("--added-by", default="bulk_import", help="Valor de added_by")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Filas por insert_many")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
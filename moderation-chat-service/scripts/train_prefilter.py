@@ -0,0 +1,115 @@
+"""
+Script para entrenar el pre-filtro con etiquetas de Detoxify
+Uso:
+    python scripts/train_prefilter.py --corpus mensajes.txt
+    python scripts/train_prefilter.py --corpus mensajes.jsonl --recall 0.995 --output /app/models/prefilter.npz
+
+El corpus es un archivo de texto (un mensaje por línea) o JSONL con campo
+"content" o "text". Cada mensaje se etiqueta como tóxico si el score máximo
+de Detoxify supera TOXICITY_THRESHOLD_LOW.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import numpy as np
+from app.config.settings import settings
+from app.core.inference_backends import create_backend
+from app.core.prefilter import calibrate_threshold, train_prefilter
+
+
+def load_corpus(path: str) -> list:
+    """Carga los mensajes del corpus (texto plano o JSONL)"""
+    texts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                line = record.get("content") or record.get("text") or ""
+            text = " ".join(line.split())
+            if text:
+                texts.append(text)
+    return texts
+
+
+def label_with_detoxify(texts: list, batch_size: int) -> np.ndarray:
+    """Etiqueta el corpus con el backend de inferencia configurado"""
+    backend = create_backend()
+    labels = np.zeros(len(texts), dtype=np.int64)
+
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        scores = backend.predict(batch)
+        labels[start:start + len(batch)] = scores.max(axis=1) >= settings.TOXICITY_THRESHOLD_LOW
+        print(f"  labeled {start + len(batch)}/{len(texts)}", end="\r")
+
+    print(f"\nLabeled {len(texts)} texts in {time.perf_counter() - started:.1f}s")
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the Detoxify pre-filter")
+    parser.add_argument("--corpus", required=True, help="Mensajes (txt o jsonl)")
+    parser.add_argument("--output", default=settings.PREFILTER_MODEL_PATH)
+    parser.add_argument("--recall", type=float, default=settings.PREFILTER_RECALL_TARGET)
+    parser.add_argument("--hash-bits", type=int, default=18)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fracción para calibrar")
+    parser.add_argument("--batch-size", type=int, default=settings.BATCH_ANALYZE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus)
+    print(f"Corpus: {len(texts)} texts")
+
+    labels = label_with_detoxify(texts, args.batch_size)
+    print(f"Toxic (Detoxify): {labels.sum()} ({labels.mean():.2%})")
+
+    # Separar entrenamiento y calibración
+    order = np.random.default_rng(7).permutation(len(texts))
+    split = int(len(texts) * (1 - args.holdout))
+    train_idx, holdout_idx = order[:split], order[split:]
+
+    print("Training...")
+    model = train_prefilter(
+        [texts[i] for i in train_idx],
+        labels[train_idx],
+        hash_bits=args.hash_bits,
+        epochs=args.epochs
+    )
+
+    # Calibrar el umbral en el holdout para el recall objetivo
+    holdout_scores = np.array([model.score(texts[i]) for i in holdout_idx])
+    holdout_labels = labels[holdout_idx]
+    model.threshold = calibrate_threshold(holdout_scores, holdout_labels, args.recall)
+
+    escalated = holdout_scores >= model.threshold
+    positives = max(int(holdout_labels.sum()), 1)
+    recall = float((escalated & (holdout_labels == 1)).sum() / positives)
+    short_circuit = float(1.0 - escalated.mean()) if len(escalated) else 0.0
+
+    model.metadata = {
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "detoxify_model": settings.DETOXIFY_MODEL,
+        "toxicity_threshold": settings.TOXICITY_THRESHOLD_LOW,
+        "corpus_size": len(texts),
+        "recall_target": args.recall,
+        "recall": round(recall, 4),
+        "short_circuit_ratio": round(short_circuit, 4),
+    }
+    model.save(args.output)
+
+    print(f"Escalation threshold: {model.threshold:.6f}")
+    print(f"Holdout recall: {recall:.4f} (target {args.recall})")
+    print(f"Holdout short-circuit ratio: {short_circuit:.2%}")
+    print(f"Model saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
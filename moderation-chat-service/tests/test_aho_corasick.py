@@ -0,0 +1,70 @@
+"""
+Tests del automata Aho-Corasick de la lista negra
+"""
+
+import pytest
+from app.core.aho_corasick import AhoCorasickMatcher
+
+pytestmark = pytest.mark.unit
+
+
+def build(*words):
+    matcher = AhoCorasickMatcher()
+    for word in words:
+        matcher.add(word, payload=word.upper())
+    return matcher.build()
+
+
+def spans(matches):
+    return sorted((m.start, m.end, m.word) for m in matches)
+
+
+def test_overlapping_words_are_all_reported():
+    matcher = build("he", "she", "hers", "his")
+
+    matches = matcher.find_all("ushers", whole_words=False)
+
+    assert spans(matches) == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+    assert {m.payload for m in matches} == {"SHE", "HE", "HERS"}
+
+
+def test_every_occurrence_is_counted():
+    matcher = build("as")
+
+    assert spans(matcher.find_all("as soon as possible")) == [(0, 2, "as"), (8, 10, "as")]
+
+
+def test_whole_words_use_unicode_boundaries():
+    matcher = build("año", "idiota")
+
+    assert spans(matcher.find_all("el año pasado")) == [(3, 6, "año")]
+    assert matcher.find_all("tamaño") == []
+    assert matcher.find_all("idiotaé") == []
+    assert matcher.find_all("ñidiota") == []
+    assert spans(matcher.find_all("¡idiota!")) == [(1, 7, "idiota")]
+
+
+def test_whole_words_disabled_matches_inside_words():
+    matcher = build("año")
+
+    assert spans(matcher.find_all("tamaño", whole_words=False)) == [(3, 6, "año")]
+
+
+def test_match_reached_through_fail_link():
+    # "abcd" no está: tras "abc" la "d" solo sigue por el enlace de fallo a "bc"
+    matcher = build("abcx", "bcd")
+
+    assert spans(matcher.find_all("abcd", whole_words=False)) == [(1, 4, "bcd")]
+
+
+def test_suffix_output_inherited_through_fail_link():
+    matcher = build("abcd", "bc")
+
+    assert spans(matcher.find_all("abce", whole_words=False)) == [(1, 3, "bc")]
+    assert spans(matcher.find_all("abcd", whole_words=False)) == [(0, 4, "abcd"), (1, 3, "bc")]
+
+
+def test_words_are_lowercased():
+    matcher = build("Tonto")
+
+    assert spans(matcher.find_all("eres tonto")) == [(5, 10, "tonto")]
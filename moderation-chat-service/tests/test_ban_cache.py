@@ -0,0 +1,188 @@
+"""
+Tests del cache de baneos: recarga desde MongoDB y fallo cerrado ante errores de Redis
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from app.config.settings import settings
+from app.core.ban_cache import BanCache
+
+pytestmark = pytest.mark.unit
+
+
+class FakePipeline:
+    """Encola comandos y los aplica juntos sobre el dict del FakeCache"""
+
+    def __init__(self, data):
+        self.data = data
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def run(self):
+        results = []
+        for name, args, kwargs in self.commands:
+            key = args[0]
+            if name == "get":
+                value = self.data.get(key)
+                results.append(None if value is None else str(value))
+            elif name == "hgetall":
+                results.append(dict(self.data.get(key, {})))
+            elif name == "delete":
+                results.append(int(self.data.pop(key, None) is not None))
+            elif name == "hset":
+                fields = kwargs.get("mapping") or {args[1]: args[2]}
+                self.data.setdefault(key, {}).update(fields)
+                results.append(len(fields))
+            elif name == "hdel":
+                results.append(sum(self.data.get(key, {}).pop(f, None) is not None for f in args[1:]))
+            elif name == "incr":
+                self.data[key] = int(self.data.get(key, 0)) + 1
+                results.append(self.data[key])
+        return results
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    async def get(self, key):
+        return None if self.down else self.data.get(key)
+
+    async def hgetall(self, key):
+        return {} if self.down else dict(self.data.get(key, {}))
+
+    async def transaction(self, queue):
+        if self.down:
+            return None
+        pipe = FakePipeline(self.data)
+        queue(pipe)
+        return pipe.run()
+
+    async def watched_transaction(self, keys, prepare, retries=3):
+        for _ in range(retries):
+            if self.down:
+                return None
+            watched = [self.data.get(key) for key in keys]
+            queue = await prepare()
+            if [self.data.get(key) for key in keys] != watched:
+                continue
+            pipe = FakePipeline(self.data)
+            queue(pipe)
+            return pipe.run()
+        return None
+
+
+class FakeStrikeRepository:
+    def __init__(self, *bans):
+        self.bans = list(bans)
+        self.on_read = None
+
+    async def get_banned_users(self):
+        result = list(self.bans)
+        if self.on_read is not None:
+            # Simula un ban confirmado por otra réplica justo después de la lectura
+            on_read, self.on_read = self.on_read, None
+            await on_read()
+        return [
+            SimpleNamespace(user_id=user_id, channel_id=channel_id, ban_expires_at=expires_at)
+            for user_id, channel_id, expires_at in result
+        ]
+
+
+async def loaded_ban_cache():
+    cache = BanCache(FakeCache(), FakeStrikeRepository(("u1", "c1", None)))
+    await cache.initialize()
+    return cache
+
+
+async def test_initial_load_publishes_database_state():
+    ban_cache = await loaded_ban_cache()
+
+    assert await ban_cache.lookup("u1", "c1") is True
+    assert await ban_cache.lookup("u2", "c1") is False
+    assert ban_cache.cache.data["bans:active"] == {"u1:c1": "inf"}
+    assert ban_cache.cache.data["bans:version"] == 1
+
+
+async def test_other_replica_sees_writes():
+    ban_cache = await loaded_ban_cache()
+
+    replica = BanCache(ban_cache.cache, ban_cache.strike_repo)
+    await replica.initialize()
+
+    await ban_cache.on_ban("u2", "c1", datetime.utcnow() + timedelta(hours=1))
+    await ban_cache.on_unban("u1", "c1")
+    replica._last_version_check = 0.0
+
+    assert await replica.lookup("u2", "c1") is True
+    assert await replica.lookup("u1", "c1") is False
+
+
+async def test_periodic_reload_rebuilds_from_database(monkeypatch):
+    ban_cache = await loaded_ban_cache()
+
+    # Redis perdió el ban (p. ej. una escritura de otra réplica que falló)
+    ban_cache.cache.data["bans:active"] = {}
+    ban_cache.strike_repo.bans.append(("u3", "c1", None))
+    monkeypatch.setattr(settings, "CACHE_BAN_LIST_TTL", 0)
+
+    assert await ban_cache.lookup("u3", "c1") is True
+    assert await ban_cache.lookup("u1", "c1") is True
+    assert set(ban_cache.cache.data["bans:active"]) == {"u1:c1", "u3:c1"}
+
+
+async def test_ban_during_rebuild_is_not_lost(monkeypatch):
+    ban_cache = await loaded_ban_cache()
+    other = BanCache(ban_cache.cache, ban_cache.strike_repo)
+    await other.initialize()
+
+    async def ban_from_other_replica():
+        ban_cache.strike_repo.bans.append(("u2", "c1", None))
+        await other.on_ban("u2", "c1", None)
+
+    ban_cache.strike_repo.on_read = ban_from_other_replica
+    monkeypatch.setattr(settings, "CACHE_BAN_LIST_TTL", 0)
+
+    assert await ban_cache.lookup("u2", "c1") is True
+    assert ban_cache.cache.data["bans:active"]["u2:c1"] == "inf"
+    other._last_version_check = 0.0
+    assert await other.lookup("u2", "c1") is True
+
+
+async def test_prune_removes_expired_bans():
+    ban_cache = await loaded_ban_cache()
+    past = datetime.utcnow() - timedelta(minutes=1)
+    await ban_cache.on_ban("u2", "c1", past)
+
+    assert await ban_cache.prune_expired() == 1
+    assert "u2:c1" not in ban_cache.cache.data["bans:active"]
+    assert await ban_cache.lookup("u1", "c1") is True
+
+
+async def test_failed_write_falls_back_to_database():
+    ban_cache = await loaded_ban_cache()
+
+    ban_cache.cache.down = True
+    await ban_cache.on_ban("u2", "c1", None)
+
+    assert await ban_cache.lookup("u2", "c1") is None
+    assert await ban_cache.lookup("u9", "c1") is None
+
+    # Al volver Redis se reconstruye desde MongoDB
+    ban_cache.strike_repo.bans.append(("u2", "c1", None))
+    ban_cache.cache.down = False
+    assert await ban_cache.lookup("u2", "c1") is True
+    assert ban_cache.cache.data["bans:active"]["u2:c1"] == "inf"
+
+
+async def test_unavailable_redis_at_startup_falls_back_to_database():
+    cache = FakeCache()
+    cache.down = True
+    ban_cache = BanCache(cache, FakeStrikeRepository(("u1", "c1", None)))
+    await ban_cache.initialize()
+
+    assert await ban_cache.lookup("u2", "c1") is None
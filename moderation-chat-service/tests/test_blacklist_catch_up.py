@@ -0,0 +1,55 @@
+"""
+Tests del catch-up del snapshot de la lista negra con el log de cambios
+"""
+
+import asyncio
+import pytest
+from app.core.blacklist_manager import BlacklistManager
+from app.core.blacklist_snapshot import BlacklistChange, BlacklistRule, BlacklistSnapshot
+
+pytestmark = pytest.mark.unit
+
+RULES = {
+    version: BlacklistRule(str(version), f"palabra{version}", "es", "insult", "low")
+    for version in (2, 3)
+}
+
+
+class FakeCache:
+    """Versión y log de cambios en memoria; cada lectura del log cede el loop"""
+
+    def __init__(self, version, changes):
+        self.data = {"blacklist:version": version, "blacklist:changes": changes}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def lrange(self, key, start=0, end=-1):
+        await asyncio.sleep(0)
+        return list(self.data.get(key, []))
+
+
+def build_manager():
+    changes = [BlacklistChange(v, "add", rule.rule_id, rule).to_entry() for v, rule in RULES.items()]
+    manager = BlacklistManager(repository=None, cache=FakeCache(3, changes))
+    manager._snapshot = BlacklistSnapshot.from_rules([], version=1)
+    return manager
+
+
+async def test_concurrent_catch_ups_apply_changes_in_order():
+    manager = build_manager()
+
+    await asyncio.gather(manager._catch_up(3), manager._catch_up(2))
+
+    assert manager._snapshot.version == 3
+    assert set(manager._snapshot.rules) == {"2", "3"}
+
+
+async def test_stale_catch_up_does_not_move_version_back():
+    manager = build_manager()
+    await manager._catch_up(3)
+
+    snapshot = await manager._catch_up(2)
+
+    assert snapshot is manager._snapshot
+    assert manager._snapshot.version == 3
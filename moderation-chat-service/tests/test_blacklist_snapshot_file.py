@@ -0,0 +1,108 @@
+"""
+Tests del formato binario del snapshot de la lista negra
+"""
+
+import json
+import struct
+import pytest
+from app.core.blacklist_snapshot import BlacklistChange, BlacklistRule, BlacklistSnapshot
+from app.core.blacklist_snapshot_file import (
+    HEADER,
+    INDEX_SIZE,
+    SnapshotFormatError,
+    dump_snapshot,
+    load_snapshot,
+    read_header,
+)
+
+pytestmark = pytest.mark.unit
+
+RULES = [
+    BlacklistRule("1", "idiota", "es", "insult", "medium"),
+    BlacklistRule("2", "tonto", "es", "insult", "low"),
+    BlacklistRule("3", "idiot", "en", "insult", "medium"),
+    BlacklistRule("4", "spam", "all", "spam", "low"),
+    BlacklistRule("5", r"f+u+c+k+", "en", "profanity", "high", is_regex=True),
+]
+
+TEXTS = [
+    "eres un idiota y un tonto",
+    "you idiot, stop the spam",
+    "IDIÓTA",
+    "nada que ver",
+]
+
+LANGUAGES = [{"es", "all"}, {"en", "all"}, {"es", "en", "all"}]
+
+
+def found(snapshot, languages, text):
+    return sorted((m.start, m.end, m.payload) for m in snapshot.find_words(languages, text))
+
+
+@pytest.fixture
+def snapshot():
+    return BlacklistSnapshot.from_rules(RULES, version=7)
+
+
+def test_round_trip_matches_source_snapshot(snapshot):
+    loaded = load_snapshot(dump_snapshot(snapshot))
+
+    assert loaded.version == 7
+    assert loaded.fingerprint == snapshot.fingerprint
+    assert loaded.word_count == snapshot.word_count
+    assert loaded.languages == snapshot.languages
+    for languages in LANGUAGES:
+        for text in TEXTS:
+            text = text.lower()
+            assert found(loaded, languages, text) == found(snapshot, languages, text)
+    assert [rule for _, rule in loaded.get_patterns("en")] == [RULES[4]]
+
+
+def test_apply_on_loaded_snapshot(snapshot):
+    loaded = load_snapshot(dump_snapshot(snapshot))
+    added = BlacklistRule("6", "bobo", "es", "insult", "low")
+
+    updated = loaded.apply([
+        BlacklistChange(8, "remove", "2"),
+        BlacklistChange(9, "add", "6", added),
+    ])
+
+    assert updated.version == 9
+    assert [m.payload for m in updated.find_words({"es"}, "tonto y bobo")] == [added]
+    assert "2" not in updated.rules and updated.rules["6"] == added
+    # El fingerprint del delta coincide con el de compilar todo de nuevo
+    assert updated.fingerprint == BlacklistSnapshot.from_rules(updated.rules.values()).fingerprint
+    assert updated.fingerprint != loaded.fingerprint
+    # El snapshot cargado no cambia
+    assert [m.payload for m in loaded.find_words({"es"}, "tonto y bobo")] == [RULES[1]]
+
+
+def test_corrupted_payload_is_rejected(snapshot):
+    data = bytearray(dump_snapshot(snapshot))
+    data[HEADER.size + 10] ^= 0xFF
+
+    with pytest.raises(SnapshotFormatError):
+        load_snapshot(bytes(data))
+
+
+def test_unexpected_checksum_is_rejected(snapshot):
+    data = dump_snapshot(snapshot)
+    _, checksum, _, _ = read_header(data)
+
+    with pytest.raises(SnapshotFormatError):
+        load_snapshot(data, expected_checksum=checksum ^ 1)
+
+    assert load_snapshot(data, expected_checksum=checksum).version == 7
+
+
+def test_array_sections_are_little_endian(snapshot):
+    data = dump_snapshot(snapshot)
+    payload = data[HEADER.size:]
+    (index_size,) = INDEX_SIZE.unpack_from(payload, 0)
+    index = json.loads(payload[INDEX_SIZE.size:INDEX_SIZE.size + index_size])
+    offset, length = index["sections"]["rule_offsets"]
+    raw = payload[INDEX_SIZE.size + index_size + offset:][:length]
+
+    offsets = [value for (value,) in struct.iter_unpack("<I", raw)]
+    assert offsets[0] == 0 and len(offsets) == len(RULES) + 1
+    assert offsets == sorted(offsets)
@@ -0,0 +1,188 @@
+"""
+Presupuesto de round trips a MongoDB al registrar una violación
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from bson import ObjectId
+from app.config.settings import settings
+from app.core.strike_manager import DECISION_ROUND_TRIPS, StrikeManager
+from app.models.violation import Violation
+from app.repositories.ban_repository import BanRepository
+from app.repositories.strike_repository import StrikeRepository
+from app.repositories.violation_repository import ViolationRepository
+
+
+def evaluate(expression, doc):
+    """Evalúa las expresiones de agregación que usa el update del strike"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        return doc.get(expression[1:])
+    if not isinstance(expression, dict):
+        return expression
+
+    (operator, args), = expression.items()
+    if operator == "$cond":
+        condition, then, otherwise = args
+        return evaluate(then if evaluate(condition, doc) else otherwise, doc)
+    if operator == "$ifNull":
+        value = evaluate(args[0], doc)
+        return evaluate(args[1], doc) if value is None else value
+    if operator == "$add":
+        return sum(evaluate(arg, doc) for arg in args)
+    if operator == "$gte":
+        return evaluate(args[0], doc) >= evaluate(args[1], doc)
+    if operator == "$switch":
+        for branch in args["branches"]:
+            if evaluate(branch["case"], doc):
+                return evaluate(branch["then"], doc)
+        return evaluate(args["default"], doc)
+    raise AssertionError(f"Unsupported operator {operator}")
+
+
+class RecordingCollection:
+    """Colección falsa que cuenta cada operación como un round trip"""
+
+    def __init__(self, name, database):
+        self.name = name
+        self.database = database
+
+    def _record(self, operation, session):
+        assert session is self.database.session
+        self.database.operations.append((self.name, operation))
+
+    async def find_one_and_update(self, query, update, upsert=False, session=None, **kwargs):
+        self._record("find_one_and_update", session)
+        doc = self.database.strike_doc or {"_id": ObjectId(), **query}
+        for stage in update:
+            (operator, fields), = stage.items()
+            assert operator == "$set"
+            doc = {**doc, **{field: evaluate(value, doc) for field, value in fields.items()}}
+        self.database.strike_doc = doc
+        return doc
+
+    async def insert_one(self, document, session=None, **kwargs):
+        self._record("insert_one", session)
+        return SimpleNamespace(inserted_id=ObjectId())
+
+    def __getattr__(self, method):
+        raise AssertionError(f"Unexpected {self.name}.{method} in the decision commit")
+
+
+class RecordingSession:
+    """Sesión falsa: el commit de la transacción es un round trip más"""
+
+    def __init__(self, database):
+        self.database = database
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def with_transaction(self, callback):
+        result = await callback(self)
+        self.database.operations.append(("session", "commitTransaction"))
+        return result
+
+
+class RecordingDatabase:
+    def __init__(self, strike_doc, transaction=False):
+        self.operations = []
+        self.strike_doc = strike_doc
+        self.session = RecordingSession(self) if transaction else None
+        self.client = SimpleNamespace(start_session=self.start_session)
+
+    async def start_session(self):
+        return self.session
+
+    def __getitem__(self, name):
+        return RecordingCollection(name, self)
+
+
+def previous_strike_doc(strike_count):
+    """Registro previo a la violación (None si es la primera)"""
+    if strike_count == 1:
+        return None
+    now = datetime.utcnow()
+    return {
+        "_id": ObjectId(),
+        "user_id": "user_1",
+        "channel_id": "channel_1",
+        "strike_count": strike_count - 1,
+        "last_violation": now,
+        "strikes_reset_at": now + timedelta(days=settings.STRIKE_RESET_DAYS),
+        "is_banned": False,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def build_manager(db):
+    return StrikeManager(
+        StrikeRepository(db),
+        BanRepository(db),
+        violation_repository=ViolationRepository(db)
+    )
+
+
+def build_violation():
+    return Violation(
+        user_id="user_1",
+        channel_id="channel_1",
+        message_id="msg_1",
+        toxicity_score=0.9,
+        severity="high",
+        action_taken="message_blocked",
+        strike_count_at_time=0
+    )
+
+
+CASES = [
+    (1, "warning", None),
+    (settings.MAX_STRIKES_BEFORE_TEMP_BAN, "temp_ban", "temporary"),
+    (settings.MAX_STRIKES_BEFORE_PERM_BAN, "perm_ban", "permanent"),
+]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("strike_count, action, ban_type", CASES)
+async def test_decision_commit_round_trip_budget(monkeypatch, strike_count, action, ban_type):
+    monkeypatch.setattr(settings, "DECISION_COMMIT_TRANSACTION", False)
+    db = RecordingDatabase(previous_strike_doc(strike_count))
+    violation = build_violation()
+
+    result = await build_manager(db).apply_strike("user_1", "channel_1", "high", "test", violation=violation)
+
+    assert result["action"] == action
+    assert violation.action_taken == action
+    assert violation.strike_count_at_time == strike_count
+    assert len(db.operations) == DECISION_ROUND_TRIPS[action]
+    assert db.operations[0] == ("user_strikes", "find_one_and_update")
+    assert ("violations", "insert_one") in db.operations
+    assert (("bans", "insert_one") in db.operations) == (action != "warning")
+
+    # El ban lo aplicó el mismo update del strike
+    assert db.strike_doc["strike_count"] == strike_count
+    assert db.strike_doc["is_banned"] == (ban_type is not None)
+    assert db.strike_doc.get("ban_type") == ban_type
+    assert (db.strike_doc.get("ban_expires_at") is not None) == (ban_type == "temporary")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("strike_count, action, ban_type", CASES)
+async def test_decision_commit_transaction_round_trip_budget(monkeypatch, strike_count, action, ban_type):
+    monkeypatch.setattr(settings, "DECISION_COMMIT_TRANSACTION", True)
+    db = RecordingDatabase(previous_strike_doc(strike_count), transaction=True)
+    violation = build_violation()
+
+    result = await build_manager(db).apply_strike("user_1", "channel_1", "high", "test", violation=violation)
+
+    assert result["action"] == action
+    assert db.strike_doc.get("ban_type") == ban_type
+    # Mismas escrituras, en orden y dentro de la sesión, más el commit
+    assert len(db.operations) == DECISION_ROUND_TRIPS[action] + 1
+    assert db.operations[0] == ("user_strikes", "find_one_and_update")
+    assert db.operations[1] == ("violations", "insert_one")
+    assert db.operations[-1] == ("session", "commitTransaction")
@@ -0,0 +1,71 @@
+"""
+Tests de la validación de costo de los patrones regex
+"""
+
+import pytest
+from app.config.settings import settings
+from app.core.blacklist_snapshot import BlacklistRule, BlacklistSnapshot
+from app.core.regex_safety import analyze_pattern
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def re_engine(monkeypatch):
+    monkeypatch.setattr(settings, "BLACKLIST_REGEX_ENGINE", "re")
+
+
+@pytest.mark.parametrize("pattern", [
+    r"(a|aa)+$",
+    r"(ab|a)+b",
+    r"(.a|xa)+",
+    r"(a|ab|b)*c",
+])
+def test_overlapping_alternatives_under_quantifier_are_rejected(pattern):
+    assert any("overlapping alternatives" in issue for issue in analyze_pattern(pattern))
+
+
+@pytest.mark.parametrize("pattern", [
+    r"(foo|fab)+",
+    r"(a|b)+",
+    r"(idiot|imbecil)+",
+    r"\b(put[ao]|mierda)s?\b",
+    r"(a|aa)",
+    r"f+u+c+k+",
+    r"\s*\w+",
+    r"[0-9]+\s*€",
+    r"\bh+o+l+a+\b",
+])
+def test_safe_patterns_pass(pattern):
+    assert analyze_pattern(pattern) == []
+
+
+@pytest.mark.parametrize("pattern", [r"(a+)+$", r"(.*a){12}", r"(\w+\s){3}"])
+def test_nested_quantifiers_are_rejected(pattern):
+    assert analyze_pattern(pattern) == ["nested quantifiers (catastrophic backtracking)"]
+
+
+@pytest.mark.parametrize("pattern", [r"\w*\w*\w*x", r"(\w*)\w*x", r".*foo.*", r"a\w*b\w*c"])
+def test_adjacent_overlapping_quantifiers_are_rejected(pattern):
+    assert analyze_pattern(pattern) == [
+        "adjacent unbounded quantifiers over overlapping characters (catastrophic backtracking)"
+    ]
+
+
+@pytest.mark.parametrize("pattern", [r"^(a?){25}a{25}$", r"(a*|b){3}"])
+def test_quantified_empty_groups_are_rejected(pattern):
+    assert "quantified group can match the empty string (catastrophic backtracking)" in analyze_pattern(pattern)
+
+
+def test_backreferences_and_lookarounds_are_rejected():
+    assert analyze_pattern(r"(a)\1") == ["backreferences are not allowed"]
+    assert analyze_pattern(r"a(?=b)") == ["lookaround assertions are not allowed"]
+
+
+def test_unsafe_stored_rule_is_not_loaded():
+    snapshot = BlacklistSnapshot.from_rules([
+        BlacklistRule("1", r"\w*\w*\w*x", "es", "spam", "low", is_regex=True),
+        BlacklistRule("2", r"f+u+c+k+", "es", "profanity", "high", is_regex=True),
+    ])
+
+    assert [rule.rule_id for _, rule in snapshot.get_patterns("es")] == ["2"]
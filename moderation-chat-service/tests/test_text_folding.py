@@ -0,0 +1,72 @@
+"""
+Tests del plegado de texto de la lista negra
+"""
+
+import pytest
+from app.core.aho_corasick import AhoCorasickMatcher
+from app.core.text_folding import fold_text, fold_word
+
+pytestmark = pytest.mark.unit
+
+
+def find(words, text):
+    """Matches como en BlacklistManager: automata sobre el texto plegado y chequeo de rachas"""
+    matcher = AhoCorasickMatcher()
+    for word in words:
+        matcher.add(fold_word(word), word)
+    folded = fold_text(text)
+    return [
+        (m.payload, text[slice(*folded.span(m.start, m.end))])
+        for m in matcher.build().find_all(folded.text)
+        if folded.runs_compatible(m.start, m.end, m.payload)
+    ]
+
+
+def test_runs_are_squeezed_and_recorded():
+    folded = fold_text("tooonto")
+
+    assert folded.text == "tonto"
+    assert folded.runs == [1, 3, 1, 1, 1]
+    assert fold_word("perra") == fold_word("pera") == "pera"
+
+
+@pytest.mark.parametrize("text, word", [
+    ("tooonto", "tonto"),
+    ("tooooonto", "tonto"),
+    ("idiooooota", "idiota"),
+    ("ıd1ooota", "idiota"),
+    ("perrrrra", "perra"),
+    ("asssss", "ass"),
+])
+def test_elongated_words_match(text, word):
+    assert find([word], f"eres un {text}!") == [(word, text)]
+
+
+def test_double_letters_keep_words_distinct():
+    assert find(["perra"], "una pera madura") == []
+    assert find(["pera"], "esa perra") == []
+    assert find(["perra", "pera"], "esa perra") == [("perra", "perra")]
+    assert find(["ass"], "as soon as possible") == []
+    assert find(["hell"], "hel") == []
+    assert find(["kill"], "kil") == []
+    assert find(["tonto"], "toonto") == []
+
+
+def test_accents_homoglyphs_and_leet():
+    assert fold_text("IDIÓTA").text == "idiota"
+    assert fold_text("іd1ota").text == "idiota"
+    assert fold_text("id​iota").text == "idiota"
+    assert fold_text("año 2024").text == "año 2024"
+
+
+def test_span_maps_back_to_original_text():
+    text = "eres un tooooonto!"
+    folded = fold_text(text)
+
+    start = folded.text.index("tonto")
+    assert folded.span(start, start + len("tonto")) == (8, 17)
+    assert text[8:17] == "tooooonto"
+
+
+def test_span_covers_removed_zero_width_and_repeats():
+    assert find(["perra"], "sos una pe​rrrrra") == [("perra", "pe​rrrrra")]
@@ -0,0 +1,80 @@
+"""
+Tests del cache de veredictos (cálculos compartidos en vuelo)
+"""
+
+import asyncio
+import pytest
+from app.core.verdict_cache import VerdictCache
+
+pytestmark = pytest.mark.unit
+
+VERDICT = {"language": "es", "languages": ["es"], "scores": {"toxicity": 0.1}}
+
+
+class FakeCache:
+    """RedisCache en memoria (solo get/set)"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+        return True
+
+
+def make_cache() -> VerdictCache:
+    return VerdictCache(FakeCache(), lambda: "v1", max_size=10, ttl=60, redis_ttl=60)
+
+
+async def test_cancelled_owner_does_not_cancel_waiters():
+    cache = make_cache()
+    release = asyncio.Event()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return VERDICT
+
+    owner = asyncio.create_task(cache.get_or_compute("hola", compute))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_compute("hola", compute))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await owner
+
+    release.set()
+    assert await waiter == VERDICT
+    assert calls == 1
+    assert cache.get_metrics()["in_flight"] == 0
+    # El resultado quedó cacheado aunque el request original se canceló
+    assert await cache.get_or_compute("hola", compute) == VERDICT
+    assert calls == 1
+
+
+async def test_compute_error_reaches_every_waiter_and_is_not_cached():
+    cache = make_cache()
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("model down")
+
+    requests = [asyncio.create_task(cache.get_or_compute("hola", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*requests, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get_metrics()["in_flight"] == 0
+
+    async def compute():
+        return VERDICT
+
+    assert await cache.get_or_compute("hola", compute) == VERDICT